@@ -0,0 +1,117 @@
+# ============================================================
+#  Admission Control – cap concurrent chat requests; extra
+#  requests queue briefly, then are shed with 429 / 503 so
+#  overload degrades cleanly instead of timing out for everyone
+# ============================================================
+
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+
+# ─── Config ─────────────────────────────────────────────────
+CHAT_MAX_IN_FLIGHT = int(os.getenv("CHAT_MAX_IN_FLIGHT", "32"))     # 0 = no limit
+CHAT_MAX_QUEUE     = int(os.getenv("CHAT_MAX_QUEUE", "64"))         # waiting beyond this → 429
+CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", "10"))   # waited this long → 503
+
+
+class Overloaded(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail      = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Usage:
+        async with admission.slot():
+            ...
+
+    At most `max_in_flight` holders at once. Up to `max_queue` more wait for a
+    slot; a request that finds the queue full is rejected at once (429), one
+    that waits longer than `queue_timeout` is rejected with 503.
+    """
+
+    def __init__(self, max_in_flight: int = CHAT_MAX_IN_FLIGHT, max_queue: int = CHAT_MAX_QUEUE,
+                 queue_timeout: float = CHAT_QUEUE_TIMEOUT):
+        self.max_in_flight = max_in_flight
+        self.max_queue     = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._sem: asyncio.Semaphore | None = None
+        self._loop = None
+
+        # Stats
+        self.in_flight          = 0
+        self.waiting            = 0
+        self.admitted           = 0
+        self.rejected_full      = 0
+        self.rejected_timeout   = 0
+        self.wait_total         = 0.0
+        self.wait_max           = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._sem  = asyncio.Semaphore(self.max_in_flight)
+        return self._sem
+
+    async def acquire(self):
+        if not self.enabled:
+            return
+        sem = self._semaphore()
+        if sem.locked() and self.waiting >= self.max_queue:
+            self.rejected_full += 1
+            raise Overloaded(429, "Too many requests in progress, please retry shortly", 1)
+
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(sem.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise Overloaded(503, "Server is busy, please retry shortly",
+                             max(1, int(self.queue_timeout)))
+        finally:
+            self.waiting -= 1
+
+        wait = time.perf_counter() - start
+        self.wait_total += wait
+        self.wait_max    = max(self.wait_max, wait)
+        self.admitted   += 1
+        self.in_flight  += 1
+
+    def release(self):
+        if not self.enabled:
+            return
+        self.in_flight -= 1
+        self._sem.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "enabled":            self.enabled,
+            "max_in_flight":      self.max_in_flight,
+            "max_queue":          self.max_queue,
+            "queue_timeout_s":    self.queue_timeout,
+            "in_flight":          self.in_flight,
+            "waiting":            self.waiting,
+            "admitted":           self.admitted,
+            "rejected_full":      self.rejected_full,
+            "rejected_timeout":   self.rejected_timeout,
+            "avg_queue_wait_ms":  round(self.wait_total / self.admitted * 1000, 3) if self.admitted else 0.0,
+            "max_queue_wait_ms":  round(self.wait_max * 1000, 3),
+        }
@@ -0,0 +1,143 @@
+# ============================================================
+#  Semantic Answer Cache – reuse answers for paraphrased queries
+#  (keyed by query embedding + knowledge-base version)
+# ============================================================
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+# ─── Config ─────────────────────────────────────────────────
+CACHE_ENABLED   = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))  # cosine similarity
+CACHE_MAX_SIZE  = int(os.getenv("ANSWER_CACHE_MAX_SIZE", "512"))
+CACHE_TTL       = float(os.getenv("ANSWER_CACHE_TTL", "3600"))        # seconds
+
+
+def history_key(pairs: list) -> str:
+    """Stable fingerprint of the (human, ai) pairs the LLM would see. Empty history → ''."""
+    if not pairs:
+        return ""
+    h = hashlib.sha1()
+    for human, ai in pairs:
+        h.update(human.encode("utf-8")); h.update(b"\x00")
+        h.update(ai.encode("utf-8"));    h.update(b"\x01")
+    return h.hexdigest()
+
+
+class KBVersion:
+    """
+    A tenant's knowledge-base version. Kept by the tenant registry for the
+    life of the process, so a reopened KB never restarts at 0 and matches
+    answers (or prefetches) read before a later write.
+    """
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self.value += 1
+
+
+class SemanticAnswerCache:
+    """
+    LRU + TTL cache of LLM answers.
+    A lookup hits when a stored question with the same KB version, language and
+    history fingerprint has cosine similarity ≥ threshold with the new question.
+    An answer is stored under the KB version its context was retrieved at, so
+    one generated across an invalidate() is dropped rather than served as fresh.
+    """
+
+    def __init__(self, threshold: float = CACHE_THRESHOLD,
+                 max_size: int = CACHE_MAX_SIZE, ttl: float = CACHE_TTL,
+                 version: Optional[KBVersion] = None):
+        self.threshold  = threshold
+        self.max_size   = max_size
+        self.ttl        = ttl
+        self._version   = version or KBVersion()
+        self.hits       = 0
+        self.misses     = 0
+        self._entries: OrderedDict[int, dict] = OrderedDict()
+        self._next_id   = 0
+        self._lock      = threading.Lock()
+
+    @property
+    def kb_version(self) -> int:
+        return self._version.value
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vec  = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _evict_expired(self, now: float):
+        expired = [k for k, e in self._entries.items() if now - e["created"] > self.ttl]
+        for k in expired:
+            del self._entries[k]
+
+    def lookup(self, embedding, language: str, hist_key: str) -> Optional[dict]:
+        vec = self._normalize(embedding)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            best_id, best_sim = None, self.threshold
+            for entry_id, e in self._entries.items():
+                if e["kb_version"] != self.kb_version or e["language"] != language \
+                        or e["history"] != hist_key:
+                    continue
+                sim = float(np.dot(vec, e["vector"]))
+                if sim >= best_sim:
+                    best_id, best_sim = entry_id, sim
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            e = self._entries[best_id]
+            return {"answer": e["answer"], "sources": e["sources"], "similarity": best_sim}
+
+    def store(self, embedding, language: str, hist_key: str,
+              answer: str, sources: list[str], kb_version: int):
+        with self._lock:
+            if kb_version != self.kb_version:   # KB changed since retrieval
+                return
+            self._entries[self._next_id] = {
+                "vector":     self._normalize(embedding),
+                "language":   language,
+                "history":    hist_key,
+                "kb_version": kb_version,
+                "answer":     answer,
+                "sources":    sources,
+                "created":    time.monotonic(),
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Called whenever the vector store changes — bumps the KB version and drops all answers."""
+        with self._lock:
+            self._version.bump()
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled":    CACHE_ENABLED,
+            "size":       len(self._entries),
+            "max_size":   self.max_size,
+            "ttl":        self.ttl,
+            "threshold":  self.threshold,
+            "kb_version": self.kb_version,
+            "hits":       self.hits,
+            "misses":     self.misses,
+            "hit_rate":   round(self.hits / total, 4) if total else 0.0,
+        }
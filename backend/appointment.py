@@ -1,43 +1,152 @@
 # ============================================================
-#  Appointment / Lead Manager – Local JSON store
-#  (Extendable: swap JSON store with SQLite / Google Calendar)
+#  Appointment / Lead Manager – Local SQLite store (WAL mode)
+#  (Extendable: swap SQLite store with Postgres / Google Calendar)
 # ============================================================
 
+import re
 import json
 import uuid
 import os
+import sqlite3
+import threading
 from datetime import datetime
-from typing import Optional, List
+from typing import Iterator, Optional, List
 
-DB_PATH = "./data/bookings.json"
+DB_PATH          = os.getenv("BOOKINGS_DB_PATH", "./data/bookings.db")
+LEGACY_JSON_PATH = "./data/bookings.json"   # pre-SQLite store, migrated once
+DEFAULT_TENANT   = "default"
+EXPORT_BATCH     = 1000    # rows fetched per query while streaming an export
 
+_COLUMNS = ["id", "tenant_id", "name", "phone", "email", "service",
+            "preferred_time", "status", "created_at"]
 
-def _load() -> list:
-    if not os.path.exists(DB_PATH):
-        return []
-    with open(DB_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    id             TEXT PRIMARY KEY,
+    tenant_id      TEXT NOT NULL DEFAULT 'default',
+    name           TEXT NOT NULL,
+    phone          TEXT NOT NULL,
+    email          TEXT NOT NULL DEFAULT '',
+    service        TEXT NOT NULL,
+    preferred_time TEXT NOT NULL,
+    status         TEXT NOT NULL DEFAULT 'pending',
+    created_at     TEXT NOT NULL,
+    phone_key      TEXT NOT NULL DEFAULT ''
+);
+"""
 
+# Created after the column migrations, so older databases get them too. Every
+# filter has a (tenant_id, filter, created_at) index, so filtered pages come
+# out of the index already newest-first
+_INDEXES = """
+DROP INDEX IF EXISTS idx_bookings_tenant_st;
+CREATE INDEX IF NOT EXISTS idx_bookings_status         ON bookings(status);
+CREATE INDEX IF NOT EXISTS idx_bookings_created_at     ON bookings(created_at);
+CREATE INDEX IF NOT EXISTS idx_bookings_tenant         ON bookings(tenant_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_bookings_tenant_status  ON bookings(tenant_id, status, created_at);
+CREATE INDEX IF NOT EXISTS idx_bookings_tenant_service ON bookings(tenant_id, service COLLATE NOCASE, created_at);
+CREATE INDEX IF NOT EXISTS idx_bookings_tenant_phone   ON bookings(tenant_id, phone_key, created_at);
+"""
 
-def _save(records: list):
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    with open(DB_PATH, "w", encoding="utf-8") as f:
-        json.dump(records, f, indent=2, ensure_ascii=False)
+_INSERT = (f"INTO bookings ({', '.join(_COLUMNS)}, phone_key) "
+           f"VALUES ({', '.join('?' * (len(_COLUMNS) + 1))})")
+_SELECT = f"SELECT {', '.join(_COLUMNS)} FROM bookings"
+
+
+def phone_key(phone: str) -> str:
+    """Digits only, last 10 – "+91 98765-43210", "098765 43210" and "9876543210" match."""
+    return re.sub(r"\D", "", phone or "")[-10:]
+
+
+def _iso(value: Optional[str]) -> Optional[str]:
+    """Date / datetime filter → naive local ISO string, comparable with created_at."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value!r} (expected ISO 8601, e.g. 2025-01-31)")
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt.isoformat()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    _add_tenant_column(conn)
+    _add_phone_key(conn)
+    conn.executescript(_INDEXES)
+    return conn
+
+
+def _add_tenant_column(conn: sqlite3.Connection):
+    """Bookings made before tenants existed belong to the default tenant."""
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(bookings)")}
+    if "tenant_id" not in columns:
+        with conn:
+            conn.execute(f"ALTER TABLE bookings ADD COLUMN tenant_id TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}'")
+
+
+def _add_phone_key(conn: sqlite3.Connection):
+    """Backfills the normalised phone column that phone lookups use."""
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(bookings)")}
+    if "phone_key" in columns:
+        return
+    with conn:
+        conn.execute("ALTER TABLE bookings ADD COLUMN phone_key TEXT NOT NULL DEFAULT ''")
+        conn.executemany("UPDATE bookings SET phone_key = ? WHERE rowid = ?",
+                         [(phone_key(row["phone"]), row["rowid"])
+                          for row in conn.execute("SELECT rowid, phone FROM bookings")])
+
+
+def _migrate_json(conn: sqlite3.Connection, json_path: str):
+    """One-time import of the old bookings.json; the file is renamed afterwards."""
+    if not os.path.exists(json_path):
+        return
+    with open(json_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    # Missing fields get create_booking's defaults; the file's mtime stands in for created_at
+    defaults = {
+        "tenant_id":      DEFAULT_TENANT,
+        "preferred_time": "To be confirmed",
+        "status":         "pending",
+        "created_at":     datetime.fromtimestamp(os.path.getmtime(json_path)).isoformat(),
+    }
+    rows = []
+    for r in records:
+        row = {c: r.get(c) or defaults.get(c, "") for c in _COLUMNS}
+        row["id"] = row["id"] or str(uuid.uuid4())[:8].upper()
+        rows.append(tuple(row[c] for c in _COLUMNS) + (phone_key(r.get("phone")),))
+    with conn:
+        conn.executemany("INSERT OR IGNORE " + _INSERT, rows)
+    os.replace(json_path, json_path + ".migrated")
+    print(f"📦 Migrated {len(records)} bookings from {json_path} → SQLite")
 
 
 class AppointmentManager:
 
+    def __init__(self, db_path: str = DB_PATH, legacy_json_path: str = LEGACY_JSON_PATH):
+        self._lock = threading.Lock()
+        self._conn = _connect(db_path)
+        _migrate_json(self._conn, legacy_json_path)
+
     def create_booking(
         self,
         name: str,
         phone: str,
         service: str,
         email: Optional[str] = None,
-        preferred_time: Optional[str] = None
+        preferred_time: Optional[str] = None,
+        tenant_id: str = DEFAULT_TENANT
     ) -> dict:
-        records = _load()
         record = {
             "id":             str(uuid.uuid4())[:8].upper(),
+            "tenant_id":      tenant_id,
             "name":           name,
             "phone":          phone,
             "email":          email or "",
@@ -46,27 +155,123 @@ class AppointmentManager:
             "status":         "pending",
             "created_at":     datetime.now().isoformat()
         }
-        records.append(record)
-        _save(records)
-        print(f"📅 New booking: {record['id']} – {name} for {service}")
+        with self._lock:
+            while True:
+                try:
+                    with self._conn:
+                        self._conn.execute(
+                            "INSERT " + _INSERT,
+                            tuple(record[c] for c in _COLUMNS) + (phone_key(phone),),
+                        )
+                    break
+                except sqlite3.IntegrityError:
+                    # 8-char ID collision — draw a new one
+                    record["id"] = str(uuid.uuid4())[:8].upper()
+        print(f"📅 New booking: {record['id']} – {name} for {service} [{tenant_id}]")
         return record
 
-    def get_all_bookings(self) -> List[dict]:
-        return _load()
+    def get_all_bookings(self, tenant_id: str = DEFAULT_TENANT) -> List[dict]:
+        return self.get_bookings(tenant_id=tenant_id)
 
-    def update_status(self, booking_id: str, status: str) -> Optional[dict]:
-        records = _load()
-        for r in records:
-            if r["id"] == booking_id:
-                r["status"] = status
-                _save(records)
-                return r
-        return None
+    @staticmethod
+    def _where(tenant_id: str, status: Optional[str] = None, service: Optional[str] = None,
+               phone: Optional[str] = None, created_from: Optional[str] = None,
+               created_to: Optional[str] = None) -> tuple:
+        """
+        WHERE clause + args for the booking filters (ValueError on a bad date).
+        service is case-insensitive, phone matches on its last 10 digits,
+        created_from is inclusive and created_to exclusive.
+        """
+        sql, args = " WHERE tenant_id = ?", [tenant_id]
+        if status:
+            sql += " AND status = ?"
+            args.append(status)
+        if service:
+            sql += " AND service = ? COLLATE NOCASE"
+            args.append(service)
+        if phone:
+            sql += " AND phone_key = ?"
+            args.append(phone_key(phone))
+        if created_from:
+            sql += " AND created_at >= ?"
+            args.append(_iso(created_from))
+        if created_to:
+            sql += " AND created_at < ?"
+            args.append(_iso(created_to))
+        return sql, args
+
+    def get_bookings(self, status: Optional[str] = None,
+                     limit: Optional[int] = None, offset: int = 0,
+                     tenant_id: str = DEFAULT_TENANT, **filters) -> List[dict]:
+        """
+        One tenant's bookings, newest first; optionally filtered (status, service,
+        phone, created_from, created_to – see _where) and paginated.
+        """
+        where, args = self._where(tenant_id, status, **filters)
+        sql = _SELECT + where + " ORDER BY created_at DESC, rowid DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            args += [limit, offset]
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [dict(r) for r in rows]
+
+    def iter_bookings(self, status: Optional[str] = None, tenant_id: str = DEFAULT_TENANT,
+                      batch_size: int = EXPORT_BATCH, **filters) -> Iterator[dict]:
+        """
+        Same rows as get_bookings, streamed: one indexed query per batch, keyed
+        on the last (created_at, rowid) seen, so memory stays flat and the lock
+        is not held between batches. Filters are validated before the first row.
+        """
+        where, args = self._where(tenant_id, status, **filters)
+        sql = (f"SELECT rowid, {', '.join(_COLUMNS)} FROM bookings{where} {{after}}"
+               f"ORDER BY created_at DESC, rowid DESC LIMIT {int(batch_size)}")
+
+        def rows():
+            last = None
+            while True:
+                with self._lock:
+                    if last is None:
+                        batch = self._conn.execute(sql.format(after=""), args).fetchall()
+                    else:
+                        batch = self._conn.execute(sql.format(after="AND (created_at, rowid) < (?, ?) "),
+                                                   args + list(last)).fetchall()
+                for row in batch:
+                    yield {c: row[c] for c in _COLUMNS}
+                if len(batch) < batch_size:
+                    return
+                last = (batch[-1]["created_at"], batch[-1]["rowid"])
+
+        return rows()
+
+    def count_bookings(self, status: Optional[str] = None,
+                       tenant_id: str = DEFAULT_TENANT, **filters) -> int:
+        where, args = self._where(tenant_id, status, **filters)
+        with self._lock:
+            (n,) = self._conn.execute("SELECT COUNT(*) FROM bookings" + where, args).fetchone()
+        return n
+
+    def get_booking(self, booking_id: str, tenant_id: str = DEFAULT_TENANT) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                _SELECT + " WHERE id = ? AND tenant_id = ?", (booking_id, tenant_id)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def update_status(self, booking_id: str, status: str,
+                      tenant_id: str = DEFAULT_TENANT) -> Optional[dict]:
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE bookings SET status = ? WHERE id = ? AND tenant_id = ?",
+                (status, booking_id, tenant_id),
+            )
+        if cur.rowcount == 0:
+            return None
+        return self.get_booking(booking_id, tenant_id)
 
-    def delete_booking(self, booking_id: str) -> bool:
-        records = _load()
-        new_records = [r for r in records if r["id"] != booking_id]
-        if len(new_records) == len(records):
-            return False
-        _save(new_records)
-        return True
+    def delete_booking(self, booking_id: str, tenant_id: str = DEFAULT_TENANT) -> bool:
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM bookings WHERE id = ? AND tenant_id = ?", (booking_id, tenant_id)
+            )
+        return cur.rowcount > 0
@@ -0,0 +1,25 @@
+"""
+bake_model.py – Download the ONNX embedding model into EMBED_MODEL_DIR at
+build time, so the server never touches the network on startup.
+
+Usage (e.g. as part of the Render build command):
+    EMBED_MODEL_DIR=./models/all-MiniLM-L6-v2 python bake_model.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+if __name__ == "__main__":
+    model_dir = os.getenv("EMBED_MODEL_DIR") or (sys.argv[1] if len(sys.argv) > 1 else "")
+    if not model_dir:
+        sys.exit("Set EMBED_MODEL_DIR (or pass the directory as an argument).")
+
+    ef = ONNXMiniLM_L6_V2()
+    ef.DOWNLOAD_PATH = Path(model_dir)
+    start = time.perf_counter()
+    vec = ef(["warm up"])[0]      # downloads if missing, then loads the model once to verify it
+    print(f"✅ Model ready in {model_dir} ({len(vec)}-d, {time.perf_counter() - start:.1f}s)")
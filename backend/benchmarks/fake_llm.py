@@ -0,0 +1,98 @@
+"""
+fake_llm.py – Local ChatGroq stand-in for benchmarks (no network).
+
+Latency model: `latency` seconds to the first token, then `tokens_per_second`
+for the remaining `max_tokens` tokens. Works with invoke / ainvoke / stream /
+astream, so every RAGEngine code path can be driven through it.
+
+Tail behaviour: with probability `slow_rate` a call takes `slow_latency` to
+its first token instead; with probability `rate_limit_rate` it fails with a
+429 (FakeRateLimitError), like Groq's free tier under load.
+"""
+
+import time
+import random
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_ANSWER = ("Thanks for asking! Our Premium Plan is ₹4,500/month and includes gym access, "
+           "all group classes and one personal training session. Would you like me to "
+           "book a free trial class for you? Just share your name and phone number. ")
+
+_calls_lock = threading.Lock()
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+class FakeChatGroq(BaseChatModel):
+    latency: float = 0.3             # seconds to first token
+    tokens_per_second: float = 250.0
+    max_tokens: int = 128
+    slow_rate: float = 0.0
+    slow_latency: float = 3.0
+    rate_limit_rate: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-groq"
+
+    def _tokens(self) -> List[str]:
+        words = _ANSWER.split(" ")
+        return [(words[i % len(words)] + " ") for i in range(self.max_tokens)]
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _count_call(self):
+        with _calls_lock:
+            self.calls += 1
+
+    def _first_token_latency(self) -> float:
+        """Per-call draw: may raise a 429 or return the slow-tail latency."""
+        if random.random() < self.rate_limit_rate:
+            raise FakeRateLimitError("rate limit exceeded (fake)")
+        return self.slow_latency if random.random() < self.slow_rate else self.latency
+
+    def _result(self, text: str) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self._count_call()
+        tokens = self._tokens()
+        time.sleep(self._first_token_latency() + self._token_delay() * (len(tokens) - 1))
+        return self._result("".join(tokens))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self._count_call()
+        tokens = self._tokens()
+        await asyncio.sleep(self._first_token_latency() + self._token_delay() * (len(tokens) - 1))
+        return self._result("".join(tokens))
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self._count_call()
+        time.sleep(self._first_token_latency())
+        for i, tok in enumerate(self._tokens()):
+            if i:
+                time.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=tok))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        self._count_call()
+        await asyncio.sleep(self._first_token_latency())
+        for i, tok in enumerate(self._tokens()):
+            if i:
+                await asyncio.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=tok))
+
@@ -0,0 +1,91 @@
+"""
+intent_bench.py – Micro-benchmark: linear keyword scans vs the compiled
+Aho-Corasick IntentClassifier, over a Hindi/English message corpus.
+
+Usage:
+    python benchmarks/intent_bench.py [--messages 20000] [--sizes 0,1000,5000]
+
+`--sizes` adds that many synthetic keywords to every rule set, to show how
+each approach scales as the keyword lists grow.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from intent_classifier import IntentClassifier, DEFAULT_RULES
+
+_MESSAGES = [
+    "What are your timings?", "kitna fees hai monthly?", "book now please",
+    "Mujhe kal appointment chahiye", "how much is the annual plan", "tell me about yoga",
+    "haan book kar do", "Kya ladies ke liye alag section hai?", "i want to book a trial",
+    "EMI available hai?", "personal training ka rate batao", "schedule an appointment for monday",
+    "Do you have parking", "abhi book karo", "what's included in premium package",
+    "Hello", "physiotherapy session cost", "slot chahiye shaam ka", "explain the process",
+    "mera naam Rahul hai, milna hai", "any student discount on basic plan",
+]
+
+
+def linear_classify(message: str, rules: dict) -> dict:
+    """The previous implementation: one substring scan per keyword, per rule set."""
+    msg = message.lower().strip()
+    booking = (not msg.endswith("?")
+               and not any(q in msg for q in rules["question"])
+               and any(k in msg for k in rules["booking"]))
+    if booking:
+        intent = "booking"
+    elif any(k in msg for k in rules["pricing"]):
+        intent = "pricing"
+    else:
+        intent = "query"
+    return {"intent": intent, "booking_triggered": booking}
+
+
+def grow_rules(extra: int, rng: random.Random) -> dict:
+    def word():
+        return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 10)))
+    return {label: kws + [f"{word()} {word()}" for _ in range(extra)]
+            for label, kws in DEFAULT_RULES.items()}
+
+
+def bench(fn, corpus) -> float:
+    start = time.perf_counter()
+    for m in corpus:
+        fn(m)
+    return (time.perf_counter() - start) / len(corpus) * 1e6   # µs / message
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=20000)
+    ap.add_argument("--sizes", default="0,100,1000,5000")
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args()
+
+    rng    = random.Random(42)
+    corpus = [rng.choice(_MESSAGES) for _ in range(args.messages)]
+    results = []
+
+    print(f"{'extra kw/set':>12} | {'linear µs/msg':>13} | {'compiled µs/msg':>15} | speedup")
+    for extra in (int(x) for x in args.sizes.split(",")):
+        rules      = grow_rules(extra, rng)
+        compiled   = IntentClassifier(rules)
+        assert all(compiled.classify(m) == linear_classify(m, rules) for m in _MESSAGES)
+        linear_us   = bench(lambda m: linear_classify(m, rules), corpus)
+        compiled_us = bench(compiled.classify, corpus)
+        results.append({"extra_keywords": extra, "linear_us": round(linear_us, 3),
+                        "compiled_us": round(compiled_us, 3)})
+        print(f"{extra:>12} | {linear_us:>13.2f} | {compiled_us:>15.2f} | {linear_us / compiled_us:6.1f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
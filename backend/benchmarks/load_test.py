@@ -0,0 +1,367 @@
+"""
+load_test.py – Throughput / latency benchmark for the FastAPI backend.
+
+Runs main.py's app under uvicorn on a local port with FakeChatGroq in place of
+the Groq client (configurable latency + token rate, no network), drives the
+chat, streaming chat, ingest and booking endpoints at a given concurrency and
+reports p50/p95/p99 latency, requests/second and a per-stage breakdown of
+the chat pipeline. Results are written as JSON so runs can be compared
+between commits.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 16 --requests 400 --out bench.json
+    python benchmarks/load_test.py --scenarios chat --llm-latency 0.5 --compare bench.json
+    python benchmarks/load_test.py --fake-embeddings     # no ONNX model download either
+    python benchmarks/load_test.py --llm-slow-rate 0.05 --llm-slow-latency 4 --hedge   # tail latency
+
+All state (Chroma, bookings, caches) goes to a temporary directory.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import hashlib
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SCENARIOS = ["chat", "chat_stream", "ingest", "booking"]
+
+_MESSAGES = [
+    "What are your timings?", "kitna fees hai monthly?", "Do you offer diet plans?",
+    "Kya ladies ke liye alag section hai?", "how much is the annual plan", "tell me about yoga",
+    "EMI available hai?", "personal training ka rate batao", "What equipment do you have?",
+    "any student discount on basic plan", "Who are your trainers?", "Sunday timings kya hai?",
+]
+
+# Per-stage samples (seconds), filled by the wrappers installed in instrument()
+STAGES: dict = defaultdict(list)
+
+
+# ─── Setup ───────────────────────────────────────────────────
+def isolate_state(tmp: str, answer_cache: bool):
+    """Point every on-disk store at a scratch directory before the app is imported."""
+    os.environ.update({
+        "CHROMA_PERSIST_DIR":   os.path.join(tmp, "chroma"),
+        "BOOKINGS_DB_PATH":     os.path.join(tmp, "bookings.db"),
+        "EMBED_CACHE_PATH":     os.path.join(tmp, "embed_cache.sqlite3"),
+        "SESSION_DB_PATH":      os.path.join(tmp, "sessions.sqlite3"),
+        "CRAWL_STATE_PATH":     os.path.join(tmp, "crawl_state.sqlite3"),
+        "INTENT_RULES_PATH":    os.path.join(tmp, "intent_rules.json"),
+        "ANSWER_CACHE_ENABLED": "1" if answer_cache else "0",
+        "GROQ_API_KEY":         os.environ.get("GROQ_API_KEY", "bench"),
+    })
+
+
+def use_fake_embeddings():
+    """Swap the ONNX model for a deterministic bag-of-words hash embedding (384-d)."""
+    import numpy as np
+    import chromadb.utils.embedding_functions as ef
+
+    class HashEmbeddingFunction:
+        def __call__(self, texts):
+            out = []
+            for t in texts:
+                v = np.zeros(384, dtype=np.float32)
+                for w in t.lower().split():
+                    v[int(hashlib.md5(w.encode()).hexdigest(), 16) % 384] += 1.0
+                n = np.linalg.norm(v)
+                out.append(v / n if n else v)
+            return out
+
+    ef.ONNXMiniLM_L6_V2 = HashEmbeddingFunction
+
+
+def _record(stage: str, started: float):
+    STAGES[stage].append(time.perf_counter() - started)
+
+
+def instrument(rag):
+    """Wrap the chat pipeline's stages with timers (benchmark-local, no app changes)."""
+    embed = rag.query_batcher.embed
+
+    async def timed_embed(text):
+        t = time.perf_counter()
+        try:
+            return await embed(text)
+        finally:
+            _record("embed_query", t)
+    rag.query_batcher.embed = timed_embed
+
+    search = rag.vectorstore.similarity_search_by_vector
+
+    def timed_search(*a, **kw):
+        t = time.perf_counter()
+        try:
+            return search(*a, **kw)
+        finally:
+            _record("vector_search", t)
+    rag.vectorstore.similarity_search_by_vector = timed_search
+
+    prepare = rag._prepare
+
+    async def timed_prepare(*a, **kw):
+        t = time.perf_counter()
+        try:
+            return await prepare(*a, **kw)
+        finally:
+            _record("prepare_total", t)
+    rag._prepare = timed_prepare
+
+    llm = rag.llm
+    generate, agenerate = llm._generate, llm._agenerate
+
+    def timed_generate(*a, **kw):
+        t = time.perf_counter()
+        try:
+            return generate(*a, **kw)
+        finally:
+            _record("llm", t)
+
+    async def timed_agenerate(*a, **kw):
+        t = time.perf_counter()
+        try:
+            return await agenerate(*a, **kw)
+        finally:
+            _record("llm", t)
+    object.__setattr__(llm, "_generate", timed_generate)
+    object.__setattr__(llm, "_agenerate", timed_agenerate)
+
+
+def start_server(app) -> tuple:
+    import uvicorn
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+# ─── Scenarios ───────────────────────────────────────────────
+async def sc_chat(client, i: int) -> dict:
+    r = await client.post("/api/chat", json={
+        "message": _MESSAGES[i % len(_MESSAGES)], "session_id": f"bench-{i % 64}",
+    })
+    return {"ok": r.status_code == 200}
+
+
+async def sc_chat_stream(client, i: int) -> dict:
+    t0, ttft = time.perf_counter(), None
+    async with client.stream("POST", "/api/chat/stream", json={
+        "message": _MESSAGES[i % len(_MESSAGES)], "session_id": f"bench-s-{i % 64}",
+    }) as r:
+        async for line in r.aiter_lines():
+            if ttft is None and line == "event: token":
+                ttft = time.perf_counter() - t0
+    return {"ok": r.status_code == 200, "ttft": ttft}
+
+
+async def sc_ingest(client, i: int) -> dict:
+    text = f"Bench document {i}. " + " ".join(random.choice(_MESSAGES) for _ in range(40))
+    r = await client.post("/api/ingest/text", params={"text": text, "source": f"bench-{i}"})
+    if r.status_code != 202:
+        return {"ok": False}
+    job_id = r.json()["job_id"]
+    while True:
+        job = (await client.get(f"/api/ingest/jobs/{job_id}")).json()
+        if job["status"] in ("done", "failed"):
+            return {"ok": job["status"] == "done"}
+        await asyncio.sleep(0.02)
+
+
+async def sc_booking(client, i: int) -> dict:
+    if i % 2 == 0:
+        r = await client.post("/api/book", json={
+            "name": f"Lead {i}", "phone": f"98765{i:05d}", "service": "Personal Training",
+        })
+    else:
+        r = await client.get("/api/bookings", params={"limit": 50})
+    return {"ok": r.status_code == 200}
+
+
+_RUNNERS = {"chat": sc_chat, "chat_stream": sc_chat_stream,
+            "ingest": sc_ingest, "booking": sc_booking}
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {}
+    s = sorted(samples)
+
+    def p(q):
+        return round(s[min(len(s) - 1, int(q * len(s)))] * 1000, 2)
+    return {"p50_ms": p(0.50), "p95_ms": p(0.95), "p99_ms": p(0.99),
+            "mean_ms": round(sum(s) / len(s) * 1000, 2), "max_ms": round(s[-1] * 1000, 2)}
+
+
+async def run_scenario(base_url: str, name: str, n_requests: int, concurrency: int) -> dict:
+    import httpx
+    runner = _RUNNERS[name]
+    latencies, ttfts, errors = [], [], 0
+    counter = iter(range(n_requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                t = time.perf_counter()
+                try:
+                    res = await runner(client, i)
+                except Exception:
+                    res = {"ok": False}
+                latencies.append(time.perf_counter() - t)
+                errors += 0 if res["ok"] else 1
+                if res.get("ttft") is not None:
+                    ttfts.append(res["ttft"])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    result = {"requests": n_requests, "errors": errors, "seconds": round(wall, 3),
+              "rps": round(n_requests / wall, 2), "latency": percentiles(latencies)}
+    if ttfts:
+        result["time_to_first_token"] = percentiles(ttfts)
+    return result
+
+
+# ─── Reporting ───────────────────────────────────────────────
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(__file__), text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_report(results: dict, baseline: dict = None):
+    print(f"\n{'scenario':<12} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, r in results["scenarios"].items():
+        lat = r["latency"]
+        line = f"{name:<12} {r['rps']:>8.1f} {lat['p50_ms']:>9.1f} {lat['p95_ms']:>9.1f} " \
+               f"{lat['p99_ms']:>9.1f} {r['errors']:>7}"
+        old = (baseline or {}).get("scenarios", {}).get(name)
+        if old:
+            def delta(new, prev):
+                return f"{(new - prev) / prev * 100:+.0f}%" if prev else "n/a"
+            line += f"   vs {baseline.get('commit', '?')}: rps {delta(r['rps'], old['rps'])}, " \
+                    f"p95 {delta(lat['p95_ms'], old['latency']['p95_ms'])}"
+        print(line)
+        if "time_to_first_token" in r:
+            t = r["time_to_first_token"]
+            print(f"{'  └ TTFT':<12} {'':>8} {t['p50_ms']:>9.1f} {t['p95_ms']:>9.1f} {t['p99_ms']:>9.1f}")
+
+    print(f"\n{'stage':<16} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, st in results["stages"].items():
+        print(f"{stage:<16} {st['count']:>7} {st['p50_ms']:>9.2f} {st['p95_ms']:>9.2f} {st['p99_ms']:>9.2f}")
+
+    llm = results.get("llm")
+    if llm:
+        print(f"\nLLM dispatcher: {llm['requests']} requests, {llm['hedged']} hedged, "
+              f"{llm['fallbacks']} fallbacks")
+        for p in llm["providers"]:
+            print(f"  {p['name']:<14} calls {p['calls']:>5}  wins {p['wins']:>5}  "
+                  f"429s {p['rate_limited']:>4}  cancelled {p['cancelled']:>4}")
+
+    hist = results.get("history")
+    if hist:
+        print(f"\nHistory: {hist['avg_history_tokens']} tokens/prompt "
+              f"(uncompacted {hist['avg_baseline_tokens']}), {hist['summaries']} summaries, "
+              f"{hist['failures']} failed, {hist['avg_summary_ms']} ms avg")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    ap.add_argument("--llm-latency", type=float, default=0.3, help="fake LLM time to first token (s)")
+    ap.add_argument("--llm-tps", type=float, default=250.0, help="fake LLM tokens per second")
+    ap.add_argument("--llm-tokens", type=int, default=128, help="fake LLM answer length (tokens)")
+    ap.add_argument("--llm-slow-rate", type=float, default=0.0, help="share of fake LLM calls that are slow")
+    ap.add_argument("--llm-slow-latency", type=float, default=3.0, help="first-token latency of slow calls (s)")
+    ap.add_argument("--llm-429-rate", type=float, default=0.0, help="share of fake LLM calls that return 429")
+    ap.add_argument("--hedge", action="store_true", help="add a second fake provider for hedged requests")
+    ap.add_argument("--answer-cache", action="store_true", help="keep the semantic answer cache on")
+    ap.add_argument("--fake-embeddings", action="store_true", help="hash embeddings instead of ONNX")
+    ap.add_argument("--out", help="write JSON results here")
+    ap.add_argument("--compare", help="baseline JSON from an earlier run")
+    args = ap.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        ap.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    tmp = tempfile.mkdtemp(prefix="sales-agent-bench-")
+    isolate_state(tmp, args.answer_cache)
+    if args.fake_embeddings:
+        use_fake_embeddings()
+
+    import main as app_main
+    from seed_data import BUSINESS_INFO
+    from benchmarks.fake_llm import FakeChatGroq
+    from llm_dispatcher import LLMProvider
+
+    def fake_llm():
+        return FakeChatGroq(latency=args.llm_latency, tokens_per_second=args.llm_tps,
+                            max_tokens=args.llm_tokens, slow_rate=args.llm_slow_rate,
+                            slow_latency=args.llm_slow_latency, rate_limit_rate=args.llm_429_rate)
+
+    rag = app_main.rag_engine.get()   # waits for warm-up
+    rag.llm = fake_llm()
+    rag.dispatcher.providers[1:] = [LLMProvider("hedge", fake_llm())] if args.hedge else []
+    rag.summary_dispatcher.primary.llm = fake_llm()   # history summaries have their own client
+    real = [p.name for p in rag.dispatcher.providers + rag.summary_dispatcher.providers
+            if not isinstance(p.llm, FakeChatGroq)]
+    if real:
+        raise SystemExit(f"❌ Real LLM providers left in the benchmark: {', '.join(real)}")
+    rag.add_documents(app_main.doc_loader.ingest_raw_text(BUSINESS_INFO, source_name="business_info"))
+    instrument(rag)
+
+    server, thread, base_url = start_server(app_main.app)
+    print(f"🏁 Benchmark against {base_url} (state in {tmp})")
+
+    results = {"commit": git_commit(), "timestamp": time.time(), "config": vars(args),
+               "scenarios": {}, "stages": {}}
+    try:
+        for name in scenarios:
+            print(f"  ▶ {name}: {args.requests} requests @ concurrency {args.concurrency}")
+            results["scenarios"][name] = asyncio.run(
+                run_scenario(base_url, name, args.requests, args.concurrency)
+            )
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    results["stages"] = {stage: {"count": len(v), **percentiles(v)} for stage, v in STAGES.items()}
+    results["llm"]     = rag.dispatcher.stats()
+    results["history"] = rag.history.stats()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
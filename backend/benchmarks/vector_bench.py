@@ -0,0 +1,141 @@
+"""
+vector_bench.py – Micro-benchmark: Chroma (HNSW) vs the in-process NumPy
+vector store (float32 and int8) for similarity_search_by_vector, at several
+corpus sizes.
+
+Usage:
+    python benchmarks/vector_bench.py [--sizes 1000,5000,20000,100000] [--queries 300]
+
+Vectors are random 384-d points drawn around a few hundred cluster centres
+(closer to real chunk embeddings than uniform noise), so no embedding model is
+needed. Recall@k is measured against an exact float32 search.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import chromadb
+from chromadb.config import Settings
+from langchain_chroma import Chroma
+
+from numpy_store import NumpyVectorStore
+
+DIM = 384
+
+
+class _NoEmbeddings:
+    """The benchmark only passes precomputed vectors; any call to embed text is a bug in it."""
+    def embed_documents(self, texts):
+        raise RuntimeError("vector_bench only takes precomputed vectors; it never embeds documents")
+
+    def embed_query(self, text):
+        raise RuntimeError("vector_bench only takes precomputed vectors; it never embeds queries")
+
+
+def make_corpus(n: int, rng: np.random.Generator) -> np.ndarray:
+    centres = rng.standard_normal((max(8, n // 50), DIM)).astype(np.float32)
+    points  = centres[rng.integers(0, len(centres), n)] + 0.6 * rng.standard_normal((n, DIM)).astype(np.float32)
+    return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+
+def build_chroma(path: str, vectors: np.ndarray, texts, ids):
+    client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+    store  = Chroma(client=client, collection_name="bench", embedding_function=_NoEmbeddings())
+    step   = client.get_max_batch_size()
+    for i in range(0, len(ids), step):
+        store._collection.add(ids=ids[i:i + step], embeddings=vectors[i:i + step],
+                              documents=texts[i:i + step],
+                              metadatas=[{"source": "bench"}] * len(ids[i:i + step]))
+    return store
+
+
+def build_numpy(path: str, vectors: np.ndarray, texts, ids, dtype: str):
+    store = NumpyVectorStore("bench", _NoEmbeddings(), persist_directory=path, dtype=dtype)
+    step  = 5000
+    for i in range(0, len(ids), step):
+        store.add_vectors(vectors[i:i + step], texts[i:i + step],
+                          [{"source": "bench"}] * len(ids[i:i + step]), ids[i:i + step])
+    return store
+
+
+def run_queries(store, queries, k: int):
+    latencies, results = [], []
+    for q in queries:
+        q = q.tolist()
+        start = time.perf_counter()
+        docs  = store.similarity_search_by_vector(q, k=k)
+        latencies.append(time.perf_counter() - start)
+        results.append([d.page_content for d in docs])
+    return np.array(latencies) * 1000, results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,5000,20000,100000")
+    ap.add_argument("--queries", type=int, default=300)
+    ap.add_argument("--k", type=int, default=12)
+    ap.add_argument("--backends", default="chroma,numpy,numpy-int8")
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args()
+
+    rng      = np.random.default_rng(42)
+    backends = args.backends.split(",")
+    results  = []
+
+    print(f"{'chunks':>7} | {'backend':<10} | {'build s':>7} | {'p50 ms':>7} | {'p95 ms':>7} | "
+          f"{'qps':>7} | {'recall':>6} | {'vectors MB':>10}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        vectors = make_corpus(n, rng)
+        texts   = [f"chunk {i}" for i in range(n)]
+        ids     = [f"c{i}" for i in range(n)]
+        queries = vectors[rng.integers(0, n, args.queries)] + 0.3 * rng.standard_normal((args.queries, DIM))
+        exact   = [[texts[i] for i in np.argsort(-(vectors @ q))[:args.k]] for q in queries.astype(np.float32)]
+
+        for backend in backends:
+            workdir = tempfile.mkdtemp(prefix="vector_bench_")
+            try:
+                start = time.perf_counter()
+                if backend == "chroma":
+                    store, memory = build_chroma(workdir, vectors, texts, ids), None
+                else:
+                    store  = build_numpy(workdir, vectors, texts, ids,
+                                         "int8" if backend == "numpy-int8" else "float32")
+                    memory = store.memory_bytes() / 1e6
+                build = time.perf_counter() - start
+
+                run_queries(store, queries[:20], args.k)   # warm caches / load the HNSW index
+                latencies, found = run_queries(store, queries, args.k)
+                recall = np.mean([len(set(f) & set(e)) / args.k for f, e in zip(found, exact)])
+                row = {
+                    "chunks":     n,
+                    "backend":    backend,
+                    "build_s":    round(build, 3),
+                    "p50_ms":     round(float(np.percentile(latencies, 50)), 3),
+                    "p95_ms":     round(float(np.percentile(latencies, 95)), 3),
+                    "qps":        round(1000 / float(latencies.mean()), 1),
+                    "recall":     round(float(recall), 4),
+                    "vectors_mb": round(memory, 2) if memory is not None else None,
+                }
+                results.append(row)
+                mb = f"{row['vectors_mb']:.2f}" if memory is not None else "-"
+                print(f"{n:>7} | {backend:<10} | {row['build_s']:>7.2f} | {row['p50_ms']:>7.3f} | "
+                      f"{row['p95_ms']:>7.3f} | {row['qps']:>7.0f} | {row['recall']:>6.3f} | {mb:>10}")
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# ============================================================
+#  Context Builder – pack retrieved chunks into the prompt up to
+#  a token budget, dropping near-duplicates and trimming the
+#  overlap the text splitter leaves between neighbouring chunks
+# ============================================================
+
+import os
+import re
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+# ─── Config ─────────────────────────────────────────────────
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "600"))    # ≈ the old top-4 chunks
+RETRIEVAL_FETCH_K    = int(os.getenv("RETRIEVAL_FETCH_K", "12"))       # candidates over-fetched
+DEDUP_THRESHOLD      = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.8"))  # shingle containment
+BASELINE_K           = 4       # what the prompt used to get: top-4 chunks, unchanged
+SHINGLE_SIZE         = 5       # words per shingle
+MIN_OVERLAP_CHARS    = 20
+MAX_OVERLAP_CHARS    = 200
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+EMPTY_CONTEXT = "No specific business information found for this query."
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars/token for English, close enough for Hinglish)."""
+    return (len(text) + 3) // 4
+
+
+def _shingles(text: str) -> set:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _trim_overlap(text: str, selected: List[str]) -> str:
+    """Strip a leading prefix / trailing suffix that repeats the edge of an already selected chunk."""
+    for prev in selected:
+        limit = min(MAX_OVERLAP_CHARS, len(prev), len(text))
+        for k in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+            if prev.endswith(text[:k]):
+                text = text[k:].lstrip()
+                break
+        limit = min(MAX_OVERLAP_CHARS, len(prev), len(text))
+        for k in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+            if prev.startswith(text[-k:]):
+                text = text[:-k].rstrip()
+                break
+    return text
+
+
+def build_context(docs: List[Document], budget: int = CONTEXT_TOKEN_BUDGET) -> Tuple[str, List[Document], dict]:
+    """
+    `docs` are retrieval candidates in relevance order. Returns the context
+    string, the documents actually used and token stats vs. the old top-4 join.
+    """
+    baseline = estimate_tokens("\n\n".join(d.page_content for d in docs[:BASELINE_K]))
+    seen: set = set()
+    parts: List[str] = []
+    used: List[Document] = []
+    tokens = 0
+    dropped = 0
+
+    for doc in docs:
+        shingles = _shingles(doc.page_content)
+        if shingles and len(shingles & seen) / len(shingles) >= DEDUP_THRESHOLD:
+            dropped += 1
+            continue
+        text = _trim_overlap(doc.page_content.strip(), parts)
+        if not text:
+            dropped += 1
+            continue
+        cost = estimate_tokens(text) + (1 if parts else 0)   # "\n\n" separator
+        if tokens + cost > budget:
+            continue   # a smaller, later candidate may still fit
+        parts.append(text)
+        used.append(doc)
+        seen |= shingles
+        tokens += cost
+
+    context = "\n\n".join(parts) if parts else EMPTY_CONTEXT
+    return context, used, {
+        "candidates":         len(docs),
+        "chunks_used":        len(used),
+        "duplicates_dropped": dropped,
+        "context_tokens":     tokens,
+        "baseline_tokens":    baseline,
+        "tokens_saved":       baseline - tokens,
+    }
@@ -0,0 +1,210 @@
+# ============================================================
+#  Site Crawler – async, pooled-connection crawl of a business
+#  website with conditional GETs (ETag / Last-Modified), so a
+#  recrawl only downloads and re-embeds pages that changed.
+# ============================================================
+
+import os
+import re
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urljoin, urldefrag, urlparse
+
+import httpx
+from bs4 import BeautifulSoup
+
+from metrics import timed
+
+# ─── Config ─────────────────────────────────────────────────
+CRAWL_STATE_PATH  = os.getenv("CRAWL_STATE_PATH", "/tmp/crawl_state.sqlite3")
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+CRAWL_MAX_PAGES   = int(os.getenv("CRAWL_MAX_PAGES", "200"))
+CRAWL_MAX_DEPTH   = int(os.getenv("CRAWL_MAX_DEPTH", "3"))
+USER_AGENT        = "Mozilla/5.0 (compatible; SalesAgentBot/1.0)"
+
+_SKIP_EXT = re.compile(
+    r"\.(pdf|jpe?g|png|gif|svg|webp|ico|css|js|json|xml|zip|gz|mp4|mp3|woff2?|ttf)$", re.I
+)
+
+
+class CrawlState:
+    """Per-URL validators and outgoing links, so unchanged pages can still be followed."""
+
+    def __init__(self, path: str = CRAWL_STATE_PATH):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url           TEXT PRIMARY KEY,"
+            " etag          TEXT,"
+            " last_modified TEXT,"
+            " links         TEXT NOT NULL DEFAULT '[]',"
+            " fetched_at    REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, links FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "links": json.loads(row[2])}
+
+    def put_many(self, pages: dict):
+        """{url: (etag, last_modified, links)} in one transaction."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, links, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(url, etag, lm, json.dumps(links), now) for url, (etag, lm, links) in pages.items()],
+            )
+
+
+def _normalize(url: str) -> str:
+    return urldefrag(url)[0].rstrip("/") or url
+
+
+def _extract_links(soup: BeautifulSoup, base_url: str, host: str) -> list:
+    links = set()
+    for a in soup.find_all("a", href=True):
+        url = _normalize(urljoin(base_url, a["href"]))
+        parsed = urlparse(url)
+        if parsed.scheme in ("http", "https") and parsed.netloc == host \
+                and not _SKIP_EXT.search(parsed.path):
+            links.add(url)
+    return sorted(links)
+
+
+class SiteCrawler:
+    """
+    Breadth-first crawl from `start_url` (optionally seeded from /sitemap.xml),
+    limited to the start URL's host, `max_depth` link hops and `max_pages` pages.
+
+    `on_page(url, soup)` is awaited for every page that was downloaded (200);
+    pages answering 304 Not Modified are skipped but their stored links are followed.
+    `is_indexed(url)` lets the caller force a full GET when a page's content
+    is no longer in the vector store (e.g. after a reset).
+
+    Validators of downloaded pages are held back until commit(), which the
+    caller runs once the pages' chunks are written: if ingestion fails midway,
+    the next crawl downloads those pages again instead of getting a 304.
+    """
+
+    def __init__(self, state: CrawlState, concurrency: int = CRAWL_CONCURRENCY,
+                 max_pages: int = CRAWL_MAX_PAGES, max_depth: int = CRAWL_MAX_DEPTH,
+                 is_indexed: Optional[Callable[[str], bool]] = None):
+        self.state       = state
+        self.concurrency = max(1, concurrency)
+        self.max_pages   = max_pages
+        self.max_depth   = max_depth
+        self.is_indexed  = is_indexed or (lambda url: True)
+        self.stats = {"fetched": 0, "not_modified": 0, "failed": 0, "skipped": 0}
+        self._fetched: dict[str, tuple] = {}   # url → (etag, last_modified, links), not yet committed
+
+    async def _sitemap_urls(self, client: httpx.AsyncClient, start_url: str, host: str) -> list:
+        root = f"{urlparse(start_url).scheme}://{host}/sitemap.xml"
+        urls, pending = [], [root]
+        for _ in range(2):   # sitemap index → sitemaps, one level deep
+            nested = []
+            for sm in pending:
+                try:
+                    resp = await client.get(sm)
+                    if resp.status_code != 200:
+                        continue
+                except httpx.HTTPError:
+                    continue
+                for loc in re.findall(r"<loc>\s*(.*?)\s*</loc>", resp.text, re.S):
+                    (nested if loc.endswith(".xml") else urls).append(loc)
+            pending = nested
+        return [_normalize(u) for u in urls if urlparse(u).netloc == host]
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str, host: str,
+                     on_page: Callable[[str, BeautifulSoup], Awaitable[None]]) -> list:
+        """Returns the page's outgoing same-host links."""
+        prev    = self.state.get(url)
+        headers = {}
+        if prev and self.is_indexed(url):
+            if prev["etag"]:
+                headers["If-None-Match"] = prev["etag"]
+            if prev["last_modified"]:
+                headers["If-Modified-Since"] = prev["last_modified"]
+
+        try:
+            with timed("crawl_fetch"):
+                resp = await client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            self.stats["failed"] += 1
+            print(f"  ⚠️  Crawl failed: {url} ({e})")
+            return []
+
+        if resp.status_code == 304 and prev:
+            self.stats["not_modified"] += 1
+            return prev["links"]
+        if resp.status_code != 200 or "html" not in resp.headers.get("content-type", ""):
+            self.stats["skipped"] += 1
+            return []
+
+        soup  = BeautifulSoup(resp.text, "html.parser")
+        links = _extract_links(soup, str(resp.url), host)
+        await on_page(url, soup)
+        self._fetched[url] = (resp.headers.get("etag"), resp.headers.get("last-modified"), links)
+        self.stats["fetched"] += 1
+        return links
+
+    async def crawl(self, start_url: str,
+                    on_page: Callable[[str, BeautifulSoup], Awaitable[None]],
+                    use_sitemap: bool = False) -> dict:
+        start_url = _normalize(start_url)
+        host      = urlparse(start_url).netloc
+        limits    = httpx.Limits(max_connections=self.concurrency,
+                                 max_keepalive_connections=self.concurrency)
+
+        async with httpx.AsyncClient(limits=limits, timeout=15, follow_redirects=True,
+                                     headers={"User-Agent": USER_AGENT}) as client:
+            queue: asyncio.Queue = asyncio.Queue()
+            seen = {start_url}
+            queue.put_nowait((start_url, 0))
+            if use_sitemap:
+                for url in await self._sitemap_urls(client, start_url, host):
+                    if url not in seen and len(seen) < self.max_pages:
+                        seen.add(url)
+                        queue.put_nowait((url, 0))
+
+            async def worker():
+                while True:
+                    url, depth = await queue.get()
+                    try:
+                        links = await self._fetch(client, url, host, on_page)
+                        if depth < self.max_depth:
+                            for link in links:
+                                if link not in seen and len(seen) < self.max_pages:
+                                    seen.add(link)
+                                    queue.put_nowait((link, depth + 1))
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        print(f"  ⚠️  Crawl failed: {url} ({e})")
+                    finally:
+                        queue.task_done()
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            await queue.join()
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return dict(self.stats, pages_seen=len(seen))
+
+    def commit(self):
+        """Stores the downloaded pages' validators – call after their chunks are committed."""
+        if self._fetched:
+            self.state.put_many(self._fetched)
+            self._fetched = {}
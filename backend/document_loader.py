@@ -3,15 +3,26 @@
 # ============================================================
 
 import io
+import os
 import re
+import json
+import queue
+import zipfile
+import asyncio
 import requests
-from typing import List
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 from bs4 import BeautifulSoup
 
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pypdf import PdfReader
 
+from crawler import SiteCrawler, CrawlState
+from metrics import timed
+
 # ─── Splitter Config ─────────────────────────────────────────
 CHUNK_SIZE    = 600
 CHUNK_OVERLAP = 80
@@ -23,23 +34,122 @@ splitter = RecursiveCharacterTextSplitter(
 )
 
 
+# ─── Parallel PDF Extraction Config ──────────────────────────
+PDF_WORKERS            = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_PAGES_PER_TASK     = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))  # smaller PDFs stay in-process
+
+# ─── Bulk Upload Config ──────────────────────────────────────
+BULK_EXTENSIONS     = (".pdf", ".txt", ".md", ".html", ".htm")   # also inside .zip archives
+BULK_MAX_UNZIPPED_MB = int(os.getenv("BULK_MAX_UNZIPPED_MB", "500"))   # zip-bomb guard, per archive
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # "spawn" – forking a threaded server process is unsafe
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS,
+                                    mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+# Reused across ingest_url calls (keep-alive connection pool)
+_http = requests.Session()
+_http.headers["User-Agent"] = "Mozilla/5.0 (compatible; SalesAgentBot/1.0)"
+
+
+def _html_to_text(soup: BeautifulSoup) -> str:
+    # Remove noise
+    for tag in soup(["script", "style", "nav", "footer", "header", "aside", "form"]):
+        tag.decompose()
+
+    text = soup.get_text(separator="\n")
+    # Collapse excessive whitespace
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = re.sub(r" {2,}", " ", text)
+    return text.strip()
+
+
 def _split(text: str, metadata: dict) -> List[Document]:
     chunks = splitter.split_text(text)
     return [Document(page_content=c, metadata=metadata) for c in chunks if c.strip()]
 
 
+def _split_pages(reader: PdfReader, start: int, end: int) -> List[tuple]:
+    """Extract + split pages [start, end) → [(page_number, [chunk, ...]), ...]."""
+    out = []
+    for page_num in range(start, min(end, len(reader.pages))):
+        text = reader.pages[page_num].extract_text() or ""
+        chunks = [c for c in splitter.split_text(f"[Page {page_num + 1}]\n{text}") if c.strip()]
+        out.append((page_num + 1, chunks))
+    return out
+
+
+def _extract_pages(pdf_bytes: bytes, start: int, end: int) -> List[tuple]:
+    """Worker: one page range of an in-memory PDF."""
+    return _split_pages(PdfReader(io.BytesIO(pdf_bytes)), start, end)
+
+
+def _extract_file(path: str) -> List[tuple]:
+    """Worker: every page of a PDF file."""
+    reader = PdfReader(path)
+    return _split_pages(reader, 0, len(reader.pages))
+
+
+def _text_file_docs(name: str, data: bytes, source_name: str) -> List[Document]:
+    """.txt / .md as plain text, .html / .htm with the same cleanup as scraped pages."""
+    text = data.decode("utf-8", errors="replace")
+    if name.lower().endswith((".html", ".htm")):
+        return _split(_html_to_text(BeautifulSoup(text, "html.parser")), {"source": source_name, "type": "html"})
+    return _split(text, {"source": source_name, "type": "text"})
+
+
+def _page_docs(pages: List[tuple], source_name: str) -> Iterator[Document]:
+    for page, chunks in pages:
+        meta = {"source": source_name, "type": "pdf", "page": page}
+        for c in chunks:
+            yield Document(page_content=c, metadata=dict(meta))
+
+
 class DocumentLoader:
 
     # ── PDF ──────────────────────────────────────────────────
+    def iter_pdf_chunks(self, pdf_bytes: bytes, source_name: str = "pdf",
+                        parallel: Optional[bool] = None) -> Iterator[Document]:
+        """
+        Yield chunks page by page (each with a `page` number in metadata), so
+        embedding can start before extraction finishes. Large PDFs are spread
+        across a process pool in page ranges; results still arrive in page order.
+        """
+        reader  = PdfReader(io.BytesIO(pdf_bytes))
+        n_pages = len(reader.pages)
+        if parallel is None:
+            parallel = PDF_WORKERS > 1 and n_pages >= PDF_PARALLEL_MIN_PAGES
+
+        if not parallel:
+            for start in range(0, n_pages, PDF_PAGES_PER_TASK):
+                with timed("pdf_extract"):
+                    pages = _split_pages(reader, start, start + PDF_PAGES_PER_TASK)
+                yield from _page_docs(pages, source_name)
+            return
+
+        pool = _get_pool()
+        futures = [pool.submit(_extract_pages, pdf_bytes, start, start + PDF_PAGES_PER_TASK)
+                   for start in range(0, n_pages, PDF_PAGES_PER_TASK)]
+        try:
+            for fut in futures:
+                with timed("pdf_extract_wait"):   # time blocked on the pool, not pool CPU time
+                    pages = fut.result()
+                yield from _page_docs(pages, source_name)
+        finally:
+            for fut in futures:
+                fut.cancel()
+
     def ingest_pdf_bytes(self, pdf_bytes: bytes, source_name: str = "pdf") -> List[Document]:
         """Parse a PDF from raw bytes (uploaded via API)."""
-        reader = PdfReader(io.BytesIO(pdf_bytes))
-        full_text = ""
-        for page_num, page in enumerate(reader.pages):
-            text = page.extract_text() or ""
-            full_text += f"\n[Page {page_num + 1}]\n{text}"
-
-        return _split(full_text, {"source": source_name, "type": "pdf"})
+        return list(self.iter_pdf_chunks(pdf_bytes, source_name))
 
     def ingest_pdf_path(self, path: str) -> List[Document]:
         """Parse a PDF from a local file path."""
@@ -52,38 +162,173 @@ class DocumentLoader:
         Scrape a webpage and extract meaningful text.
         Works for blogs, pricing pages, about-us pages, etc.
         """
-        headers = {"User-Agent": "Mozilla/5.0 (compatible; SalesAgentBot/1.0)"}
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
+        with timed("url_fetch"):
+            resp = _http.get(url, timeout=15)
+            resp.raise_for_status()
+
+        with timed("html_parse"):
+            soup = BeautifulSoup(resp.text, "html.parser")
+            return _split(_html_to_text(soup), {"source": url, "type": "webpage"})
+
+    def site_crawler(self, max_depth: Optional[int] = None, max_pages: Optional[int] = None,
+                     is_indexed: Optional[Callable[[str], bool]] = None) -> SiteCrawler:
+        """A crawler for iter_site_chunks(); keep it to commit() once ingestion succeeds."""
+        kwargs = {k: v for k, v in (("max_depth", max_depth), ("max_pages", max_pages)) if v is not None}
+        return SiteCrawler(CrawlState(), is_indexed=is_indexed, **kwargs)
+
+    def iter_site_chunks(self, start_url: str, crawler: SiteCrawler,
+                         use_sitemap: bool = False) -> Iterator[Document]:
+        """
+        Crawl a whole site (same host, link-following or sitemap-seeded) and
+        yield chunks page by page, each with the page URL as its source.
+        Unchanged pages (304 via stored ETag / Last-Modified) yield nothing.
+        The async crawl runs on its own thread; chunks stream through a bounded queue.
+        Call crawler.commit() once the chunks are written to save the pages' validators.
+        """
+        chunks: queue.Queue = queue.Queue(maxsize=256)
+        done, stop, result = object(), threading.Event(), {}
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+        def put(item):
+            # Blocks while the consumer is embedding; gives up once it has stopped reading
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+            raise RuntimeError("crawl cancelled")
 
-        # Remove noise
-        for tag in soup(["script", "style", "nav", "footer", "header", "aside", "form"]):
-            tag.decompose()
+        async def on_page(url: str, soup: BeautifulSoup):
+            with timed("html_parse"):
+                docs = _split(_html_to_text(soup), {"source": url, "type": "webpage"})
+            for d in docs:
+                await asyncio.to_thread(put, d)
 
-        text = soup.get_text(separator="\n")
-        # Collapse excessive whitespace
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        text = re.sub(r" {2,}", " ", text)
+        def run():
+            try:
+                result["stats"] = asyncio.run(crawler.crawl(start_url, on_page, use_sitemap))
+            except Exception as e:
+                result["error"] = e
+            finally:
+                if not stop.is_set():
+                    put(done)
 
-        return _split(text.strip(), {"source": url, "type": "webpage"})
+        threading.Thread(target=run, name="crawl", daemon=True).start()
+        try:
+            while (item := chunks.get()) is not done:
+                yield item
+        finally:
+            stop.set()
+
+        if "error" in result:
+            raise result["error"]
+        print(f"  🕸️  Crawled {start_url}: {result['stats']}")
 
     # ── Raw Text ─────────────────────────────────────────────
     def ingest_raw_text(self, text: str, source_name: str = "manual") -> List[Document]:
         """Index any raw text – FAQs, pricing tables, service descriptions."""
-        return _split(text, {"source": source_name, "type": "text"})
+        with timed("text_split"):
+            return _split(text, {"source": source_name, "type": "text"})
+
+    # ── Bulk Ingest (directories, uploads, archives) ─────────
+    def iter_paths(self, paths: Iterable[Tuple[str, str]], parallel: bool = True) -> Iterator[Document]:
+        """
+        (path, source_name) pairs → chunks. Text / HTML files are read in-process
+        while the PDFs are extracted on the process pool, one file per task.
+        """
+        paths = list(paths)
+        pdfs  = [(p, s) for p, s in paths if p.lower().endswith(".pdf")]
+        if not parallel or PDF_WORKERS <= 1 or len(pdfs) <= 1:
+            results = ((s, _extract_file(p)) for p, s in pdfs)
+        else:
+            pool    = _get_pool()
+            futures = {pool.submit(_extract_file, p): s for p, s in pdfs}
+            results = ((futures[f], f.result()) for f in as_completed(futures))
+
+        for path, source in paths:
+            if path.lower().endswith(".pdf"):
+                continue
+            with open(path, "rb") as f:
+                with timed("text_split"):
+                    docs = _text_file_docs(path, f.read(), source)
+            print(f"  📝 Loaded: {os.path.basename(path)} ({len(docs)} chunks)")
+            yield from docs
+
+        for source, pages in results:
+            docs = list(_page_docs(pages, source))
+            print(f"  📄 Loaded: {os.path.basename(source)} ({len(docs)} chunks)")
+            yield from docs
+
+    def iter_directory(self, dir_path: str, parallel: bool = True) -> Iterator[Document]:
+        """Recursively load every PDF / text / HTML file in a local directory."""
+        paths = sorted(os.path.join(root, fname)
+                       for root, _, files in os.walk(dir_path)
+                       for fname in files if fname.lower().endswith(BULK_EXTENSIONS))
+        yield from self.iter_paths(((p, p) for p in paths), parallel=parallel)
 
-    # ── Bulk Ingest (dir of PDFs) ────────────────────────────
     def ingest_directory(self, dir_path: str) -> List[Document]:
-        """Recursively load all PDFs from a local directory."""
-        import os
-        all_docs = []
-        for root, _, files in os.walk(dir_path):
-            for fname in files:
-                if fname.lower().endswith(".pdf"):
-                    full_path = os.path.join(root, fname)
-                    docs = self.ingest_pdf_path(full_path)
-                    all_docs.extend(docs)
-                    print(f"  📄 Loaded: {fname} ({len(docs)} chunks)")
-        return all_docs
+        """Recursively load every PDF / text / HTML file in a local directory."""
+        return list(self.iter_directory(dir_path))
+
+    def iter_upload_chunks(self, files: List[Tuple[str, bytes]]) -> Iterator[Document]:
+        """
+        Uploaded (filename, content) pairs → chunks. PDFs, text and HTML files,
+        and .zip archives of them (members become "archive.zip/path/in/zip").
+        Other file types are skipped with a warning.
+        """
+        for name, data in files:
+            lower = name.lower()
+            if lower.endswith(".zip"):
+                yield from self._iter_zip(name, data)
+            elif lower.endswith(".pdf"):
+                yield from self.iter_pdf_chunks(data, source_name=name)
+            elif lower.endswith(BULK_EXTENSIONS):
+                with timed("text_split"):
+                    docs = _text_file_docs(name, data, name)
+                yield from docs
+            else:
+                print(f"  ⚠️  Skipped unsupported file: {name}")
+
+    def _iter_zip(self, zip_name: str, data: bytes) -> Iterator[Document]:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            members = [m for m in archive.infolist()
+                       if not m.is_dir() and not m.filename.startswith("__MACOSX/")
+                       and m.filename.lower().endswith(BULK_EXTENSIONS)]
+            unzipped = sum(m.file_size for m in members)
+            if unzipped > BULK_MAX_UNZIPPED_MB * 1024 * 1024:
+                raise ValueError(f"{zip_name}: {unzipped // (1024 * 1024)} MB uncompressed "
+                                 f"exceeds BULK_MAX_UNZIPPED_MB={BULK_MAX_UNZIPPED_MB}")
+            for member in members:
+                yield from self.iter_upload_chunks([(f"{zip_name}/{member.filename}",
+                                                     archive.read(member))])
+
+    @staticmethod
+    def parse_ndjson(body: str) -> List[dict]:
+        """
+        NDJSON batch → records: one {"text", "source"?, "metadata"?} object per line.
+        Raises ValueError naming the first bad line.
+        """
+        records = []
+        for line_no, line in enumerate(body.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {line_no}: invalid JSON ({e.msg})")
+            if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+                raise ValueError(f'line {line_no}: expected an object with a "text" string')
+            if not isinstance(record.get("metadata", {}), dict):
+                raise ValueError(f'line {line_no}: "metadata" must be an object')
+            records.append(record)
+        return records
+
+    def iter_records(self, records: Iterable[dict], default_source: str = "batch") -> Iterator[Document]:
+        """Text records (see parse_ndjson) → chunks; extra metadata is kept on every chunk."""
+        for record in records:
+            metadata = {k: v for k, v in (record.get("metadata") or {}).items()
+                        if isinstance(v, (str, int, float, bool))}
+            metadata.update(source=record.get("source") or default_source, type="text")
+            with timed("text_split"):
+                docs = _split(record["text"], metadata)
+            yield from docs
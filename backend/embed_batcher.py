@@ -0,0 +1,104 @@
+# ============================================================
+#  Query Embedding Micro-Batcher
+#  Gathers embed_query calls arriving within a few ms into one
+#  ONNX inference and fans the vectors back out.
+# ============================================================
+
+import os
+import time
+import asyncio
+from collections import Counter
+
+# ─── Config ─────────────────────────────────────────────────
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_BATCH_MAX_SIZE  = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+
+
+class QueryEmbeddingBatcher:
+    """
+    Usage:  vector = await batcher.embed("what are your timings?")
+
+    The first call opens a batching window of `window_ms`; every call that
+    arrives before it closes (or until `max_size` is reached) is embedded in
+    the same `embed_documents` call on the executor.
+    """
+
+    def __init__(self, embeddings, window_ms: float = EMBED_BATCH_WINDOW_MS,
+                 max_size: int = EMBED_BATCH_MAX_SIZE, executor=None):
+        self.embeddings = embeddings
+        self.window     = window_ms / 1000.0
+        self.max_size   = max(1, max_size)
+        self.executor   = executor
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop = None
+
+        # Stats
+        self.batches     = 0
+        self.items       = 0
+        self.size_counts = Counter()
+        self.wait_total  = 0.0
+        self.wait_max    = 0.0
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop   = loop
+            self._queue  = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def embed(self, text: str) -> list[float]:
+        self._ensure_worker()
+        fut = self._loop.create_future()
+        await self._queue.put((text, fut, time.perf_counter()))
+        return await fut
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            texts   = [t for t, _, _ in batch]
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                wait = started - enqueued
+                self.wait_total += wait
+                self.wait_max    = max(self.wait_max, wait)
+            self.batches += 1
+            self.items   += len(batch)
+            self.size_counts[len(batch)] += 1
+
+            try:
+                vectors = await loop.run_in_executor(
+                    self.executor, self.embeddings.embed_documents, texts
+                )
+            except Exception as e:
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut, _), vec in zip(batch, vectors):
+                if not fut.done():
+                    fut.set_result(vec)
+
+    def stats(self) -> dict:
+        return {
+            "window_ms":          self.window * 1000.0,
+            "max_batch_size":     self.max_size,
+            "batches":            self.batches,
+            "queries":            self.items,
+            "avg_batch_size":     round(self.items / self.batches, 3) if self.batches else 0.0,
+            "batch_sizes":        dict(sorted(self.size_counts.items())),
+            "avg_queue_wait_ms":  round(self.wait_total / self.items * 1000, 3) if self.items else 0.0,
+            "max_queue_wait_ms":  round(self.wait_max * 1000, 3),
+            "pending":            self._queue.qsize() if self._queue else 0,
+        }
@@ -0,0 +1,135 @@
+# ============================================================
+#  Embedding Cache – content-addressed float32 vectors on disk
+#  (SQLite blobs, keyed by sha256(model + text))
+# ============================================================
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+
+import numpy as np
+
+# ─── Config ─────────────────────────────────────────────────
+EMBED_CACHE_ENABLED     = os.getenv("EMBED_CACHE_ENABLED", "1") == "1"
+EMBED_CACHE_PATH        = os.getenv("EMBED_CACHE_PATH", "/tmp/embed_cache.sqlite3")
+# Row cap (≈1.5 KB per 384-d vector); least recently used rows go first
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "100000"))
+TOUCH_INTERVAL          = 3600    # seconds; a hit refreshes used_at at most this often
+
+
+class EmbeddingCache:
+    """
+    Persistent text → vector cache.
+    Vectors are stored as raw float32 bytes, so a hit costs one indexed
+    SQLite read and an np.frombuffer — no model call, no per-element conversion.
+    Chat queries pass through here too, so the table is capped at `max_entries`
+    rows: past the cap, the least recently used 10% are deleted.
+    """
+
+    def __init__(self, model_id: str, path: str = EMBED_CACHE_PATH,
+                 max_entries: int = EMBED_CACHE_MAX_ENTRIES):
+        self.model_id    = model_id
+        self.path        = path
+        self.max_entries = max(1, max_entries)
+        self.hits        = 0
+        self.misses      = 0
+        self.evicted     = 0
+        self._lock       = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+        if "used_at" not in columns:
+            # Caches from before the cap: every row counts as unused since 0
+            self._conn.execute("ALTER TABLE embeddings ADD COLUMN used_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_used ON embeddings(used_at)")
+        self._conn.commit()
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        now    = time.time()
+        stale  = []
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                rows  = self._conn.execute(
+                    f"SELECT key, vector, used_at FROM embeddings WHERE key IN ({marks})", batch
+                ).fetchall()
+                for k, blob, used_at in rows:
+                    found[k] = np.frombuffer(blob, dtype=np.float32)
+                    if now - used_at > TOUCH_INTERVAL:
+                        stale.append((now, k))
+            if stale:
+                # Recency for eviction, written at most hourly per row rather than on every hit
+                self._conn.executemany("UPDATE embeddings SET used_at = ? WHERE key = ?", stale)
+                self._conn.commit()
+            self.hits   += sum(1 for k in keys if k in found)
+            self.misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, items: dict[str, np.ndarray]):
+        if not items:
+            return
+        now  = time.time()
+        rows = []
+        for k, v in items.items():
+            vec = np.ascontiguousarray(v, dtype=np.float32)
+            rows.append((k, int(vec.shape[0]), vec.tobytes(), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, used_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._count += len(rows)   # upper bound (replaced rows count twice), exact again below
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Deletes the least recently used rows down to 90% of the cap (caller holds the lock)."""
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = self._count - int(self.max_entries * 0.9)
+        if self._count <= self.max_entries or excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY used_at LIMIT ?)", (excess,)
+        )
+        self._count  -= excess
+        self.evicted += excess
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        k = self.key(text)
+        return self.get_many([k]).get(k)
+
+    def stats(self) -> dict:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        total = self.hits + self.misses
+        return {
+            "path":         self.path,
+            "model":        self.model_id,
+            "entries":      count,
+            "max_entries":  self.max_entries,
+            "evicted":      self.evicted,
+            "hits":         self.hits,
+            "misses":       self.misses,
+            "hit_rate":     round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,114 @@
+# ============================================================
+#  Engine Loader – build the RAG engine (ONNX model, ChromaDB,
+#  Groq client) on a background thread so the server accepts
+#  connections immediately; requests wait until it is ready
+# ============================================================
+
+import os
+import time
+import asyncio
+import threading
+from typing import Callable, Optional
+
+# ─── Config ─────────────────────────────────────────────────
+LAZY_STARTUP   = os.getenv("LAZY_STARTUP", "1") == "1"
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "300"))   # seconds a request waits for warm-up
+
+
+class EngineNotReady(RuntimeError):
+    pass
+
+
+class EngineLoader:
+    """
+    Stand-in for the engine while it warms up. Attribute access is forwarded
+    to the real engine, blocking (up to WARMUP_TIMEOUT) until it exists, so
+    existing `rag_engine.xxx` call sites keep working. Async code should
+    `await loader.wait()` first so the event loop is never blocked.
+    """
+
+    def __init__(self, factory: Callable[[], object], timeout: float = WARMUP_TIMEOUT):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_timeout", timeout)
+        object.__setattr__(self, "_engine", None)
+        object.__setattr__(self, "_error", None)
+        object.__setattr__(self, "_ready", threading.Event())
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_thread", None)
+        object.__setattr__(self, "_timing", {"started_at": None, "seconds": None})
+
+    # ── Lifecycle ────────────────────────────────────────────
+    def start(self):
+        """Begin warm-up on a daemon thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            thread = threading.Thread(target=self._load, name="engine-warmup", daemon=True)
+            object.__setattr__(self, "_thread", thread)
+        thread.start()
+
+    def _load(self):
+        self._timing["started_at"] = time.time()
+        start = time.perf_counter()
+        try:
+            object.__setattr__(self, "_engine", self._factory())
+            self._timing["seconds"] = round(time.perf_counter() - start, 3)
+            print(f"🔥 Engine warm-up finished in {self._timing['seconds']:.1f}s")
+        except Exception as e:
+            object.__setattr__(self, "_error", e)
+            print(f"❌ Engine warm-up failed: {e}")
+        finally:
+            self._ready.set()
+
+    def load(self):
+        """Eager mode: block until the engine is built and raise if it failed."""
+        self.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    # ── Readiness ────────────────────────────────────────────
+    @property
+    def ready(self) -> bool:
+        return self._engine is not None
+
+    def status(self) -> dict:
+        if self._engine is not None:
+            state = "ready"
+        elif self._error is not None:
+            state = "failed"
+        else:
+            state = "starting" if self._thread is not None else "idle"
+        return {
+            "status":         state,
+            "warmup_seconds": self._timing["seconds"],
+            "error":          str(self._error) if self._error else None,
+        }
+
+    def get(self, timeout: Optional[float] = None):
+        """The engine, once warm; raises EngineNotReady on timeout or failed warm-up."""
+        if self._engine is not None:
+            return self._engine
+        self.start()
+        if not self._ready.wait(self._timeout if timeout is None else timeout):
+            raise EngineNotReady("engine is still warming up")
+        if self._error is not None:
+            raise EngineNotReady(f"engine failed to start: {self._error}")
+        return self._engine
+
+    async def wait(self, timeout: Optional[float] = None):
+        """Async get(): polls instead of parking a thread, so waiting requests cost nothing."""
+        if self._engine is not None:
+            return self._engine
+        self.start()
+        deadline = time.monotonic() + (self._timeout if timeout is None else timeout)
+        while not self._ready.is_set() and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        return self.get(timeout=0)
+
+    # ── Forwarding ───────────────────────────────────────────
+    def __getattr__(self, name: str):
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name: str, value):
+        setattr(self.get(), name, value)
@@ -0,0 +1,102 @@
+# ============================================================
+#  FAQ Index – curated question/answer pairs answered without
+#  calling the LLM (separate Chroma collection, cosine space)
+# ============================================================
+
+import os
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+from langchain_chroma import Chroma
+
+# ─── Config ─────────────────────────────────────────────────
+FAQ_COLLECTION_NAME = "business_faq"
+FAQ_THRESHOLD       = float(os.getenv("FAQ_THRESHOLD", "0.88"))   # cosine similarity
+
+
+class FAQIndex:
+
+    def __init__(self, embeddings, persist_dir: Optional[str] = None, threshold: float = FAQ_THRESHOLD,
+                 client=None, collection_name: str = FAQ_COLLECTION_NAME):
+        self.threshold = threshold
+        self.hits      = 0
+        self.misses    = 0
+        self.store = Chroma(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            persist_directory=None if client else persist_dir,
+            client=client,
+            collection_metadata={"hnsw:space": "cosine"},
+        )
+
+    def add(self, question: str, answer: str) -> dict:
+        entry = {
+            "id":         str(uuid.uuid4())[:8].upper(),
+            "question":   question.strip(),
+            "answer":     answer.strip(),
+            "created_at": datetime.now().isoformat(),
+        }
+        self.store.add_texts(
+            [entry["question"]],
+            metadatas=[{"answer": entry["answer"], "created_at": entry["created_at"]}],
+            ids=[entry["id"]],
+        )
+        return entry
+
+    def list(self) -> List[dict]:
+        data = self.store.get(include=["documents", "metadatas"])
+        return [
+            {"id": i, "question": q, "answer": m.get("answer", ""), "created_at": m.get("created_at", "")}
+            for i, q, m in zip(data["ids"], data["documents"], data["metadatas"])
+        ]
+
+    def delete(self, faq_id: str) -> bool:
+        if not self.store.get(ids=[faq_id], include=[])["ids"]:
+            return False
+        self.store.delete(ids=[faq_id])
+        return True
+
+    def export_entries(self) -> dict:
+        """Every entry with its question vector (snapshot export)."""
+        data    = self.store._collection.get(include=["documents", "metadatas", "embeddings"])
+        vectors = np.asarray(data["embeddings"], dtype=np.float32) if data["ids"] else np.zeros((0, 0), np.float32)
+        return {"ids": data["ids"], "questions": data["documents"], "metadatas": data["metadatas"],
+                "vectors": vectors}
+
+    def import_entries(self, ids: List[str], questions: List[str], metadatas: List[dict],
+                       vectors, replace: bool = False):
+        """Bulk load already-embedded entries; replace=True drops the current ones first."""
+        if replace:
+            existing = self.store.get(include=[])["ids"]
+            if existing:
+                self.store.delete(ids=existing)
+        if ids:
+            self.store._collection.upsert(ids=ids, documents=questions, metadatas=metadatas,
+                                          embeddings=np.asarray(vectors, dtype=np.float32))
+
+    def match(self, embedding: List[float]) -> Optional[dict]:
+        """Best FAQ for an already-computed query vector, if similarity ≥ threshold."""
+        if self.store._collection.count() == 0:
+            return None
+        results = self.store.similarity_search_by_vector_with_relevance_scores(embedding, k=1)
+        if results:
+            doc, distance = results[0]
+            similarity = 1.0 - distance
+            if similarity >= self.threshold:
+                self.hits += 1
+                return {"question": doc.page_content, "answer": doc.metadata.get("answer", ""),
+                        "similarity": similarity}
+        self.misses += 1
+        return None
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries":   self.store._collection.count(),
+            "threshold": self.threshold,
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "hit_rate":  round(self.hits / total, 4) if total else 0.0,
+        }
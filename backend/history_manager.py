@@ -0,0 +1,206 @@
+# ============================================================
+#  History Manager – the newest turns go to the LLM verbatim;
+#  once they pass a token budget, older turns are folded into a
+#  rolling per-session summary. Summaries are written by a
+#  background task after the reply has gone out, never on the
+#  request path, and stored next to the turns (session_store.py)
+# ============================================================
+
+import os
+import time
+import asyncio
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+
+from context_builder import estimate_tokens
+from metrics import STAGE_SECONDS
+
+# ─── Config ─────────────────────────────────────────────────
+HISTORY_COMPACTION     = os.getenv("HISTORY_COMPACTION", "1") == "1"          # 0 = last N pairs verbatim
+HISTORY_TOKEN_BUDGET   = int(os.getenv("HISTORY_TOKEN_BUDGET", "400"))       # verbatim turns
+HISTORY_KEEP_TURNS     = int(os.getenv("HISTORY_KEEP_TURNS", "1"))           # verbatim even over budget
+HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", "150"))     # target summary length
+# Summaries use their own client: "model" or "model@KEY_ENV_VAR" (see LLM_HEDGE_PROVIDERS);
+# empty = the chat model and key. A second key keeps them off the chat's Groq rate limit
+HISTORY_SUMMARY_PROVIDER    = os.getenv("HISTORY_SUMMARY_PROVIDER", "")
+HISTORY_SUMMARY_CONCURRENCY = int(os.getenv("HISTORY_SUMMARY_CONCURRENCY", "2"))   # summaries in flight
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You maintain a running summary of a sales chat between a customer and a business's assistant.
+Merge the new turns into the summary so far. Keep:
+- the customer's name, phone, email and anything they said about themselves
+- services / products discussed and any prices or offers quoted
+- booking details (service, preferred time) and what has been confirmed
+- objections and open questions still to answer
+Drop greetings and small talk. Write in the language mix the customer uses (Hindi, English or Hinglish).
+At most {max_words} words, plain text, no preamble."""),
+    ("human", "Summary so far:\n{summary}\n\nNew turns:\n{turns}"),
+])
+
+
+def _turn_tokens(turn: tuple) -> int:
+    _, human, ai = turn
+    return estimate_tokens(human) + estimate_tokens(ai)
+
+
+class HistoryManager:
+    """
+    Usage:
+        hist = history.build(session_key)     # → messages / pairs / token counts for the prompt
+        ...                                   # LLM call, store.append(...)
+        history.schedule(session_key)         # fold what fell out of the verbatim window
+
+    `dispatcher` is a summary-only LLMDispatcher (no hedging), separate from
+    the chat's, so summaries never skew its latency percentiles; at most
+    HISTORY_SUMMARY_CONCURRENCY of them call the LLM at once.
+
+    A turn leaves the verbatim window when the newest turns alone fill
+    HISTORY_TOKEN_BUDGET, or when it is older than the last `window` turns.
+    Until the background summary covers it, it is still sent verbatim. The
+    result never costs more than the last `window` pairs verbatim (the
+    uncompacted history); when it would, that is what gets sent instead.
+    """
+
+    def __init__(self, store, dispatcher, window: int, enabled: bool = HISTORY_COMPACTION,
+                 concurrency: int = HISTORY_SUMMARY_CONCURRENCY):
+        self.store       = store
+        self.dispatcher  = dispatcher
+        self.window      = window
+        self.enabled     = enabled
+        self.concurrency = max(1, concurrency)
+        self._running: set[str] = set()
+        self._tasks:   set[asyncio.Task] = set()
+        self._loop = None
+        self._sem  = None
+
+        # Stats
+        self.prompts         = 0
+        self.history_tokens  = 0
+        self.baseline_tokens = 0
+        self.summaries       = 0
+        self.turns_folded    = 0
+        self.failures        = 0
+        self.summary_seconds = 0.0
+
+    def _first_verbatim(self, turns: list) -> int:
+        """Index into `turns` of the oldest turn kept verbatim."""
+        start, used = len(turns), 0
+        while start > max(0, len(turns) - self.window):
+            cost = _turn_tokens(turns[start - 1])
+            if len(turns) - start >= HISTORY_KEEP_TURNS and used + cost > HISTORY_TOKEN_BUDGET:
+                break
+            used  += cost
+            start -= 1
+        return start
+
+    @staticmethod
+    def _messages(summary: str, turns: list) -> tuple:
+        """(chat_history messages, (human, ai) pairs for the answer-cache key)"""
+        messages, pairs = [], []
+        if summary:
+            messages.append(SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+            pairs.append(("[summary]", summary))
+        for _, human, ai in turns:
+            messages += [HumanMessage(content=human), AIMessage(content=ai)]
+            pairs.append((human, ai))
+        return messages, pairs
+
+    def build(self, session_key: str) -> dict:
+        """
+        {"messages": chat_history for the prompt, "pairs": what the answer cache keys on,
+         "history_tokens": what is sent, "baseline_tokens": the last `window` turns verbatim}
+        """
+        turns    = self.store.get_turns(session_key)
+        recent   = turns[-self.window:]
+        baseline = sum(_turn_tokens(t) for t in recent)
+        summary  = ""
+        if self.enabled:
+            summary, upto = self.store.get_summary(session_key)
+            first  = self._first_verbatim(turns)
+            turns  = [t for t in turns[:first] if t[0] > upto] + turns[first:]
+        else:
+            turns  = recent
+
+        messages, pairs = self._messages(summary, turns)
+        tokens = sum(estimate_tokens(m.content) for m in messages)
+        if tokens > baseline:
+            # Summary not caught up (lagging / failing): no worse than uncompacted
+            messages, pairs = self._messages("", recent)
+            tokens = baseline
+
+        self.prompts         += 1
+        self.history_tokens  += tokens
+        self.baseline_tokens += baseline
+        return {"messages": messages, "pairs": pairs,
+                "history_tokens": tokens, "baseline_tokens": baseline}
+
+    # ─── Background Compaction ───────────────────────────────
+    def schedule(self, session_key: str):
+        """Starts folding this session's out-of-window turns, unless a task already is."""
+        if not self.enabled or session_key in self._running:
+            return
+        self._running.add(session_key)
+        task = asyncio.get_running_loop().create_task(self._compact(session_key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._sem  = asyncio.Semaphore(self.concurrency)
+        return self._sem
+
+    def _pending(self, session_key: str) -> tuple:
+        """(summary so far, turns to fold into it)"""
+        turns         = self.store.get_turns(session_key)
+        summary, upto = self.store.get_summary(session_key)
+        return summary, [t for t in turns[:self._first_verbatim(turns)] if t[0] > upto]
+
+    async def _compact(self, session_key: str):
+        try:
+            # Loop: turns may leave the window while a summary is being written
+            while True:
+                async with self._slots():
+                    summary, fold = self._pending(session_key)
+                    if not fold:
+                        return
+                    start  = time.perf_counter()
+                    prompt = SUMMARY_PROMPT.invoke({
+                        "summary":   summary or "(none yet)",
+                        "turns":     "\n".join(f"Customer: {h}\nAssistant: {a}" for _, h, a in fold),
+                        "max_words": int(HISTORY_SUMMARY_TOKENS * 0.75),
+                    })
+                    summary = (await self.dispatcher.ainvoke(prompt)).strip()
+                    elapsed = time.perf_counter() - start
+                STAGE_SECONDS.observe(elapsed, stage="history_summary")
+                if not summary:
+                    raise ValueError("empty summary")
+                self.store.set_summary(session_key, summary, fold[-1][0])
+                self.summaries       += 1
+                self.turns_folded    += len(fold)
+                self.summary_seconds += elapsed
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️  History summary failed [{session_key}]: {e}")
+        finally:
+            self._running.discard(session_key)
+
+    def stats(self) -> dict:
+        return {
+            "enabled":              self.enabled,
+            "token_budget":         HISTORY_TOKEN_BUDGET,
+            "window":               self.window,
+            "prompts":              self.prompts,
+            "avg_history_tokens":   round(self.history_tokens / self.prompts, 1) if self.prompts else 0.0,
+            "avg_baseline_tokens":  round(self.baseline_tokens / self.prompts, 1) if self.prompts else 0.0,
+            "tokens_saved":         self.baseline_tokens - self.history_tokens,
+            "summaries":            self.summaries,
+            "turns_folded":         self.turns_folded,
+            "failures":             self.failures,
+            "avg_summary_ms":       round(1000 * self.summary_seconds / self.summaries, 1) if self.summaries else 0.0,
+            "in_flight":            len(self._running),
+            "concurrency":          self.concurrency,
+            "llm":                  self.dispatcher.stats(),
+        }
@@ -0,0 +1,134 @@
+# ============================================================
+#  Ingestion Jobs – run PDF / URL / text ingestion off the
+#  event loop on a bounded worker pool, with progress reporting
+# ============================================================
+
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+from langchain_core.documents import Document
+
+# ─── Config ─────────────────────────────────────────────────
+INGEST_WORKERS   = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_JOBS_KEPT = int(os.getenv("INGEST_JOBS_KEPT", "200"))   # finished jobs remembered
+
+
+class IngestJobManager:
+    """
+    submit() returns immediately with a job record; the job feeds `load()`
+    (DocumentLoader work – a list or a chunk generator) into
+    `rag_engine.add_documents` on the worker pool, updating `chunks_embedded`
+    as batches are written. `chunks_total` is known up front only for lists.
+    `on_done()` runs after every chunk is written, and only if the job succeeds.
+    Jobs are held in memory, so they are visible only to the worker process that created them.
+    """
+
+    def __init__(self, rag_engine, max_workers: int = INGEST_WORKERS,
+                 max_jobs: int = INGEST_JOBS_KEPT):
+        self.rag_engine = rag_engine
+        self.max_jobs   = max_jobs
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, source: str, load: Callable[[], Iterable[Document]],
+               replace: bool = True, tenant_id: str = "default",
+               on_done: Optional[Callable[[], None]] = None) -> dict:
+        job = {
+            "id":                uuid.uuid4().hex[:12],
+            "kind":              kind,
+            "source":            source,
+            "tenant_id":         tenant_id,
+            "status":            "queued",     # queued → running → done | failed
+            "message":           "",
+            "chunks_total":      None,
+            "chunks_embedded":   0,
+            "chunks_unchanged":  0,
+            "chunks_removed":    0,
+            "created_at":        time.time(),
+            "started_at":        None,
+            "finished_at":       None,
+            "extract_seconds":   None,
+            "embed_seconds":     None,
+            "chunks_per_sec":    None,
+            "error":             None,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._trim()
+        self._pool.submit(self._run, job, load, replace, on_done)
+        return dict(job)
+
+    def _trim(self):
+        # Forget the oldest finished jobs beyond the cap
+        finished = [jid for jid, j in self._jobs.items() if j["status"] in ("done", "failed")]
+        for jid in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[jid]
+
+    def _update(self, job: dict, **fields):
+        with self._lock:
+            job.update(fields)
+
+    def _run(self, job: dict, load: Callable[[], Iterable[Document]], replace: bool,
+             on_done: Optional[Callable[[], None]] = None):
+        started = time.time()
+        self._update(job, status="running", started_at=started)
+        try:
+            docs = load()
+            if isinstance(docs, list):
+                self._update(job, chunks_total=len(docs),
+                             extract_seconds=round(time.time() - started, 3))
+            counts = self.rag_engine.add_documents(
+                docs, replace=replace, tenant_id=job["tenant_id"],
+                on_progress=lambda n: self._update(job, chunks_embedded=n),
+            )
+            if on_done:
+                on_done()
+            finished = time.time()
+            total    = counts["added"] + counts["unchanged"]
+            self._update(job, status="done", finished_at=finished, chunks_total=total,
+                         chunks_embedded=counts["added"], chunks_unchanged=counts["unchanged"],
+                         chunks_removed=counts["removed"], chunks_per_sec=counts["chunks_per_sec"],
+                         message=self._done_message(job["kind"], total))
+            if job["extract_seconds"] is not None:
+                self._update(job, embed_seconds=round(finished - started - job["extract_seconds"], 3))
+        except Exception as e:
+            self._update(job, status="failed", finished_at=time.time(), error=str(e))
+            print(f"❌ Ingest job {job['id']} ({job['source']}) failed: {e}")
+
+    @staticmethod
+    def _done_message(kind: str, total: int) -> str:
+        if total:
+            return "Indexed successfully"
+        if kind == "crawl":
+            return "No new or changed pages"
+        if kind in ("pdf", "files"):
+            return "Processed but no text extracted (scanned image PDF?)"
+        return "Processed but no text extracted"
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._view(job) if job else None
+
+    def list(self, tenant_id: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            return [self._view(j) for j in reversed(self._jobs.values())
+                    if tenant_id is None or j["tenant_id"] == tenant_id]
+
+    @staticmethod
+    def _view(job: dict) -> dict:
+        view = dict(job)
+        end  = job["finished_at"] or time.time()
+        view["queued_seconds"]  = round((job["started_at"] or end) - job["created_at"], 3)
+        view["elapsed_seconds"] = round(end - job["started_at"], 3) if job["started_at"] else 0.0
+        return view
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if j["status"] in ("queued", "running"))
@@ -0,0 +1,165 @@
+# ============================================================
+#  Intent Classifier – single-pass Aho-Corasick keyword matcher
+#  Cost grows with message length, not with the number of
+#  keywords, so rule sets can hold thousands of phrases.
+# ============================================================
+
+import os
+import json
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+# ─── Config ─────────────────────────────────────────────────
+INTENT_RULES_PATH = os.getenv("INTENT_RULES_PATH", "./data/intent_rules.json")
+
+# ─── Default Rule Sets ───────────────────────────────────────
+PRICING_KEYWORDS = ["price", "cost", "fee", "charge", "kitna", "rate", "package",
+                    "pricing", "plan", "paisa", "rupee", "how much", "fees"]
+
+# Informational question indicators — these mean user is ASKING, not REQUESTING
+_QUESTION_SIGNALS = [
+    # English
+    "how to", "how do", "how can", "how does", "what is", "what are", "what's",
+    "do you", "do i", "can i", "can you", "is there", "are there", "tell me",
+    "explain", "describe", "information", "details", "about", "process",
+    "works", "working",
+    # Hindi
+    "kaise", "kya hai", "kya hota", "kya h", "batao", "bata do", "samjhao",
+    "ke baare", "ke baarein", "kaise hoti", "kaise hota", "kya process",
+    "kya karna", "kya karu",
+]
+
+# Explicit booking ACTION phrases — user wants to book RIGHT NOW
+_BOOKING_ACTIONS = [
+    # English
+    "book now", "book it", "book an appointment", "book a slot", "please book",
+    "i want to book", "i'd like to book", "i would like to book",
+    "schedule an appointment", "fix an appointment", "make an appointment",
+    "set up an appointment",
+    # Hindi
+    "book karna hai", "book kar do", "book karo", "book kar lo",
+    "appointment karo", "appointment kar do", "appointment chahiye",
+    "appointment lena hai", "milna hai", "slot chahiye", "booking karni hai",
+    "booking kar do", "haan book", "ha book", "appointment fix",
+    "schedule kar", "abhi book", "abhi appointment",
+]
+
+DEFAULT_RULES = {
+    "question": _QUESTION_SIGNALS,
+    "booking":  _BOOKING_ACTIONS,
+    "pricing":  PRICING_KEYWORDS,
+}
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton: finds every rule set with a keyword occurring in the text."""
+
+    def __init__(self, rules: Dict[str, Iterable[str]]):
+        self._goto: List[dict] = [{}]
+        self._fail: List[int]  = [0]
+        self._out:  List[frozenset] = [frozenset()]
+
+        for label, keywords in rules.items():
+            for kw in keywords:
+                kw = kw.lower()
+                if not kw:
+                    continue
+                state = 0
+                for ch in kw:
+                    nxt = self._goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[state][ch] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._out.append(frozenset())
+                    state = nxt
+                self._out[state] = self._out[state] | {label}
+
+        # BFS: fail links, and merge each state's output with its fail target's
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt]  = self._out[nxt] | self._out[self._fail[nxt]]
+
+    def labels(self, text: str) -> set:
+        goto, fail, out = self._goto, self._fail, self._out
+        found, state = set(), 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+class IntentClassifier:
+    """
+    classify() → {"intent": "booking" | "pricing" | "query", "booking_triggered": bool}
+
+    booking_triggered is True ONLY when the user is actively requesting to book
+    (not just asking about it): no trailing "?", no question signal, and an
+    explicit booking phrase.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, List[str]]] = None):
+        self._lock = threading.Lock()
+        self.load(rules or DEFAULT_RULES)
+
+    def load(self, rules: Dict[str, List[str]]):
+        """Compile a new rule set and swap it in atomically."""
+        rules     = {label: list(kws) for label, kws in rules.items()}
+        automaton = KeywordAutomaton(rules)
+        with self._lock:
+            self.rules      = rules
+            self._automaton = automaton
+
+    def load_file(self, path: str = INTENT_RULES_PATH) -> bool:
+        if not os.path.exists(path):
+            return False
+        with open(path, "r", encoding="utf-8") as f:
+            self.load(json.load(f))
+        return True
+
+    def save_file(self, path: str = INTENT_RULES_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.rules, f, indent=2, ensure_ascii=False)
+
+    def classify(self, message: str) -> dict:
+        msg    = message.lower().strip()
+        labels = self._automaton.labels(msg)
+        # Question mark / question signal → informational query, not an action
+        booking = (not msg.endswith("?")) and "question" not in labels and "booking" in labels
+        if booking:
+            intent = "booking"
+        elif "pricing" in labels:
+            intent = "pricing"
+        else:
+            intent = "query"
+        return {"intent": intent, "booking_triggered": booking}
+
+    def classify_batch(self, messages: Iterable[str]) -> List[dict]:
+        return [self.classify(m) for m in messages]
+
+
+classifier = IntentClassifier()
+classifier.load_file()
+
+
+def is_booking_action(message: str) -> bool:
+    """Returns True ONLY when user is actively requesting to book (not just asking about it)."""
+    return classifier.classify(message)["booking_triggered"]
+
+
+def detect_intent(message: str) -> str:
+    return classifier.classify(message)["intent"]
@@ -0,0 +1,277 @@
+# ============================================================
+#  LLM Dispatcher – hedged + fallback requests across several
+#  Groq models / API keys, 429 retries with backoff and
+#  per-provider latency stats. Bounds the chat's tail latency.
+# ============================================================
+
+import os
+import time
+import random
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from langchain_core.output_parsers import StrOutputParser
+
+from metrics import Counter, Histogram
+
+# ─── Config ─────────────────────────────────────────────────
+# Extra providers, comma separated: "model" (same API key) or "model@ENV_VAR"
+# (key read from that env var), e.g. "llama-3.1-8b-instant@GROQ_API_KEY_2"
+LLM_HEDGE_PROVIDERS  = os.getenv("LLM_HEDGE_PROVIDERS", "")
+LLM_HEDGE_ENABLED    = os.getenv("LLM_HEDGE_ENABLED", "1") == "1"   # 0 = fallback on failure only
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_DELAY      = float(os.getenv("LLM_HEDGE_DELAY", "1.5"))    # until enough samples exist
+LLM_HEDGE_MIN_DELAY  = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.3"))
+LLM_HEDGE_MAX_DELAY  = float(os.getenv("LLM_HEDGE_MAX_DELAY", "5.0"))
+LLM_MAX_RETRIES      = int(os.getenv("LLM_MAX_RETRIES", "2"))        # per provider, on 429 only
+LLM_BACKOFF_BASE     = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX      = float(os.getenv("LLM_BACKOFF_MAX", "8.0"))
+LATENCY_WINDOW       = 500     # recent calls kept per provider
+MIN_SAMPLES          = 20      # before the percentile replaces LLM_HEDGE_DELAY
+
+LLM_SECONDS = Histogram("llm_seconds", "LLM call latency by provider (time to first token when streaming)",
+                        ("provider", "mode"))
+LLM_EVENTS  = Counter("llm_events_total", "LLM dispatcher events (win, hedge, fallback, retry, error, cancelled)",
+                      ("provider", "event"))
+
+
+def parse_providers(spec: str, default_key: str) -> List[Tuple[str, str, str]]:
+    """"m1, m2@KEY_ENV" → [(name, model, api_key), ...]"""
+    out = []
+    for entry in (e.strip() for e in spec.split(",")):
+        if not entry:
+            continue
+        model, _, key_env = entry.partition("@")
+        out.append((entry, model.strip(), os.getenv(key_env.strip(), "") if key_env else default_key))
+    return out
+
+
+def _is_rate_limit(e: Exception) -> bool:
+    return getattr(e, "status_code", None) == 429 or type(e).__name__ == "RateLimitError"
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    response = getattr(e, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _percentile(samples, q: float) -> Optional[float]:
+    if not samples:
+        return None
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(q / 100.0 * len(s)))]
+
+
+class LLMProvider:
+    """One chat model (model name + API key) and its recent latency."""
+
+    def __init__(self, name: str, llm):
+        self.name = name
+        self.llm  = llm
+        self.latencies = deque(maxlen=LATENCY_WINDOW)   # full answer, ainvoke
+        self.ttfts     = deque(maxlen=LATENCY_WINDOW)   # first token, astream
+
+        # Stats
+        self.calls        = 0
+        self.errors       = 0
+        self.rate_limited = 0
+        self.wins         = 0
+        self.cancelled    = 0
+
+    def chain(self):
+        return self.llm | StrOutputParser()
+
+    def stats(self) -> dict:
+        def ms(v):
+            return round(v * 1000, 1) if v is not None else None
+        return {
+            "name":          self.name,
+            "model":         getattr(self.llm, "model_name", None) or type(self.llm).__name__,
+            "calls":         self.calls,
+            "wins":          self.wins,
+            "errors":        self.errors,
+            "rate_limited":  self.rate_limited,
+            "cancelled":     self.cancelled,
+            "p50_ms":        ms(_percentile(self.latencies, 50)),
+            "p95_ms":        ms(_percentile(self.latencies, 95)),
+            "p99_ms":        ms(_percentile(self.latencies, 99)),
+            "ttft_p50_ms":   ms(_percentile(self.ttfts, 50)),
+            "ttft_p95_ms":   ms(_percentile(self.ttfts, 95)),
+        }
+
+
+class LLMDispatcher:
+    """
+    Usage:
+        answer = await dispatcher.ainvoke(SALES_PROMPT.invoke(inputs))
+        async for token in dispatcher.astream(prompt): ...
+
+    The primary provider is called first. If it has not answered (or, when
+    streaming, produced its first token) within the hedge delay – its recent
+    LLM_HEDGE_PERCENTILE latency, clamped – one hedged request goes to the
+    next provider; the first to finish wins and the other is cancelled. A
+    provider that fails outright is replaced by the next one (fallback).
+    429s are retried per provider with exponential backoff (Retry-After wins).
+    """
+
+    def __init__(self, providers: List[LLMProvider], hedge: bool = LLM_HEDGE_ENABLED,
+                 max_retries: int = LLM_MAX_RETRIES):
+        if not providers:
+            raise ValueError("LLMDispatcher needs at least one provider")
+        self.providers   = providers
+        self.hedge       = hedge
+        self.max_retries = max_retries
+
+        # Stats
+        self.requests  = 0
+        self.hedged    = 0
+        self.fallbacks = 0
+
+    @property
+    def primary(self) -> LLMProvider:
+        return self.providers[0]
+
+    def hedge_delay(self, provider: LLMProvider, streaming: bool = False) -> float:
+        samples = provider.ttfts if streaming else provider.latencies
+        if len(samples) < MIN_SAMPLES:
+            return LLM_HEDGE_DELAY
+        return min(LLM_HEDGE_MAX_DELAY,
+                   max(LLM_HEDGE_MIN_DELAY, _percentile(samples, LLM_HEDGE_PERCENTILE)))
+
+    # ── Per-provider call with 429 retries ──────────────────
+    async def _with_retries(self, provider: LLMProvider, call: Callable[[], Awaitable]):
+        for attempt in range(self.max_retries + 1):
+            provider.calls += 1
+            try:
+                return await call()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                provider.errors += 1
+                LLM_EVENTS.inc(provider=provider.name, event="error")
+                limited = _is_rate_limit(e)
+                provider.rate_limited += limited
+                if not limited or attempt == self.max_retries:
+                    raise
+                LLM_EVENTS.inc(provider=provider.name, event="retry")
+                delay = _retry_after(e) or LLM_BACKOFF_BASE * (2 ** attempt) * (1 + random.random())
+                await asyncio.sleep(min(delay, LLM_BACKOFF_MAX))
+
+    async def _invoke(self, provider: LLMProvider, prompt) -> str:
+        async def call():
+            start   = time.perf_counter()
+            answer  = await provider.chain().ainvoke(prompt)
+            elapsed = time.perf_counter() - start
+            provider.latencies.append(elapsed)
+            LLM_SECONDS.observe(elapsed, provider=provider.name, mode="invoke")
+            return answer
+        return await self._with_retries(provider, call)
+
+    async def _open_stream(self, provider: LLMProvider, prompt):
+        """Start a stream and wait for its first token → (stream, first_token)."""
+        async def call():
+            start  = time.perf_counter()
+            stream = provider.chain().astream(prompt).__aiter__()
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first, stream = "", None
+            except BaseException:
+                await stream.aclose()
+                raise
+            elapsed = time.perf_counter() - start
+            provider.ttfts.append(elapsed)
+            LLM_SECONDS.observe(elapsed, provider=provider.name, mode="stream")
+            return stream, first
+        return await self._with_retries(provider, call)
+
+    # ── Hedged race ─────────────────────────────────────────
+    async def _race(self, start: Callable[[LLMProvider], Awaitable], streaming: bool,
+                    discard: Callable = None):
+        self.requests += 1
+        queue   = list(self.providers)
+        running = {}
+        errors  = []
+        hedged  = False
+
+        def launch(provider: LLMProvider):
+            running[asyncio.ensure_future(start(provider))] = provider
+
+        launch(queue.pop(0))
+        try:
+            while running:
+                can_hedge = self.hedge and queue and not hedged and len(running) == 1
+                timeout   = self.hedge_delay(next(iter(running.values())), streaming) if can_hedge else None
+                done, _   = await asyncio.wait(running, timeout=timeout,
+                                               return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    self.hedged += 1
+                    provider = queue.pop(0)
+                    LLM_EVENTS.inc(provider=provider.name, event="hedge")
+                    launch(provider)
+                    continue
+
+                winner = None
+                for task in done:
+                    provider = running.pop(task)
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                    elif winner is None:
+                        winner = (provider, task.result())
+                    elif discard:
+                        discard(task.result())   # finished in the same tick but lost
+                if winner:
+                    winner[0].wins += 1
+                    LLM_EVENTS.inc(provider=winner[0].name, event="win")
+                    return winner
+
+                if not running and queue:
+                    self.fallbacks += 1
+                    provider = queue.pop(0)
+                    LLM_EVENTS.inc(provider=provider.name, event="fallback")
+                    print(f"⚠️  LLM fallback → {provider.name} ({errors[-1]})")
+                    launch(provider)
+        finally:
+            for task, provider in running.items():
+                task.cancel()
+                provider.cancelled += 1
+                LLM_EVENTS.inc(provider=provider.name, event="cancelled")
+        raise errors[-1]
+
+    async def ainvoke(self, prompt) -> str:
+        _, answer = await self._race(lambda p: self._invoke(p, prompt), streaming=False)
+        return answer
+
+    async def astream(self, prompt) -> AsyncIterator[str]:
+        """Hedges on the first token; once a provider has streamed a token it is committed to."""
+        def discard(result):
+            stream, _ = result
+            if stream is not None:
+                asyncio.ensure_future(stream.aclose())
+
+        _, (stream, first) = await self._race(lambda p: self._open_stream(p, prompt),
+                                              streaming=True, discard=discard)
+        if first:
+            yield first
+        if stream is not None:
+            try:
+                async for token in stream:
+                    yield token
+            finally:
+                await stream.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "hedging":             self.hedge and len(self.providers) > 1,
+            "requests":            self.requests,
+            "hedged":              self.hedged,
+            "fallbacks":           self.fallbacks,
+            "hedge_delay_ms":      round(self.hedge_delay(self.primary) * 1000, 1),
+            "hedge_delay_ttft_ms": round(self.hedge_delay(self.primary, streaming=True) * 1000, 1),
+            "providers":           [p.stats() for p in self.providers],
+        }
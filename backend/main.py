@@ -2,22 +2,66 @@
 #  AI-Powered Lead Magnet & Sales Agent – Backend (FastAPI)
 # ============================================================
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from contextlib import asynccontextmanager
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 import uvicorn
+import csv
+import io
+import json
+import time
+import asyncio
+import shutil
+import tempfile
 import os
 
-from rag_engine import RAGEngine
+from engine_loader import EngineLoader, EngineNotReady, LAZY_STARTUP
 from document_loader import DocumentLoader
 from appointment import AppointmentManager
+from ingest_jobs import IngestJobManager
+from admission import AdmissionController, Overloaded
+from intent_classifier import classifier
+from tenant_ids import DEFAULT_TENANT, UnknownTenant, validate_tenant_id
+import metrics
+from metrics import HTTP_SECONDS, TIMING_HEADERS, Gauge, request_timings, server_timing_header
+
+# ─── Engine (lazy) ──────────────────────────────────────────
+def _build_engine():
+    # Imported here so chromadb / langchain / onnxruntime load off the startup path too
+    from rag_engine import RAGEngine
+    engine = RAGEngine()
+    engine.warm_up()
+    return engine
+
+# LAZY_STARTUP=1: warm up in the background; health checks answer at once,
+# engine routes wait for it. LAZY_STARTUP=0: build before serving (old behaviour).
+rag_engine = EngineLoader(_build_engine)
+if not LAZY_STARTUP:
+    rag_engine.load()
+
+# Routes that need the engine; everything else (health, bookings, intent) never waits
+ENGINE_ROUTES = ("/api/chat", "/api/ingest", "/api/sources", "/api/faq",
+                 "/api/vectorstore", "/api/cache", "/api/embeddings", "/api/llm",
+                 "/api/tenants", "/api/snapshot", "/api/history")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    rag_engine.start()
+    yield
+
 
 # ─── App Init ───────────────────────────────────────────────
 app = FastAPI(
     title="AI Sales Agent API",
     description="RAG-based lead magnet & sales agent powered by HuggingFace",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -29,21 +73,88 @@ app.add_middleware(
 )
 
 # ─── Singletons ─────────────────────────────────────────────
-rag_engine      = RAGEngine()
 doc_loader      = DocumentLoader()
 appt_manager    = AppointmentManager()
+ingest_jobs     = IngestJobManager(rag_engine)
+admission       = AdmissionController()   # bounds concurrent /api/chat + /api/chat/stream
+
+# ─── Metrics ────────────────────────────────────────────────
+def _default_executor_queue() -> int:
+    executor = getattr(asyncio.get_running_loop(), "_default_executor", None)
+    return executor._work_queue.qsize() if executor else 0
+
+def _engine_gauge(fn):
+    # NaN while warming up, so a scrape never blocks on the engine
+    return lambda: fn(rag_engine) if rag_engine.ready else float("nan")
+
+Gauge("default_executor_queue", "Tasks waiting for a default-executor thread").set_function(_default_executor_queue)
+Gauge("engine_ready", "1 once the RAG engine has warmed up").set_function(lambda: int(rag_engine.ready))
+Gauge("embed_batcher_pending", "Queries waiting in the embedding micro-batcher").set_function(
+    _engine_gauge(lambda e: e.query_batcher.stats()["pending"]))
+Gauge("retrieval_executor_queue", "Embedding / search tasks waiting for a retrieval thread").set_function(
+    _engine_gauge(lambda e: e.executor._work_queue.qsize()))
+Gauge("chat_in_flight", "Chat requests holding an admission slot").set_function(lambda: admission.in_flight)
+Gauge("chat_waiting", "Chat requests queued for an admission slot").set_function(lambda: admission.waiting)
+Gauge("ingest_jobs_pending", "Ingestion jobs queued or running").set_function(ingest_jobs.pending)
+Gauge("sessions", "Chat sessions with stored history").set_function(_engine_gauge(lambda e: len(e.sessions)))
+Gauge("vector_chunks", "Chunks in the default tenant's vector store").set_function(
+    _engine_gauge(lambda e: e.tenants.default.chunk_count()))
+Gauge("tenants_open", "Tenant knowledge bases held open (LRU)").set_function(
+    _engine_gauge(lambda e: e.tenants.stats()["open"]))
+
+
+@app.middleware("http")
+async def wait_for_engine(request: Request, call_next):
+    """During warm-up, engine routes wait for it (up to WARMUP_TIMEOUT) instead of failing."""
+    if not rag_engine.ready and request.url.path.startswith(ENGINE_ROUTES):
+        try:
+            await rag_engine.wait()
+        except EngineNotReady as e:
+            return JSONResponse({"detail": str(e)}, status_code=503, headers={"Retry-After": "5"})
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    """Per-route latency histogram; optional Server-Timing header with the stage breakdown."""
+    timings = {}
+    token   = request_timings.set(timings)
+    start   = time.perf_counter()
+    status  = 500
+    try:
+        response = await call_next(request)
+        status   = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        route   = request.scope.get("route")
+        HTTP_SECONDS.observe(elapsed, method=request.method,
+                             route=getattr(route, "path", "unmatched"), status=str(status))
+        request_timings.reset(token)
+    # SSE bodies are still being produced here, so their timings would be incomplete
+    if TIMING_HEADERS and not response.headers.get("content-type", "").startswith("text/event-stream"):
+        response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
 
 # ─── Request / Response Models ───────────────────────────────
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = "default"
     language: Optional[str] = "auto"   # "en" | "hi" | "auto"
+    tenant_id: Optional[str] = DEFAULT_TENANT
+
+class PrefetchRequest(BaseModel):
+    message: str                         # the draft so far
+    session_id: Optional[str] = "default"
+    tenant_id: Optional[str] = DEFAULT_TENANT
 
 class ChatResponse(BaseModel):
     answer: str
     sources: list[str]
     intent: str                         # "query" | "booking" | "pricing"
     booking_triggered: bool
+    fast_path: Optional[str] = None     # "faq" | "cache" when the LLM was skipped
+    prompt_tokens: Optional[dict] = None   # estimated prompt size (total, history, context); LLM path only
+    prefetched: bool = False               # retrieval came from /api/chat/prefetch
 
 class BookingRequest(BaseModel):
     name: str
@@ -51,10 +162,19 @@ class BookingRequest(BaseModel):
     email: Optional[str] = None
     service: str
     preferred_time: Optional[str] = None
+    tenant_id: Optional[str] = DEFAULT_TENANT
+
+class FAQRequest(BaseModel):
+    question: str
+    answer: str
+
+class ClassifyRequest(BaseModel):
+    messages: list[str]
 
-class IngestionResponse(BaseModel):
+class IngestJobResponse(BaseModel):
     message: str
-    chunks_created: int
+    job_id: str
+    status: str                         # "queued" | "running" | "done" | "failed"
 
 # ─── Routes ─────────────────────────────────────────────────
 
@@ -63,6 +183,13 @@ def health_check():
     return {"status": "✅ Sales Agent API is live", "version": "1.0.0"}
 
 
+@app.get("/ready")
+def readiness():
+    """503 until the embedding model, vector store and LLM client are warm."""
+    status = rag_engine.status()
+    return JSONResponse(status, status_code=200 if status["status"] == "ready" else 503)
+
+
 # ---------- Chat Endpoint ----------
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(req: ChatRequest):
@@ -72,52 +199,233 @@ async def chat(req: ChatRequest):
     • Returns AI answer with source references
     • Triggers booking flow if user signals intent to book
     """
+    tenant = _kb_tenant(req.tenant_id)
+    await _admit()
     try:
         result = await rag_engine.chat(
             message=req.message,
             session_id=req.session_id,
-            language=req.language
+            language=req.language,
+            tenant_id=tenant
         )
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        admission.release()
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Streaming variant of /api/chat (Server-Sent Events).
+    • `meta`  – intent, sources, booking_triggered (sent right after retrieval)
+    • `token` – answer text as the LLM produces it
+    • `done`  – full answer (exchange is saved to session history)
+    • `error` – emitted instead of `done` if generation fails
+    """
+    tenant = _kb_tenant(req.tenant_id)
+    await _admit()
+    released = False
+
+    def release():
+        # The slot is held for the whole stream; called from the generator's
+        # finally and again as a background task in case the body never started
+        nonlocal released
+        if not released:
+            released = True
+            admission.release()
+
+    async def event_stream():
+        try:
+            async for event in rag_engine.chat_stream(
+                message=req.message,
+                session_id=req.session_id,
+                language=req.language,
+                tenant_id=tenant
+            ):
+                yield f"event: {event.pop('type')}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+        finally:
+            release()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release),
+    )
+
+
+async def _admit():
+    """Take a chat slot or shed the request: 429 when the queue is full, 503 after CHAT_QUEUE_TIMEOUT."""
+    try:
+        await admission.acquire()
+    except Overloaded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail,
+                            headers={"Retry-After": str(e.retry_after)})
+
+
+@app.post("/api/chat/prefetch")
+async def chat_prefetch(req: PrefetchRequest):
+    """
+    Speculative retrieval while the visitor types (call on a debounce with the draft).
+    Embeds the draft and runs the vector search; the session's next /api/chat or
+    /api/chat/stream reuses the result when its message is close enough.
+    Not admission-controlled: when chat slots are full it is skipped instead.
+    """
+    tenant = _kb_tenant(req.tenant_id)
+    if admission.enabled and admission.in_flight >= admission.max_in_flight:
+        rag_engine.prefetch_cache.skip()
+        return {"status": "skipped", "reason": "busy"}
+    return await rag_engine.prefetch(req.message, session_id=req.session_id, tenant_id=tenant)
+
+
+@app.get("/api/chat/prefetch/stats")
+async def chat_prefetch_stats():
+    """Admin: prefetch hit rate (hit / miss / stale / changed) and retrieval time saved per hit."""
+    return rag_engine.prefetch_cache.stats()
+
+
+# ---------- Tenants ----------
+# Every KB / booking endpoint takes an optional `tenant_id` (default: "default").
+# Ingesting into a new tenant creates it; reading from one that has no
+# knowledge base yet is a 404.
+def _tenant(tenant_id: Optional[str]) -> str:
+    try:
+        return validate_tenant_id(tenant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _kb_tenant(tenant_id: Optional[str]) -> str:
+    """Validated tenant ID whose knowledge base exists (engine routes only)."""
+    tenant = _tenant(tenant_id)
+    try:
+        rag_engine.kb(tenant)
+    except UnknownTenant:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant}")
+    return tenant
+
+
+@app.get("/api/tenants")
+async def list_tenants():
+    """Admin: tenants with a knowledge base, plus open-KB cache stats (tune TENANT_CACHE_SIZE)."""
+    return {"tenants": rag_engine.tenants.tenants(), **rag_engine.tenants.stats()}
 
 
 # ---------- Document Ingestion ----------
-@app.post("/api/ingest/pdf", response_model=IngestionResponse)
-async def ingest_pdf(file: UploadFile = File(...)):
+# Ingestion runs as a background job: these endpoints return a job ID right
+# away and progress is polled via GET /api/ingest/jobs/{job_id}.
+def _job_response(job: dict) -> IngestJobResponse:
+    return IngestJobResponse(message="Ingestion job queued", job_id=job["id"], status=job["status"])
+
+
+@app.post("/api/ingest/pdf", response_model=IngestJobResponse, status_code=202)
+async def ingest_pdf(file: UploadFile = File(...), tenant_id: str = DEFAULT_TENANT):
     """Upload a PDF (brochure, pricing sheet, FAQ) and index it."""
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(400, "Only PDF files are supported here.")
-    try:
-        content = await file.read()
-        if len(content) < 10:
-            raise HTTPException(400, "Uploaded file is empty or too small.")
-        chunks = doc_loader.ingest_pdf_bytes(content, source_name=file.filename)
-        if not chunks:
-            return IngestionResponse(message="PDF processed but no text extracted (scanned image PDF?)", chunks_created=0)
-        rag_engine.add_documents(chunks)
-        return IngestionResponse(message="PDF indexed successfully", chunks_created=len(chunks))
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"PDF parsing error: {str(e)}")
+    content = await file.read()
+    if len(content) < 10:
+        raise HTTPException(400, "Uploaded file is empty or too small.")
+    filename = file.filename
+    job = ingest_jobs.submit(
+        "pdf", filename, lambda: doc_loader.iter_pdf_chunks(content, source_name=filename),
+        tenant_id=_tenant(tenant_id),
+    )
+    return _job_response(job)
 
 
-@app.post("/api/ingest/url", response_model=IngestionResponse)
-async def ingest_url(url: str):
+@app.post("/api/ingest/url", response_model=IngestJobResponse, status_code=202)
+async def ingest_url(url: str, tenant_id: str = DEFAULT_TENANT):
     """Scrape a blog/website URL and index its content."""
-    chunks = doc_loader.ingest_url(url)
-    rag_engine.add_documents(chunks)
-    return IngestionResponse(message="URL indexed successfully", chunks_created=len(chunks))
+    job = ingest_jobs.submit("url", url, lambda: doc_loader.ingest_url(url), tenant_id=_tenant(tenant_id))
+    return _job_response(job)
+
+
+@app.post("/api/ingest/crawl", response_model=IngestJobResponse, status_code=202)
+async def ingest_crawl(
+    url: str,
+    max_depth: Optional[int] = Query(None, ge=0, le=10),
+    max_pages: Optional[int] = Query(None, ge=1, le=5000),
+    sitemap: bool = False,
+    tenant_id: str = DEFAULT_TENANT,
+):
+    """
+    Crawl a whole site (same domain, following links or seeded from sitemap.xml).
+    Recrawls send If-None-Match / If-Modified-Since, so only changed pages are re-embedded.
+    """
+    tenant   = _tenant(tenant_id)
+    # Opening the KB and the crawl-state SQLite file is blocking I/O
+    manifest = (await run_in_threadpool(rag_engine.kb, tenant, True)).manifest
+    crawler  = await run_in_threadpool(doc_loader.site_crawler, max_depth, max_pages, manifest.has)
+    job = ingest_jobs.submit("crawl", url, lambda: doc_loader.iter_site_chunks(
+        url, crawler, use_sitemap=sitemap,
+    ), tenant_id=tenant, on_done=crawler.commit)
+    return _job_response(job)
+
+
+@app.post("/api/ingest/text", response_model=IngestJobResponse, status_code=202)
+async def ingest_text(text: str, source: str = "manual", replace: bool = False,
+                      tenant_id: str = DEFAULT_TENANT):
+    """
+    Directly paste business info (services, pricing, FAQs).
+    By default text is added to `source`; replace=true swaps out its previous content.
+    """
+    job = ingest_jobs.submit("text", source, lambda: doc_loader.ingest_raw_text(text, source_name=source),
+                             replace=replace, tenant_id=_tenant(tenant_id))
+    return _job_response(job)
+
+
+@app.post("/api/ingest/files", response_model=IngestJobResponse, status_code=202)
+async def ingest_files(files: List[UploadFile] = File(...), tenant_id: str = DEFAULT_TENANT):
+    """
+    Bulk upload: many PDF / .txt / .md / .html files, or .zip archives of them,
+    indexed as one job. Each file is its own source (re-uploads only embed changes).
+    """
+    tenant   = _tenant(tenant_id)
+    uploaded = [(f.filename, await f.read()) for f in files]
+    if not any(len(content) for _, content in uploaded):
+        raise HTTPException(400, "Uploaded files are empty.")
+    label = uploaded[0][0] if len(uploaded) == 1 else f"{len(uploaded)} files"
+    job = ingest_jobs.submit("files", label, lambda: doc_loader.iter_upload_chunks(uploaded),
+                             tenant_id=tenant)
+    return _job_response(job)
 
 
-@app.post("/api/ingest/text", response_model=IngestionResponse)
-async def ingest_text(text: str, source: str = "manual"):
-    """Directly paste business info (services, pricing, FAQs)."""
-    chunks = doc_loader.ingest_raw_text(text, source_name=source)
-    rag_engine.add_documents(chunks)
-    return IngestionResponse(message="Text indexed successfully", chunks_created=len(chunks))
+@app.post("/api/ingest/batch", response_model=IngestJobResponse, status_code=202)
+async def ingest_batch(request: Request, replace: bool = False, tenant_id: str = DEFAULT_TENANT):
+    """
+    Bulk text: an NDJSON body, one {"text": ..., "source": ..., "metadata": {...}} per line.
+    Records without a source go to "batch"; replace=true syncs each source to this batch.
+    """
+    tenant = _tenant(tenant_id)
+    try:
+        records = doc_loader.parse_ndjson((await request.body()).decode("utf-8"))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(400, f"Invalid NDJSON: {e}")
+    if not records:
+        raise HTTPException(400, "No records in request body.")
+    job = ingest_jobs.submit("batch", f"{len(records)} records", lambda: doc_loader.iter_records(records),
+                             replace=replace, tenant_id=tenant)
+    return _job_response(job)
+
+
+@app.get("/api/ingest/jobs")
+async def list_ingest_jobs(tenant_id: Optional[str] = None):
+    """Admin: recent ingestion jobs, newest first (all tenants unless `tenant_id` is given)."""
+    return ingest_jobs.list(_tenant(tenant_id) if tenant_id else None)
+
+
+@app.get("/api/ingest/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """Status, chunks embedded so far and timing for one ingestion job."""
+    job = ingest_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job
 
 
 # ---------- Appointment Booking ----------
@@ -129,30 +437,109 @@ async def book_appointment(req: BookingRequest):
         phone=req.phone,
         email=req.email,
         service=req.service,
-        preferred_time=req.preferred_time
+        preferred_time=req.preferred_time,
+        tenant_id=_tenant(req.tenant_id)
     )
     return {"status": "booked", "booking_id": record["id"], "details": record}
 
 
+def _booking_filters(status: Optional[str] = None, service: Optional[str] = None,
+                     phone: Optional[str] = None, created_from: Optional[str] = None,
+                     created_to: Optional[str] = None) -> dict:
+    """Shared query parameters of the bookings list and export (FastAPI dependency)."""
+    return {"status": status, "service": service, "phone": phone,
+            "created_from": created_from, "created_to": created_to}
+
+
 @app.get("/api/bookings")
-async def list_bookings():
-    """Admin: list all bookings."""
-    return appt_manager.get_all_bookings()
+async def list_bookings(
+    response: Response,
+    filters: dict = Depends(_booking_filters),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    tenant_id: str = DEFAULT_TENANT,
+):
+    """
+    Admin: list bookings, newest first.
+    Optional filters – `status`, `service` (case-insensitive), `phone` (last 10 digits),
+    `created_from` / `created_to` (ISO dates, [from, to)) – and `limit`/`offset`
+    pagination; the unpaginated total is returned in the X-Total-Count header.
+    """
+    tenant = _tenant(tenant_id)
+    try:
+        total = appt_manager.count_bookings(tenant_id=tenant, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["X-Total-Count"] = str(total)
+    return appt_manager.get_bookings(limit=limit, offset=offset, tenant_id=tenant, **filters)
+
+
+EXPORT_COLUMNS = ["id", "name", "phone", "email", "service", "preferred_time", "status", "created_at"]
+
+
+def _csv_cell(value) -> str:
+    """Neutralise spreadsheet formulas in visitor-supplied fields (phone numbers like +91… stay as is)."""
+    value = "" if value is None else str(value)
+    if value[:1] in ("=", "@", "\t", "\r") or (value[:1] in ("+", "-") and not value[1:2].isdigit()):
+        return "'" + value
+    return value
+
+
+def _export_rows(rows, fmt: str):
+    """Encodes rows in ~64 KB pieces as they come off the cursor."""
+    buf    = io.StringIO()
+    writer = csv.writer(buf)
+    if fmt == "csv":
+        buf.write("\ufeff")                 # BOM, so Excel opens Hindi names as UTF-8
+        writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        if fmt == "csv":
+            writer.writerow([_csv_cell(row[c]) for c in EXPORT_COLUMNS])
+        else:
+            buf.write(json.dumps(row, ensure_ascii=False) + "\n")
+        if buf.tell() >= 65536:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+@app.get("/api/bookings/export")
+async def export_bookings(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    filters: dict = Depends(_booking_filters),
+    tenant_id: str = DEFAULT_TENANT,
+):
+    """
+    Admin: every booking matching the filters (same as GET /api/bookings), newest first,
+    as a CSV or NDJSON download. Rows are streamed in batches, never held in memory at once.
+    """
+    tenant = _tenant(tenant_id)
+    try:
+        rows = appt_manager.iter_bookings(tenant_id=tenant, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filename = f"bookings-{tenant}-{time.strftime('%Y%m%d')}.{format}"
+    return StreamingResponse(
+        _export_rows(rows, format),   # sync generator → iterated in the threadpool
+        media_type="text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @app.patch("/api/bookings/{booking_id}/status")
-async def update_booking_status(booking_id: str, status: str):
+async def update_booking_status(booking_id: str, status: str, tenant_id: str = DEFAULT_TENANT):
     """Admin: update booking status (pending → confirmed / cancelled)."""
-    record = appt_manager.update_status(booking_id, status)
+    record = appt_manager.update_status(booking_id, status, tenant_id=_tenant(tenant_id))
     if not record:
         raise HTTPException(status_code=404, detail="Booking not found")
     return {"status": "updated", "booking": record}
 
 
 @app.delete("/api/bookings/{booking_id}")
-async def delete_booking(booking_id: str):
+async def delete_booking(booking_id: str, tenant_id: str = DEFAULT_TENANT):
     """Admin: delete a booking by ID."""
-    success = appt_manager.delete_booking(booking_id)
+    success = appt_manager.delete_booking(booking_id, tenant_id=_tenant(tenant_id))
     if not success:
         raise HTTPException(status_code=404, detail="Booking not found")
     return {"status": "deleted", "booking_id": booking_id}
@@ -160,11 +547,183 @@ async def delete_booking(booking_id: str):
 
 # ---------- Vector Store Management ----------
 @app.delete("/api/vectorstore/reset")
-async def reset_vectorstore():
-    """⚠️ Wipe all indexed documents (use carefully)."""
-    rag_engine.reset()
+async def reset_vectorstore(tenant_id: str = DEFAULT_TENANT):
+    """⚠️ Wipe all of one tenant's indexed documents (use carefully)."""
+    tenant = await run_in_threadpool(_kb_tenant, tenant_id)
+    await run_in_threadpool(rag_engine.reset, tenant)
     return {"status": "Vector store cleared"}
 
 
+# ---------- Snapshots ----------
+# A .kbsnap holds a tenant's chunks, metadata, float32 vectors and FAQ entries;
+# restoring one embeds nothing. KB_SNAPSHOT_DIR snapshots load at startup.
+@app.get("/api/snapshot")
+async def download_snapshot(tenant_id: str = DEFAULT_TENANT):
+    """Admin: export a tenant's knowledge base as a .kbsnap file."""
+    tenant = _kb_tenant(tenant_id)
+    fd, path = tempfile.mkstemp(suffix=".kbsnap")
+    os.close(fd)
+    try:
+        await run_in_threadpool(rag_engine.export_snapshot, path, tenant)
+    except Exception:
+        os.remove(path)
+        raise
+    filename = f"{tenant}-{time.strftime('%Y%m%d-%H%M%S')}.kbsnap"
+    return FileResponse(path, media_type="application/zip", filename=filename,
+                        background=BackgroundTask(os.remove, path))
+
+
+@app.post("/api/snapshot")
+async def restore_snapshot(file: UploadFile = File(...), tenant_id: Optional[str] = None,
+                           replace: bool = True):
+    """
+    Admin: restore a .kbsnap (into the tenant it came from unless `tenant_id` is given).
+    replace=true (default) wipes the tenant's chunks and FAQs first; false upserts.
+    """
+    tenant = _tenant(tenant_id) if tenant_id else None
+    fd, path = tempfile.mkstemp(suffix=".kbsnap")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            await run_in_threadpool(shutil.copyfileobj, file.file, out, 1 << 20)
+        result = await run_in_threadpool(rag_engine.import_snapshot, path, tenant, replace)
+    except ValueError as e:          # SnapshotError, bad tenant ID in the snapshot
+        raise HTTPException(400, str(e))
+    finally:
+        os.remove(path)
+    return {"status": "restored", **result}
+
+
+# ---------- Sources ----------
+# Re-ingesting a PDF / URL only embeds new or changed chunks and drops stale ones;
+# a single source can also be removed without resetting the whole store.
+@app.get("/api/sources")
+async def list_sources(tenant_id: str = DEFAULT_TENANT):
+    """Admin: indexed sources with their chunk counts."""
+    return rag_engine.list_sources(_kb_tenant(tenant_id))
+
+
+@app.delete("/api/sources/{source:path}")
+async def delete_source(source: str, tenant_id: str = DEFAULT_TENANT):
+    """Admin: remove every chunk of one source (file name, URL or text source)."""
+    tenant  = await run_in_threadpool(_kb_tenant, tenant_id)
+    removed = await run_in_threadpool(rag_engine.delete_source, source, tenant)
+    if not removed:
+        raise HTTPException(status_code=404, detail="Source not found")
+    return {"status": "deleted", "source": source, "chunks_removed": removed}
+
+
+# ---------- FAQ Fast Path ----------
+# Curated Q/A pairs: a confident match is answered without calling the LLM.
+@app.get("/api/faq")
+async def list_faqs(tenant_id: str = DEFAULT_TENANT):
+    """Admin: list curated FAQ entries."""
+    return rag_engine.kb(_kb_tenant(tenant_id)).faq.list()
+
+
+@app.post("/api/faq")
+async def add_faq(req: FAQRequest, tenant_id: str = DEFAULT_TENANT):
+    """Admin: add a question/answer pair (add paraphrases as separate entries)."""
+    if not req.question.strip() or not req.answer.strip():
+        raise HTTPException(400, "Both question and answer are required.")
+    tenant = _tenant(tenant_id)
+
+    def add():
+        # Opens the KB and embeds the question (ONNX) – keep it off the event loop
+        return rag_engine.kb(tenant, create=True).faq.add(req.question, req.answer)
+
+    return {"status": "added", "faq": await run_in_threadpool(add)}
+
+
+@app.delete("/api/faq/{faq_id}")
+async def delete_faq(faq_id: str, tenant_id: str = DEFAULT_TENANT):
+    """Admin: delete an FAQ entry by ID."""
+    if not rag_engine.kb(_kb_tenant(tenant_id)).faq.delete(faq_id):
+        raise HTTPException(status_code=404, detail="FAQ not found")
+    return {"status": "deleted", "faq_id": faq_id}
+
+
+@app.get("/api/faq/stats")
+async def faq_stats(tenant_id: str = DEFAULT_TENANT):
+    """Admin: FAQ fast-path hit/miss counters (use to tune FAQ_THRESHOLD)."""
+    return rag_engine.kb(_kb_tenant(tenant_id)).faq.stats()
+
+
+# ---------- Intent Rules ----------
+@app.get("/api/intent/rules")
+async def get_intent_rules():
+    """Admin: current keyword rule sets (question / booking / pricing)."""
+    return classifier.rules
+
+
+@app.put("/api/intent/rules")
+async def update_intent_rules(rules: dict[str, list[str]]):
+    """Admin: replace the rule sets; recompiled and saved to INTENT_RULES_PATH."""
+    missing = {"question", "booking", "pricing"} - rules.keys()
+    if missing:
+        raise HTTPException(400, f"Missing rule sets: {', '.join(sorted(missing))}")
+    classifier.load(rules)
+    classifier.save_file()
+    return {"status": "updated", "keywords": {k: len(v) for k, v in rules.items()}}
+
+
+@app.post("/api/intent/rules/reload")
+async def reload_intent_rules():
+    """Admin: re-read INTENT_RULES_PATH (e.g. after another worker saved it)."""
+    if not classifier.load_file():
+        raise HTTPException(status_code=404, detail="Rules file not found")
+    return {"status": "reloaded", "keywords": {k: len(v) for k, v in classifier.rules.items()}}
+
+
+@app.post("/api/intent/classify")
+async def classify_messages(req: ClassifyRequest):
+    """Batch intent classification, e.g. for offline analysis of chat logs."""
+    return [{"message": m, **r} for m, r in zip(req.messages, classifier.classify_batch(req.messages))]
+
+
+# ---------- Answer Cache ----------
+@app.get("/api/cache/stats")
+async def answer_cache_stats(tenant_id: str = DEFAULT_TENANT):
+    """Admin: semantic answer-cache hit/miss counters (use to tune ANSWER_CACHE_THRESHOLD)."""
+    return rag_engine.kb(_kb_tenant(tenant_id)).answer_cache.stats()
+
+
+@app.get("/api/cache/embeddings")
+async def embedding_cache_stats():
+    """Admin: persistent embedding-cache size and hit rate."""
+    cache = rag_engine.embeddings._cache
+    return cache.stats() if cache else {"enabled": False}
+
+
+@app.get("/api/admission")
+async def admission_stats():
+    """Admin: chat admission control – in flight, queued, shed (tune CHAT_MAX_IN_FLIGHT)."""
+    return admission.stats()
+
+
+@app.get("/api/llm/stats")
+async def llm_stats():
+    """Admin: per-provider LLM latency, hedges, fallbacks and 429 retries."""
+    return rag_engine.dispatcher.stats()
+
+
+@app.get("/api/history/stats")
+async def history_stats():
+    """Admin: history compaction – prompt tokens sent vs verbatim history, summaries written."""
+    return rag_engine.history.stats()
+
+
+@app.get("/api/embeddings/batching")
+async def embedding_batch_stats():
+    """Admin: query-embedding micro-batcher stats (batch sizes, queue wait)."""
+    return rag_engine.query_batcher.stats()
+
+
+# ---------- Metrics ----------
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape: per-stage and per-route latency histograms, counters, queue gauges."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,149 @@
+# ============================================================
+#  Metrics – per-stage latency histograms, counters and gauges
+#  rendered in the Prometheus text format on GET /metrics
+#  (dependency-free; no prometheus_client needed)
+# ============================================================
+
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+# ─── Config ─────────────────────────────────────────────────
+TIMING_HEADERS = os.getenv("METRICS_TIMING_HEADERS", "0") == "1"   # Server-Timing per response
+PREFIX         = "sales_agent"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: list = []
+
+# Stage timings of the current request (set by the HTTP middleware)
+request_timings: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def _fmt_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{str(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name, self.help, self.labels = f"{PREFIX}_{name}", help, labels
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(self.labels, key)} {v}")
+        return lines
+
+
+class Histogram:
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = f"{PREFIX}_{name}", help, labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[tuple, list] = {}   # key → [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            s = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, s in sorted(self._series.items()):
+                for b, c in zip(self.buckets, s):
+                    le = 'le="%s"' % b
+                    lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {c}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {s[-1]}")
+                lines.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {s[-2]}")
+                lines.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {s[-1]}")
+        return lines
+
+
+class Gauge:
+    """Value is read from `fn` at scrape time (sizes, queue depths, counts)."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float] = None):
+        self.name, self.help, self.fn = f"{PREFIX}_{name}", help, fn
+        _registry.append(self)
+
+    def set_function(self, fn: Callable[[], float]):
+        self.fn = fn
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        if self.fn is not None:
+            try:
+                lines.append(f"{self.name} {float(self.fn())}")
+            except Exception:
+                pass   # a failing gauge must never break the scrape
+        return lines
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ─── Standard Metrics ────────────────────────────────────────
+STAGE_SECONDS = Histogram("stage_seconds",
+                          "Latency of each pipeline stage (chat, ingestion, loading)", ("stage",))
+HTTP_SECONDS  = Histogram("http_request_seconds",
+                          "HTTP request latency by route", ("method", "route", "status"))
+CHAT_TOTAL    = Counter("chat_requests_total",
+                        "Chat requests by fast path (faq | cache | llm)", ("path",))
+CHUNKS_TOTAL  = Counter("ingested_chunks_total",
+                        "Chunks written to / removed from the vector store", ("action",))
+PROMPT_TOKENS = Histogram("prompt_tokens",
+                          "Estimated LLM prompt tokens per chat turn (history | context | total)", ("part",),
+                          buckets=(50, 100, 200, 400, 800, 1200, 1600, 2400, 3200, 4800))
+
+
+@contextmanager
+def timed(stage: str):
+    """Observe the block's duration under STAGE_SECONDS{stage=...} and the request's Server-Timing."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def server_timing_header(timings: dict, total: float) -> str:
+    parts = [f"{stage};dur={secs * 1000:.1f}" for stage, secs in timings.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
@@ -0,0 +1,344 @@
+# ============================================================
+#  NumPy Vector Store – brute-force cosine search over one
+#  contiguous, memory-mapped matrix. For small knowledge bases
+#  (a few thousand chunks) a single matrix-vector product beats
+#  a round trip through Chroma's client and HNSW layers.
+# ============================================================
+
+import os
+import json
+import sqlite3
+import threading
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+# ─── Config ─────────────────────────────────────────────────
+NUMPY_INDEX_DTYPE = os.getenv("NUMPY_INDEX_DTYPE", "float32")   # "float32" | "int8" (¼ the memory)
+INITIAL_CAPACITY  = 1024       # rows; the matrix file doubles when full
+SCORE_BLOCK_ROWS  = 8192       # int8 rows upcast per block, bounds the temporary float32 copy
+
+_DTYPES = {"float32": np.float32, "int8": np.int8}
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Drop-in for the langchain_chroma.Chroma calls the engine makes
+    (add_documents, similarity_search_by_vector, get, delete, reset_collection).
+
+    Vectors are L2-normalised and kept as rows 0..n-1 of a memory-mapped .npy
+    matrix, so a query is `matrix @ q` plus an argpartition for the top k.
+    Deletes move the last row into the freed slot, keeping the matrix
+    contiguous. With dtype "int8" each row is stored as round(v / max|v| · 127)
+    with its scale, and scored block-wise. Chunk text and metadata live in a
+    SQLite file beside the matrix and are read only for the k results.
+    """
+
+    def __init__(self, collection_name: str, embedding_function: Embeddings,
+                 persist_directory: Optional[str] = None, dtype: str = NUMPY_INDEX_DTYPE):
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported NUMPY_INDEX_DTYPE: {dtype!r} (float32 | int8)")
+        self.collection_name = collection_name
+        self._embedding      = embedding_function
+        self.dtype           = dtype
+        self._lock           = threading.RLock()
+
+        # persist_directory=None → in-memory matrix and SQLite (tests, benchmarks)
+        self._dir = persist_directory
+        if persist_directory:
+            os.makedirs(persist_directory, exist_ok=True)
+            db_path = os.path.join(persist_directory, f"{collection_name}.sqlite3")
+        else:
+            db_path = ":memory:"
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        if persist_directory:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " id       TEXT PRIMARY KEY,"
+            " row      INTEGER NOT NULL,"
+            " document TEXT NOT NULL,"
+            " metadata TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._load()
+
+    # ── Matrix file ─────────────────────────────────────────
+    def _path(self, name: str) -> Optional[str]:
+        return os.path.join(self._dir, f"{self.collection_name}.{name}.npy") if self._dir else None
+
+    def _allocate(self, name: str, shape: tuple, dtype) -> np.ndarray:
+        path = self._path(name)
+        if path is None:
+            return np.zeros(shape, dtype=dtype)
+        return np.lib.format.open_memmap(path + ".tmp", mode="w+", dtype=dtype, shape=shape)
+
+    def _publish(self, name: str, array: np.ndarray) -> np.ndarray:
+        """Atomically replace the on-disk file with a freshly allocated one."""
+        path = self._path(name)
+        if path is None:
+            return array
+        array.flush()
+        os.replace(path + ".tmp", path)
+        return np.load(path, mmap_mode="r+")
+
+    def _load(self):
+        rows = self._conn.execute("SELECT id, row FROM chunks ORDER BY row").fetchall()
+        self._ids    = [cid for cid, _ in rows]
+        self._row_of = {cid: row for cid, row in rows}
+        self._vectors = None    # dimension is known after the first add
+        self._scales  = None
+        if not self._dir:
+            return
+        other = "int8" if self.dtype == "float32" else "float32"
+        if os.path.exists(self._path(self.dtype)):
+            self._vectors = np.load(self._path(self.dtype), mmap_mode="r+")
+            if self.dtype == "int8":
+                self._scales = np.load(self._path("scales"), mmap_mode="r+")
+        elif self._ids and os.path.exists(self._path(other)):
+            self._convert(other)
+        if self._ids and (self._vectors is None or len(self._vectors) < len(self._ids)):
+            raise RuntimeError(f"{self.collection_name}: matrix file is missing rows of the chunk table")
+
+    def _convert(self, old_dtype: str):
+        """NUMPY_INDEX_DTYPE changed: re-encode the existing matrix once."""
+        n   = len(self._ids)
+        old = np.load(self._path(old_dtype), mmap_mode="r")[:n].astype(np.float32)
+        if old_dtype == "int8":
+            old *= np.load(self._path("scales"), mmap_mode="r")[:n, None]
+        encoded, scales = self._encode(old)
+        self._ids, ids = [], self._ids
+        self._reserve(n, encoded.shape[1])
+        self._ids = ids
+        self._vectors[:n] = encoded
+        if scales is not None:
+            self._scales[:n] = scales
+        self._flush()
+        # The old matrix no longer tracks deletes; switching back re-converts instead
+        os.remove(self._path(old_dtype))
+        if old_dtype == "int8":
+            os.remove(self._path("scales"))
+        print(f"🔁 {self.collection_name}: converted {n} vectors {old_dtype} → {self.dtype}")
+
+    def _flush(self):
+        # Matrix rows reach the file before the chunk table points at them
+        for array in (self._vectors, self._scales):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    def _reserve(self, extra: int, dim: int):
+        """Grow the matrix (doubling) so `extra` more rows fit."""
+        n, capacity = len(self._ids), 0 if self._vectors is None else len(self._vectors)
+        if n + extra <= capacity:
+            return
+        new_capacity = max(INITIAL_CAPACITY, capacity)
+        while new_capacity < n + extra:
+            new_capacity *= 2
+        vectors = self._allocate(self.dtype, (new_capacity, dim), _DTYPES[self.dtype])
+        if n:
+            vectors[:n] = self._vectors[:n]
+        self._vectors = self._publish(self.dtype, vectors)
+        if self.dtype == "int8":
+            scales = self._allocate("scales", (new_capacity,), np.float32)
+            if n:
+                scales[:n] = self._scales[:n]
+            self._scales = self._publish("scales", scales)
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        if self.dtype == "float32":
+            return vectors, None
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+    # ── VectorStore interface ───────────────────────────────
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids       = list(ids) if ids else [os.urandom(16).hex() for _ in texts]
+        vectors   = self._embedding.embed_documents(texts)
+        return self.add_vectors(vectors, texts, metadatas, ids)
+
+    def add_vectors(self, vectors, texts: List[str], metadatas: List[dict], ids: List[str]) -> List[str]:
+        """Already-embedded chunks (snapshots, benchmarks). Existing IDs are overwritten."""
+        encoded, scales = self._encode(np.asarray(vectors, dtype=np.float32))
+        with self._lock:
+            self._reserve(len(ids), encoded.shape[1])
+            records = []
+            for i, cid in enumerate(ids):
+                row = self._row_of.get(cid)
+                if row is None:
+                    row = len(self._ids)
+                    self._ids.append(cid)
+                    self._row_of[cid] = row
+                self._vectors[row] = encoded[i]
+                if scales is not None:
+                    self._scales[row] = scales[i]
+                records.append((cid, row, texts[i], json.dumps(metadatas[i] or {}, ensure_ascii=False)))
+            self._flush()
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?)", records)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> None:
+        with self._lock:
+            moved = {}   # id → new row
+            for cid in ids or []:
+                row = self._row_of.pop(cid, None)
+                if row is None:
+                    continue
+                last_id = self._ids.pop()
+                if last_id != cid:
+                    # Move the last row into the hole
+                    self._vectors[row] = self._vectors[len(self._ids)]
+                    if self._scales is not None:
+                        self._scales[row] = self._scales[len(self._ids)]
+                    self._ids[row]       = last_id
+                    self._row_of[last_id] = row
+                    moved[last_id]       = row
+                moved.pop(cid, None)
+            self._flush()
+            with self._conn:
+                self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(cid,) for cid in ids or []])
+                self._conn.executemany("UPDATE chunks SET row = ? WHERE id = ?",
+                                       [(row, cid) for cid, row in moved.items()])
+
+    def _scores(self, query: np.ndarray) -> np.ndarray:
+        n = len(self._ids)
+        if self.dtype == "float32":
+            return self._vectors[:n] @ query
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, SCORE_BLOCK_ROWS):
+            end = min(n, start + SCORE_BLOCK_ROWS)
+            scores[start:end] = self._vectors[start:end].astype(np.float32) @ query
+        return scores * self._scales[:n]
+
+    def _top_k(self, embedding: List[float], k: int) -> List[Tuple[str, float]]:
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or k <= 0:
+                return []
+            scores = self._scores(query)
+            if k < n:
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top])]
+            else:
+                top = np.argsort(-scores)
+            return [(self._ids[i], float(scores[i])) for i in top]
+
+    def _documents(self, ids: List[str]) -> dict:
+        marks = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, document, metadata FROM chunks WHERE id IN ({marks})", ids
+            ).fetchall()
+        return {cid: Document(page_content=text, metadata=json.loads(meta), id=cid)
+                for cid, text, meta in rows}
+
+    def similarity_search_by_vector_with_scores(self, embedding: List[float], k: int = 4,
+                                                **kwargs: Any) -> List[Tuple[Document, float]]:
+        """(document, cosine similarity), best first."""
+        hits = self._top_k(embedding, k)
+        if not hits:
+            return []
+        docs = self._documents([cid for cid, _ in hits])
+        return [(docs[cid], score) for cid, score in hits if cid in docs]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4,
+                                    **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_scores(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k)
+
+    def similarity_search_with_score(self, query: str, k: int = 4,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Scores are cosine distances (lower is closer), like a cosine-space Chroma collection."""
+        hits = self.similarity_search_by_vector_with_scores(self._embedding.embed_query(query), k)
+        return [(doc, 1.0 - score) for doc, score in hits]
+
+    def _select_relevance_score_fn(self):
+        return self._cosine_relevance_score_fn
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, collection_name: str = "langchain",
+                   persist_directory: Optional[str] = None, **kwargs: Any) -> "NumpyVectorStore":
+        store = cls(collection_name, embedding, persist_directory, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    # ── Chroma-compatible helpers ───────────────────────────
+    def get(self, ids: Optional[List[str]] = None, where: Optional[dict] = None,
+            include: Optional[List[str]] = None, **kwargs: Any) -> dict:
+        """Subset of Chroma's get(): ids and/or a flat {"key": value} metadata filter."""
+        include = ["documents", "metadatas"] if include is None else include
+        sql, args = "SELECT id, document, metadata FROM chunks", []
+        if ids is not None:
+            sql += f" WHERE id IN ({','.join('?' * len(ids))})"
+            args += list(ids)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY row", args).fetchall()
+        if where:
+            rows = [r for r in rows if all(json.loads(r[2]).get(key) == value for key, value in where.items())]
+        result = {"ids": [r[0] for r in rows]}
+        if "documents" in include:
+            result["documents"] = [r[1] for r in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [json.loads(r[2]) for r in rows]
+        return result
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def iter_batches(self, batch_size: int = 1000):
+        """(ids, texts, metadatas, float32 vectors) in row order – snapshot export."""
+        for start in range(0, len(self._ids), batch_size):
+            with self._lock:
+                ids     = self._ids[start:start + batch_size]
+                vectors = np.asarray(self._vectors[start:start + len(ids)], dtype=np.float32)
+                if self._scales is not None:
+                    vectors = vectors * self._scales[start:start + len(ids), None]
+                data = self.get(ids=ids)
+            by_id = dict(zip(data["ids"], zip(data["documents"], data["metadatas"])))
+            yield ids, [by_id[i][0] for i in ids], [by_id[i][1] for i in ids], vectors
+
+    def reset_collection(self) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM chunks")
+            self._ids, self._row_of = [], {}
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the n live rows (matrix + int8 scales)."""
+        n = len(self._ids)
+        if self._vectors is None or n == 0:
+            return 0
+        return self._vectors[:n].nbytes + (self._scales[:n].nbytes if self._scales is not None else 0)
+
+    @staticmethod
+    def exists(persist_directory: str, collection_name: str) -> bool:
+        return os.path.exists(os.path.join(persist_directory, f"{collection_name}.sqlite3"))
+
+    @staticmethod
+    def collections(persist_directory: str) -> List[str]:
+        if not os.path.isdir(persist_directory):
+            return []
+        return [f[:-len(".sqlite3")] for f in os.listdir(persist_directory) if f.endswith(".sqlite3")]
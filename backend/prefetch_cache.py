@@ -0,0 +1,148 @@
+# ============================================================
+#  Prefetch Cache – retrieval results computed while the visitor
+#  is still typing (POST /api/chat/prefetch), one short-lived
+#  entry per session, reused when the sent message is close enough
+# ============================================================
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Optional
+
+from metrics import Counter
+
+# ─── Config ─────────────────────────────────────────────────
+PREFETCH_ENABLED        = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_TTL            = float(os.getenv("PREFETCH_TTL", "30"))            # seconds
+PREFETCH_MAX_SESSIONS   = int(os.getenv("PREFETCH_MAX_SESSIONS", "2000"))
+PREFETCH_MIN_CHARS      = int(os.getenv("PREFETCH_MIN_CHARS", "8"))         # shorter drafts are skipped
+# Character similarity between the prefetched draft and the sent message
+# ("what are your gym fe" vs "what are your gym fees?" ≈ 0.95)
+PREFETCH_MIN_SIMILARITY = float(os.getenv("PREFETCH_MIN_SIMILARITY", "0.9"))
+
+PREFETCH_TOTAL = Counter("prefetch_total",
+                         "Retrieval prefetches and chat lookups (stored | skipped | hit | miss | stale | changed)",
+                         ("result",))
+
+_PUNCT = re.compile(r"[^\w\s]+", re.UNICODE)
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Lower case, no punctuation, single spaces – what the similarity is measured on."""
+    return _SPACE.sub(" ", _PUNCT.sub(" ", text.lower())).strip()
+
+
+class PrefetchCache:
+    """
+    LRU + TTL, keyed by tenant:session. Each entry holds the draft's query
+    embedding and the vector-search candidates, plus the KB version they were
+    read at (a write to the tenant's KB makes them stale). A close draft is
+    good enough for retrieval, but FAQ / answer-cache matching needs the sent
+    message's own embedding, so the draft's is only reused on an exact match.
+    take() removes the entry: a prefetch serves at most one chat turn.
+    """
+
+    def __init__(self, ttl: float = PREFETCH_TTL, max_sessions: int = PREFETCH_MAX_SESSIONS,
+                 min_similarity: float = PREFETCH_MIN_SIMILARITY):
+        self.ttl            = ttl
+        self.max_sessions   = max_sessions
+        self.min_similarity = min_similarity
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Stats
+        self.stored        = 0
+        self.skipped       = 0
+        self.evicted       = 0
+        self.hits          = 0
+        self.misses        = 0     # no prefetch for the session
+        self.stale         = 0     # expired, or the KB changed since
+        self.changed       = 0     # sent message too different from the draft
+        self.saved_seconds = 0.0   # search (+ embed, on exact matches) time the hits did not pay
+
+    def has(self, session_key: str, text: str, kb_version: int) -> bool:
+        """True when a fresh entry for exactly this draft exists (the prefetch can be skipped)."""
+        with self._lock:
+            e = self._entries.get(session_key)
+            return (e is not None and e["text"] == normalize(text) and e["kb_version"] == kb_version
+                    and time.monotonic() - e["created"] <= self.ttl)
+
+    def skip(self):
+        self.skipped += 1
+        PREFETCH_TOTAL.inc(result="skipped")
+
+    def store(self, session_key: str, text: str, kb_version: int, embedding,
+              candidates: list, embed_seconds: float, search_seconds: float, started: float):
+        """`started` orders overlapping prefetches of one session: an older draft never replaces a newer one."""
+        with self._lock:
+            current = self._entries.get(session_key)
+            if current is not None and current["started"] > started:
+                return
+            self._entries[session_key] = {
+                "text":       normalize(text),
+                "kb_version": kb_version,
+                "embedding":  embedding,
+                "candidates": candidates,
+                "embed_s":    embed_seconds,
+                "search_s":   search_seconds,
+                "started":    started,
+                "created":    time.monotonic(),
+            }
+            self._entries.move_to_end(session_key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+            self.stored += 1
+        PREFETCH_TOTAL.inc(result="stored")
+
+    def take(self, session_key: str, message: str, kb_version: int) -> Optional[dict]:
+        """
+        The prefetched {"embedding", "candidates", "similarity", "exact"} for this
+        message, or None. The embedding is the draft's: only use it when "exact".
+        """
+        with self._lock:
+            e = self._entries.pop(session_key, None)
+        if e is None:
+            self.misses += 1
+            PREFETCH_TOTAL.inc(result="miss")
+            return None
+        if time.monotonic() - e["created"] > self.ttl or e["kb_version"] != kb_version:
+            self.stale += 1
+            PREFETCH_TOTAL.inc(result="stale")
+            return None
+        text       = normalize(message)
+        similarity = 1.0 if text == e["text"] else SequenceMatcher(None, e["text"], text).ratio()
+        if similarity < self.min_similarity:
+            self.changed += 1
+            PREFETCH_TOTAL.inc(result="changed")
+            return None
+        exact = text == e["text"]
+        self.hits          += 1
+        self.saved_seconds += e["search_s"] + (e["embed_s"] if exact else 0.0)
+        PREFETCH_TOTAL.inc(result="hit")
+        return {"embedding": e["embedding"], "candidates": e["candidates"],
+                "similarity": similarity, "exact": exact}
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.stale + self.changed
+        return {
+            "enabled":          PREFETCH_ENABLED,
+            "size":             len(self._entries),
+            "max_sessions":     self.max_sessions,
+            "ttl":              self.ttl,
+            "min_similarity":   self.min_similarity,
+            "prefetches":       self.stored,
+            "skipped":          self.skipped,
+            "evicted":          self.evicted,
+            "lookups":          lookups,
+            "hits":             self.hits,
+            "misses":           self.misses,
+            "stale":            self.stale,
+            "changed":          self.changed,
+            "hit_rate":         round(self.hits / lookups, 4) if lookups else 0.0,
+            "saved_ms_per_hit": round(1000 * self.saved_seconds / self.hits, 1) if self.hits else 0.0,
+        }
@@ -3,7 +3,14 @@
 # ============================================================
 
 import os
+import time
 import asyncio
+from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+import numpy as np
 
 # Redirect all cache dirs to /tmp (writable on any host incl. Render)
 for _k, _v in [
@@ -16,24 +23,43 @@ for _k, _v in [
 
 from dotenv import load_dotenv
 
-from langchain_chroma import Chroma
 from langchain_core.embeddings import Embeddings
-from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnableLambda, RunnablePassthrough
-from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.documents import Document
 
+from embedding_cache import EmbeddingCache, EMBED_CACHE_ENABLED
+from embed_batcher import QueryEmbeddingBatcher
+from session_store import make_session_store
+from history_manager import HistoryManager, HISTORY_COMPACTION, HISTORY_SUMMARY_PROVIDER
+from source_manifest import chunk_id
+from tenants import TenantRegistry, TenantKB, DEFAULT_TENANT, VECTOR_BACKEND, validate_tenant_id
+from intent_classifier import classifier, detect_intent, is_booking_action  # noqa: F401 (re-exported)
+from context_builder import build_context, estimate_tokens, RETRIEVAL_FETCH_K
+from answer_cache import CACHE_ENABLED, history_key
+from prefetch_cache import PrefetchCache, PREFETCH_ENABLED, PREFETCH_MIN_CHARS
+from llm_dispatcher import LLMDispatcher, LLMProvider, parse_providers, LLM_HEDGE_PROVIDERS
+from metrics import timed, STAGE_SECONDS, CHAT_TOTAL, CHUNKS_TOTAL, PROMPT_TOKENS
+import snapshot
+
 load_dotenv()
 
 # ─── Config ─────────────────────────────────────────────────
 GROQ_API_KEY       = os.getenv("GROQ_API_KEY", "")
 LLM_MODEL          = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")
 CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "/tmp/chroma_db")
-COLLECTION_NAME    = "business_knowledge"
-HISTORY_WINDOW     = 5     # number of past conversation pairs to retain
+HISTORY_WINDOW     = 5     # at most this many past pairs go to the LLM verbatim (history_manager.py)
+ADD_BATCH_SIZE     = int(os.getenv("INGEST_BATCH_SIZE", "64"))     # chunks per embed call / store write
+# Ingestion embeds up to INGEST_EMBED_WORKERS batches ahead while the previous
+# batch is written, so at most workers + 1 batches of vectors are held at once
+INGEST_EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", "2"))
+# ONNX model files; point at a directory filled at build time (bake_model.py)
+# so startup never downloads. Empty → Chroma's default cache under $HOME.
+EMBED_MODEL_DIR    = os.getenv("EMBED_MODEL_DIR", "")
+# Threads for CPU-bound query embedding, FAQ match and vector search – kept off
+# the default executor so nothing else (file I/O, sync handlers) can starve them
+RETRIEVAL_WORKERS  = int(os.getenv("RETRIEVAL_WORKERS", str(min(4, (os.cpu_count() or 1) + 1))))
 
 # ─── Sales System Prompt ─────────────────────────────────────
 SALES_PROMPT = ChatPromptTemplate.from_messages([
@@ -54,74 +80,48 @@ Business Context:
     ("human", "{question}"),
 ])
 
-# ─── Intent Detection ─────────────────────────────────────────
-PRICING_KEYWORDS = ["price", "cost", "fee", "charge", "kitna", "rate", "package",
-                    "pricing", "plan", "paisa", "rupee", "how much", "fees"]
-
-# Informational question indicators — these mean user is ASKING, not REQUESTING
-_QUESTION_SIGNALS = [
-    # English
-    "how to", "how do", "how can", "how does", "what is", "what are", "what's",
-    "do you", "do i", "can i", "can you", "is there", "are there", "tell me",
-    "explain", "describe", "information", "details", "about", "process",
-    "works", "working",
-    # Hindi
-    "kaise", "kya hai", "kya hota", "kya h", "batao", "bata do", "samjhao",
-    "ke baare", "ke baarein", "kaise hoti", "kaise hota", "kya process",
-    "kya karna", "kya karu",
-]
-
-# Explicit booking ACTION phrases — user wants to book RIGHT NOW
-_BOOKING_ACTIONS = [
-    # English
-    "book now", "book it", "book an appointment", "book a slot", "please book",
-    "i want to book", "i'd like to book", "i would like to book",
-    "schedule an appointment", "fix an appointment", "make an appointment",
-    "set up an appointment",
-    # Hindi
-    "book karna hai", "book kar do", "book karo", "book kar lo",
-    "appointment karo", "appointment kar do", "appointment chahiye",
-    "appointment lena hai", "milna hai", "slot chahiye", "booking karni hai",
-    "booking kar do", "haan book", "ha book", "appointment fix",
-    "schedule kar", "abhi book", "abhi appointment",
-]
-
-def is_booking_action(message: str) -> bool:
-    """Returns True ONLY when user is actively requesting to book (not just asking about it)."""
-    msg = message.lower().strip()
-    # Question mark → informational query, not an action
-    if msg.endswith("?"):
-        return False
-    # If message contains question/informational signals → not a booking action
-    if any(q in msg for q in _QUESTION_SIGNALS):
-        return False
-    # Check for explicit booking action phrases
-    return any(k in msg for k in _BOOKING_ACTIONS)
-
-def detect_intent(message: str) -> str:
-    msg = message.lower()
-    if is_booking_action(msg): return "booking"
-    if any(k in msg for k in PRICING_KEYWORDS): return "pricing"
-    return "query"
-
-def format_docs(docs: list) -> str:
-    if not docs:
-        return "No specific business information found for this query."
-    return "\n\n".join(d.page_content for d in docs)
-
-
 # ─── Lightweight Embeddings (ChromaDB ONNX, no PyTorch/Rust) ─
 class _ChromaEmbeddings(Embeddings):
-    """Wraps ChromaDB's built-in all-MiniLM-L6-v2 ONNX model."""
+    """Wraps ChromaDB's built-in all-MiniLM-L6-v2 ONNX model, with a persistent vector cache."""
+    MODEL_ID = "chroma-onnx/all-MiniLM-L6-v2"
+
     def __init__(self):
-        self._ef = DefaultEmbeddingFunction()
+        # One instance, so the ONNX session and tokenizer load once (Chroma's
+        # DefaultEmbeddingFunction builds a fresh ONNXMiniLM_L6_V2 per call)
+        self._ef    = ONNXMiniLM_L6_V2()
+        if EMBED_MODEL_DIR:
+            self._ef.DOWNLOAD_PATH = Path(EMBED_MODEL_DIR)
+        self._cache = EmbeddingCache(self.MODEL_ID) if EMBED_CACHE_ENABLED else None
+
+    def warm_up(self):
+        """Download (if needed) and load the model now; bypasses the vector cache."""
+        self._ef(["warm up"])
+
+    def _embed(self, texts: list[str]) -> list[np.ndarray]:
+        if self._cache is None:
+            return list(self._ef(texts))
+
+        keys   = [self._cache.key(t) for t in texts]
+        found  = self._cache.get_many(keys)
+        # Deduplicate misses so repeated chunks are embedded once
+        todo   = {k: t for k, t in zip(keys, texts) if k not in found}
+        if todo:
+            fresh = dict(zip(todo.keys(), self._ef(list(todo.values()))))
+            self._cache.put_many(fresh)
+            found.update(fresh)
+        return [found[k] for k in keys]
 
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        # Convert np.float32 → plain Python float (ChromaDB strict requirement)
-        return [[float(x) for x in v] for v in self._ef(texts)]
+        # np.float32 → plain Python float (ChromaDB strict requirement), done in C via tolist()
+        return [np.asarray(v, dtype=np.float32).tolist() for v in self._embed(texts)]
 
     def embed_query(self, text: str) -> list[float]:
-        return [float(x) for x in self._ef([text])[0]]
+        return np.asarray(self._embed([text])[0], dtype=np.float32).tolist()
+
+
+def _groq(model: str, api_key: str) -> ChatGroq:
+    # Retries are the dispatcher's job (429 backoff, fallback to another provider)
+    return ChatGroq(api_key=api_key, model=model, temperature=0.5, max_tokens=512, max_retries=0)
 
 
 # ─── RAG Engine ───────────────────────────────────────────────
@@ -131,93 +131,430 @@ class RAGEngine:
 
         # ONNX embeddings — no PyTorch, no Rust
         self.embeddings = _ChromaEmbeddings()
-
-        # ChromaDB — persisted to /tmp on Render
-        self.vectorstore = Chroma(
-            collection_name=COLLECTION_NAME,
-            embedding_function=self.embeddings,
-            persist_directory=CHROMA_PERSIST_DIR,
-        )
-
-        # Groq LLM — FREE, very fast
-        self.llm = ChatGroq(
-            api_key=GROQ_API_KEY,
-            model=LLM_MODEL,
-            temperature=0.5,
-            max_tokens=512,
-        )
-
-        # Per-session chat history
-        self._histories: dict[str, list] = {}
-
-        print(f"✅ RAG Engine ready. LLM: {LLM_MODEL} via Groq | VectorDB: ChromaDB")
-
-    def _get_history(self, session_id: str) -> list:
-        history = self._histories.get(session_id, [])
-        # Keep last N pairs
-        pairs = history[-HISTORY_WINDOW:]
-        messages = []
-        for human, ai in pairs:
-            messages.append(HumanMessage(content=human))
-            messages.append(AIMessage(content=ai))
-        return messages
+        # Bounded pool for the retrieval path; the LLM call is native async and needs no thread
+        self.executor = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieval")
+        # Concurrent chat queries share one ONNX call per batching window
+        self.query_batcher = QueryEmbeddingBatcher(self.embeddings, executor=self.executor)
+        # Shared by all ingestion jobs, separate from the retrieval pool so bulk loads never slow chat
+        self.ingest_executor = ThreadPoolExecutor(max_workers=max(1, INGEST_EMBED_WORKERS),
+                                                  thread_name_prefix="ingest-embed")
+
+        # ChromaDB — persisted to /tmp on Render. One knowledge base per tenant
+        # (chunks, curated FAQ answers, source manifest, answer cache), opened lazily
+        self.tenants = TenantRegistry(self.embeddings, CHROMA_PERSIST_DIR)
+
+        # Groq LLM — FREE, very fast. Extra models / keys (LLM_HEDGE_PROVIDERS)
+        # take hedged requests when the primary is slow and fallbacks when it fails
+        providers = [LLMProvider("primary", _groq(LLM_MODEL, GROQ_API_KEY))]
+        providers += [LLMProvider(name, _groq(model, key))
+                      for name, model, key in parse_providers(LLM_HEDGE_PROVIDERS, GROQ_API_KEY)]
+        self.dispatcher = LLMDispatcher(providers)
+
+        # Per-session chat history (bounded; SESSION_STORE=sqlite to share across workers).
+        # With compaction the store keeps a few extra turns, so a lagging summary can still fold them
+        self.sessions = make_session_store(HISTORY_WINDOW * 2 if HISTORY_COMPACTION else HISTORY_WINDOW)
+        # Background history summaries get their own client: no hedging, own latency
+        # stats, and (with HISTORY_SUMMARY_PROVIDER=model@KEY_ENV) their own rate limit
+        _, model, key = (parse_providers(HISTORY_SUMMARY_PROVIDER, GROQ_API_KEY)
+                         or [("", LLM_MODEL, GROQ_API_KEY)])[0]
+        self.summary_dispatcher = LLMDispatcher([LLMProvider("summary", _groq(model, key))], hedge=False)
+        self.history  = HistoryManager(self.sessions, self.summary_dispatcher, HISTORY_WINDOW)
+        # Retrieval done while the visitor types (POST /api/chat/prefetch), per session
+        self.prefetch_cache = PrefetchCache()
+
+        print(f"✅ RAG Engine ready. LLM: {LLM_MODEL} via Groq | VectorDB: {VECTOR_BACKEND}")
+
+    def kb(self, tenant_id: str = DEFAULT_TENANT, create: bool = False) -> TenantKB:
+        """A tenant's knowledge base (tenants.UnknownTenant if it has none and create=False)."""
+        return self.tenants.get(tenant_id, create=create)
+
+    # The default tenant's stores, as before tenants existed
+    @property
+    def vectorstore(self):
+        return self.tenants.default.vectorstore
+
+    @property
+    def faq(self):
+        return self.tenants.default.faq
+
+    @property
+    def manifest(self):
+        return self.tenants.default.manifest
+
+    @property
+    def answer_cache(self):
+        return self.tenants.default.answer_cache
+
+    @property
+    def llm(self):
+        """The primary chat model (assignable, e.g. to swap in a stub for benchmarks)."""
+        return self.dispatcher.primary.llm
+
+    @llm.setter
+    def llm(self, value):
+        self.dispatcher.primary.llm = value
+
+    def warm_up(self):
+        """Pay the one-off costs (model load, first index read) before the first chat does."""
+        with timed("warmup_embeddings"):
+            self.embeddings.warm_up()
+        if snapshot.KB_SNAPSHOT_DIR:
+            with timed("warmup_snapshots"):
+                self.load_snapshots(snapshot.KB_SNAPSHOT_DIR)
+        with timed("warmup_vectorstore"):
+            count = self.tenants.default.chunk_count()
+            if count:
+                self.vectorstore.similarity_search_by_vector(self.embeddings.embed_query("warm up"), k=1)
+        print(f"🔥 Warm: embedding model loaded, {count} chunks indexed")
+
+    @staticmethod
+    def _session_key(tenant_id: str, session_id: str) -> str:
+        return f"{tenant_id}:{session_id}"
 
     def _save_exchange(self, session_id: str, human: str, ai: str):
-        self._histories.setdefault(session_id, []).append((human, ai))
-
-    async def chat(self, message: str, session_id: str = "default",
-                   language: str = "auto") -> dict:
-        intent  = detect_intent(message)
-        history = self._get_history(session_id)
-
-        retriever = self.vectorstore.as_retriever(
-            search_type="similarity", search_kwargs={"k": 4}
-        )
+        self.sessions.append(session_id, human, ai)
+
+    async def _prepare(self, message: str, session_id: str, language: str,
+                       tenant_id: str = DEFAULT_TENANT) -> dict:
+        """
+        Runs everything that happens before the LLM call: intent, history,
+        query embedding, FAQ / answer-cache lookup and retrieval.
+        On a fast-path hit, prep["cached"] holds the answer, prep["fast_path"]
+        says where it came from ("faq" | "cache") and retrieval is skipped.
+        When a prefetch for a close enough draft exists (prep["prefetched"]),
+        its search candidates are used instead of a new vector search. The FAQ
+        and answer-cache lookups always use the sent message's own embedding
+        (the draft's is reused only when the normalised text is identical).
+        """
+        kb          = self.kb(tenant_id)
+        session_key = self._session_key(tenant_id, session_id)
+        with timed("classify_intent"):
+            verdict = classifier.classify(message)   # one pass: intent + booking_triggered
+        with timed("load_history"):
+            history  = self.history.build(session_key)
+            hist_key = history_key(history["pairs"])
+
+        loop = asyncio.get_running_loop()
+        kb_version = kb.answer_cache.kb_version   # read before retrieval: what the answer is stored under
+        prefetched = None
+        if PREFETCH_ENABLED:
+            prefetched = self.prefetch_cache.take(session_key, message, kb_version)
+        if prefetched and prefetched["exact"]:
+            embedding = prefetched["embedding"]
+        else:
+            with timed("embed_query"):
+                embedding = await self.query_batcher.embed(message)
+
+        prep = {
+            "kb":                kb,
+            "session_key":       session_key,
+            "embedding":         embedding,
+            "history_key":       hist_key,
+            "kb_version":        kb_version,
+            "intent":            verdict["intent"],
+            # booking_triggered: only when user made an explicit booking request
+            "booking_triggered": verdict["booking_triggered"],
+            "cached":            None,
+            "fast_path":         None,
+            "prompt_tokens":     None,
+            "prefetched":        prefetched is not None,
+        }
 
-        loop    = asyncio.get_event_loop()
-        docs    = await loop.run_in_executor(None, lambda: retriever.invoke(message))
-        context = format_docs(docs)
+        with timed("faq_lookup"):
+            faq = await loop.run_in_executor(self.executor, kb.faq.match, embedding)
+        if faq:
+            prep.update(cached=faq["answer"], sources=["faq"], fast_path="faq")
+            return prep
+
+        if CACHE_ENABLED:
+            with timed("answer_cache"):
+                hit = kb.answer_cache.lookup(embedding, language, hist_key)
+            if hit:
+                prep.update(cached=hit["answer"], sources=hit["sources"], fast_path="cache")
+                return prep
+
+        # Over-fetch, then pack distinct chunks into the token budget
+        if prefetched:
+            candidates = prefetched["candidates"]
+        else:
+            with timed("vector_search"):
+                candidates = await loop.run_in_executor(
+                    self.executor, lambda: kb.vectorstore.similarity_search_by_vector(embedding, k=RETRIEVAL_FETCH_K)
+                )
+        with timed("context_build"):
+            context, docs, ctx_stats = build_context(candidates)
+        print(f"✂️  Context: {ctx_stats['chunks_used']}/{ctx_stats['candidates']} chunks, "
+              f"{ctx_stats['context_tokens']} tokens ({ctx_stats['tokens_saved']:+d} saved vs top-4, "
+              f"{ctx_stats['duplicates_dropped']} duplicates dropped)")
 
         question = message
         if language == "hi": question += " (Jawab Hindi mein dena)"
         elif language == "en": question += " (Please respond in English)"
 
-        chain = SALES_PROMPT | self.llm | StrOutputParser()
+        prep["prompt"] = SALES_PROMPT.invoke({
+            "context":      context,
+            "chat_history": history["messages"],
+            "question":     question,
+        })
+        total = sum(estimate_tokens(m.content) for m in prep["prompt"].to_messages())
+        prep["prompt_tokens"] = {
+            "total":            total,
+            "history":          history["history_tokens"],
+            "history_verbatim": history["baseline_tokens"],   # what the last N pairs would have cost
+            "context":          ctx_stats["context_tokens"],
+        }
+        for part in ("history", "context", "total"):
+            PROMPT_TOKENS.observe(prep["prompt_tokens"][part], part=part)
+        print(f"🧾 Prompt: {total} tokens (history {history['history_tokens']}, "
+              f"{history['baseline_tokens'] - history['history_tokens']:+d} saved by compaction)")
+        prep["sources"] = list({d.metadata.get("source", "business_data") for d in docs})
+        return prep
+
+    def _finish(self, prep: dict, message: str, language: str, answer: str):
+        """Saves the exchange and, for freshly generated answers, fills the answer cache."""
+        CHAT_TOTAL.inc(path=prep["fast_path"] or "llm")
+        if CACHE_ENABLED and prep["cached"] is None and answer:
+            prep["kb"].answer_cache.store(prep["embedding"], language, prep["history_key"],
+                                          answer, prep["sources"], prep["kb_version"])
+        with timed("save_history"):
+            self._save_exchange(prep["session_key"], message, answer)
+        # Runs after the caller has its answer; folds turns that left the verbatim window
+        self.history.schedule(prep["session_key"])
 
-        answer = await loop.run_in_executor(
-            None,
-            lambda: chain.invoke({
-                "context":      context,
-                "chat_history": history,
-                "question":     question,
-            })
-        )
-        answer = answer.strip()
+    async def chat(self, message: str, session_id: str = "default",
+                   language: str = "auto", tenant_id: str = DEFAULT_TENANT) -> dict:
+        prep = await self._prepare(message, session_id, language, tenant_id)
 
-        # booking_triggered: only when user made an explicit booking request
-        booking_triggered = is_booking_action(message)
+        if prep["cached"] is not None:
+            answer = prep["cached"]
+        else:
+            with timed("llm"):
+                answer = await self.dispatcher.ainvoke(prep["prompt"])
+            answer = answer.strip()
 
-        self._save_exchange(session_id, message, answer)
-        sources = list({d.metadata.get("source", "business_data") for d in docs})
+        self._finish(prep, message, language, answer)
 
         return {
             "answer":            answer,
-            "sources":           sources,
-            "intent":            intent,
-            "booking_triggered": booking_triggered,
+            "sources":           prep["sources"],
+            "intent":            prep["intent"],
+            "booking_triggered": prep["booking_triggered"],
+            "fast_path":         prep["fast_path"],
+            "prompt_tokens":     prep["prompt_tokens"],
+            "prefetched":        prep["prefetched"],
+        }
+
+    async def chat_stream(self, message: str, session_id: str = "default",
+                          language: str = "auto", tenant_id: str = DEFAULT_TENANT):
+        """
+        Same pipeline as chat(), but yields events as the LLM produces tokens:
+          {"type": "meta",  "sources", "intent", "booking_triggered", "fast_path",
+                             "prompt_tokens", "prefetched"}
+                                               – right after retrieval
+          {"type": "token", "content"}         – one per LLM chunk
+          {"type": "done",  "answer"}          – full answer, saved to history
+        """
+        prep = await self._prepare(message, session_id, language, tenant_id)
+        yield {
+            "type":              "meta",
+            "sources":           prep["sources"],
+            "intent":            prep["intent"],
+            "booking_triggered": prep["booking_triggered"],
+            "fast_path":         prep["fast_path"],
+            "prompt_tokens":     prep["prompt_tokens"],
+            "prefetched":        prep["prefetched"],
         }
 
-    def add_documents(self, documents: list[Document]):
-        if documents:
-            self.vectorstore.add_documents(documents)
-            print(f"✅ Added {len(documents)} chunks to vector store.")
-
-    def reset(self):
-        self.vectorstore.delete_collection()
-        self.vectorstore = Chroma(
-            collection_name=COLLECTION_NAME,
-            embedding_function=self.embeddings,
-            persist_directory=CHROMA_PERSIST_DIR,
-        )
-        self._histories.clear()
-        print("🗑️  Vector store reset.")
+        if prep["cached"] is not None:
+            answer = prep["cached"]
+            yield {"type": "token", "content": answer}
+        else:
+            parts = []
+            start = time.perf_counter()
+            async for token in self.dispatcher.astream(prep["prompt"]):
+                if not token:
+                    continue
+                if not parts:
+                    STAGE_SECONDS.observe(time.perf_counter() - start, stage="llm_first_token")
+                parts.append(token)
+                yield {"type": "token", "content": token}
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage="llm")
+            answer = "".join(parts).strip()
+
+        self._finish(prep, message, language, answer)
+        yield {"type": "done", "answer": answer}
+
+    async def prefetch(self, text: str, session_id: str = "default",
+                       tenant_id: str = DEFAULT_TENANT) -> dict:
+        """
+        Embeds a draft message and runs the vector search ahead of the chat call;
+        the next chat() of this session reuses the result if its message is close enough.
+        """
+        kb          = self.kb(tenant_id)
+        session_key = self._session_key(tenant_id, session_id)
+        kb_version  = kb.answer_cache.kb_version
+        if not PREFETCH_ENABLED or len(text.strip()) < PREFETCH_MIN_CHARS \
+                or self.prefetch_cache.has(session_key, text, kb_version):
+            self.prefetch_cache.skip()
+            return {"status": "skipped"}
+
+        started, start = time.monotonic(), time.perf_counter()
+        with timed("prefetch"):
+            embedding  = await self.query_batcher.embed(text)
+            embedded   = time.perf_counter()
+            candidates = await asyncio.get_running_loop().run_in_executor(
+                self.executor, lambda: kb.vectorstore.similarity_search_by_vector(embedding, k=RETRIEVAL_FETCH_K)
+            )
+        self.prefetch_cache.store(session_key, text, kb_version, embedding, candidates,
+                                  embedded - start, time.perf_counter() - embedded, started)
+        return {"status": "prefetched", "candidates": len(candidates)}
+
+    @staticmethod
+    def _known_ids(kb: TenantKB, source: str) -> set[str]:
+        # Chunks indexed before the manifest existed are found via metadata
+        if kb.manifest.has(source):
+            return kb.manifest.ids(source)
+        return set(kb.vectorstore.get(where={"source": source}, include=[])["ids"])
+
+    def add_documents(self, documents: Iterable[Document], on_progress=None,
+                      replace: bool = False, tenant_id: str = DEFAULT_TENANT) -> dict:
+        """
+        Embeds and writes chunks in batches of ADD_BATCH_SIZE. Accepts a list or
+        a generator (e.g. DocumentLoader.iter_pdf_chunks), so embedding starts
+        before extraction finishes. Batches are embedded on the ingest pool,
+        up to INGEST_EMBED_WORKERS ahead, while this thread writes finished
+        ones in order. on_progress(n) gets the running total.
+
+        Chunk IDs are content hashes, so chunks already indexed for their source
+        are skipped. With replace=True, each source seen is synced: chunks that
+        were not in this ingestion are deleted.
+        Returns counts: {"added", "unchanged", "removed"} plus "seconds" and "chunks_per_sec".
+        """
+        kb = self.kb(tenant_id, create=True)
+        known: dict[str, set] = {}   # source → IDs already in the store
+        seen:  dict[str, set] = {}   # source → IDs in this ingestion
+        added, batch, batch_ids = 0, [], []
+        in_flight = deque()          # (docs, ids, future of their vectors), oldest first
+        start     = time.perf_counter()
+
+        def embed(docs: list) -> list:
+            with timed("ingest_embed"):
+                return self.embeddings.embed_documents([d.page_content for d in docs])
+
+        def write_oldest():
+            nonlocal added
+            docs, ids, future = in_flight.popleft()
+            vectors = future.result()
+            with timed("vector_write"):
+                kb.add_embedded(docs, ids, vectors)
+            CHUNKS_TOTAL.inc(len(docs), action="added")
+            by_source: dict[str, list] = {}
+            for doc, cid in zip(docs, ids):
+                by_source.setdefault(doc.metadata.get("source", "business_data"), []).append(cid)
+            for source, source_ids in by_source.items():
+                kb.manifest.add(source, source_ids)
+            added += len(docs)
+            if on_progress:
+                on_progress(added)
+
+        def flush():
+            nonlocal batch, batch_ids
+            in_flight.append((batch, batch_ids, self.ingest_executor.submit(embed, batch)))
+            batch, batch_ids = [], []
+            # Backpressure: never more than workers + 1 batches embedded but unwritten
+            while len(in_flight) > INGEST_EMBED_WORKERS:
+                write_oldest()
+
+        try:
+            for doc in documents:
+                source = doc.metadata.get("source", "business_data")
+                if source not in known:
+                    known[source] = self._known_ids(kb, source)
+                    seen[source]  = set()
+                cid = chunk_id(source, doc.page_content)
+                if cid in seen[source]:
+                    continue
+                seen[source].add(cid)
+                if cid in known[source]:
+                    continue
+                batch.append(doc)
+                batch_ids.append(cid)
+                if len(batch) == ADD_BATCH_SIZE:
+                    flush()
+            if batch:
+                flush()
+            while in_flight:
+                write_oldest()
+        finally:
+            for _, _, future in in_flight:
+                future.cancel()
+
+        removed = 0
+        if replace:
+            for source, ids in seen.items():
+                stale = known[source] - ids
+                if stale:
+                    with timed("delete_stale"):
+                        kb.vectorstore.delete(ids=list(stale))
+                    CHUNKS_TOTAL.inc(len(stale), action="removed")
+                    kb.manifest.remove(source, stale)
+                    removed += len(stale)
+
+        if added or removed:
+            kb.answer_cache.invalidate()
+        unchanged = sum(len(ids) for ids in seen.values()) - added
+        seconds   = time.perf_counter() - start
+        rate      = round(added / seconds, 1) if seconds > 0 else 0.0
+        print(f"✅ Added {added} chunks to vector store [{tenant_id}] "
+              f"({unchanged} unchanged, {removed} stale removed) in {seconds:.1f}s, {rate} chunks/s.")
+        return {"added": added, "unchanged": unchanged, "removed": removed,
+                "seconds": round(seconds, 3), "chunks_per_sec": rate}
+
+    def delete_source(self, source: str, tenant_id: str = DEFAULT_TENANT) -> int:
+        """Removes every chunk of one source (e.g. a single pricing page)."""
+        kb  = self.kb(tenant_id)
+        ids = self._known_ids(kb, source)
+        if ids:
+            kb.vectorstore.delete(ids=list(ids))
+            kb.answer_cache.invalidate()
+        kb.manifest.drop(source)
+        print(f"🗑️  Removed {len(ids)} chunks of source: {source} [{tenant_id}]")
+        return len(ids)
+
+    def list_sources(self, tenant_id: str = DEFAULT_TENANT) -> dict[str, int]:
+        return self.kb(tenant_id).manifest.sources()
+
+    # ── Snapshots ──────────────────────────────────────────
+    def export_snapshot(self, path: str, tenant_id: str = DEFAULT_TENANT) -> dict:
+        """Write a tenant's KB (chunks, vectors, FAQ) to a .kbsnap file."""
+        return snapshot.export_snapshot(self.kb(tenant_id), path, self.embeddings.MODEL_ID)
+
+    def import_snapshot(self, path: str, tenant_id: str = None, replace: bool = True) -> dict:
+        """Restore a .kbsnap into `tenant_id` (default: the tenant it was exported from)."""
+        tenant_id = validate_tenant_id(tenant_id or snapshot.read_header(path)["tenant_id"])
+        return snapshot.import_snapshot(self.kb(tenant_id, create=True), path,
+                                        self.embeddings.MODEL_ID, replace=replace)
+
+    def load_snapshots(self, directory: str) -> list:
+        """Startup: restore every snapshot in `directory` whose tenant has no chunks yet."""
+        if not os.path.isdir(directory):
+            print(f"⚠️  KB_SNAPSHOT_DIR {directory} does not exist – no snapshots loaded")
+            return []
+        restored = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".kbsnap"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                tenant_id = snapshot.read_header(path)["tenant_id"]
+                if self.tenants.exists(tenant_id) and self.kb(tenant_id).chunk_count():
+                    continue   # already populated (persistent disk or an earlier restore)
+                restored.append(self.import_snapshot(path, tenant_id))
+            except Exception as e:
+                print(f"❌ Snapshot {name} not loaded: {e}")
+        return restored
+
+    def reset(self, tenant_id: str = DEFAULT_TENANT):
+        self.kb(tenant_id).reset()
+        self.sessions.clear(prefix=self._session_key(tenant_id, ""))
+        print(f"🗑️  Vector store reset [{tenant_id}].")
@@ -2,12 +2,27 @@
 seed_data.py – Run this ONCE to load your business info into ChromaDB.
 
 Usage:
-    python seed_data.py
+    python seed_data.py                                  # BUSINESS_INFO below + ./data/business_docs
+    python seed_data.py --dir ./client_docs --tenant acme-gym
+    python seed_data.py --manifest onboarding.ndjson --replace
 
 Edit the BUSINESS_INFO string below with YOUR actual business details.
+
+--dir loads every PDF / .txt / .md / .html file under a directory (PDFs are
+extracted in parallel). --manifest reads a JSON list or NDJSON file whose
+entries are one of:
+    {"path": "docs/pricing.pdf", "source": "pricing"}      # source is optional
+    {"url":  "https://example.com/about"}
+    {"text": "Open 6 AM – 10 PM", "source": "timings"}
+Relative paths are resolved against the manifest's directory. Everything is
+streamed through one pipelined add_documents call (see INGEST_BATCH_SIZE /
+INGEST_EMBED_WORKERS), and the chunks/sec rate is printed at the end.
 """
 
 import sys, os
+import json
+import time
+import argparse
 sys.path.insert(0, os.path.dirname(__file__))
 
 from document_loader import DocumentLoader
@@ -79,7 +94,75 @@ Trainers:
 PRICING_PAGE_URL = ""   # Optional: add your website URL here
 
 
+def load_manifest(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        body = f.read()
+    entries = json.loads(body) if body.lstrip().startswith("[") else \
+        [json.loads(line) for line in body.splitlines() if line.strip()]
+    base = os.path.dirname(os.path.abspath(path))
+    for i, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or not ({"path", "url", "text"} & entry.keys()):
+            raise ValueError(f"{path}: entry {i} needs one of path / url / text")
+        if "path" in entry:
+            entry["path"] = os.path.join(base, entry["path"])
+    return entries
+
+
+def iter_manifest(loader, entries: list):
+    """Manifest entries → chunks; local files go through the parallel path loader together."""
+    paths = []
+    for entry in entries:
+        if "path" in entry and os.path.isdir(entry["path"]):
+            yield from loader.iter_directory(entry["path"])
+        elif "path" in entry:
+            paths.append((entry["path"], entry.get("source") or entry["path"]))
+    yield from loader.iter_paths(paths)
+    for entry in entries:
+        if "url" in entry:
+            docs = loader.ingest_url(entry["url"])
+            if entry.get("source"):
+                for d in docs:
+                    d.metadata["source"] = entry["source"]
+            print(f"  🌐 Loaded: {entry['url']} ({len(docs)} chunks)")
+            yield from docs
+        elif "text" in entry:
+            yield from loader.ingest_raw_text(entry["text"], source_name=entry.get("source") or "manual")
+
+
+def bulk_seed(args):
+    loader = DocumentLoader()
+    rag    = RAGEngine()
+    if args.dir:
+        print(f"🌱 Seeding [{args.tenant}] from directory {args.dir} ...")
+        docs = loader.iter_directory(args.dir)
+    else:
+        entries = load_manifest(args.manifest)
+        print(f"🌱 Seeding [{args.tenant}] from manifest {args.manifest} ({len(entries)} entries) ...")
+        docs = iter_manifest(loader, entries)
+
+    start  = time.perf_counter()
+    counts = rag.add_documents(docs, replace=args.replace, tenant_id=args.tenant)
+    total  = time.perf_counter() - start
+    print(f"🎉 {counts['added']} chunks added, {counts['unchanged']} unchanged, "
+          f"{counts['removed']} removed in {total:.1f}s "
+          f"({counts['added'] / total if total else 0:.1f} chunks/s including extraction)")
+
+
 def main():
+    ap = argparse.ArgumentParser(description="Load business documents into the knowledge base.")
+    group = ap.add_mutually_exclusive_group()
+    group.add_argument("--dir", help="ingest every supported file under this directory")
+    group.add_argument("--manifest", help="JSON / NDJSON list of path / url / text entries")
+    ap.add_argument("--tenant", default="default", help="tenant ID (default: the default tenant)")
+    ap.add_argument("--replace", action="store_true",
+                    help="drop chunks of each source that are no longer in its documents")
+    args = ap.parse_args()
+    if args.dir or args.manifest:
+        from tenant_ids import validate_tenant_id
+        args.tenant = validate_tenant_id(args.tenant)
+        bulk_seed(args)
+        return
+
     print("🌱 Seeding business knowledge base...")
     loader    = DocumentLoader()
     rag       = RAGEngine()
@@ -95,7 +178,7 @@ def main():
         rag.add_documents(docs)
         print(f"  ✅ Website: {len(docs)} chunks")
 
-    # 3) Optional: load PDFs from ./data/business_docs/
+    # 3) Optional: load PDFs / text files from ./data/business_docs/
     pdf_dir = "./data/business_docs"
     if os.path.isdir(pdf_dir):
         docs = loader.ingest_directory(pdf_dir)
@@ -0,0 +1,275 @@
+# ============================================================
+#  Session Store – bounded per-session chat history, plus the
+#  rolling summary of turns folded out of it (history_manager.py)
+#  memory : LRU + idle-TTL, single process
+#  sqlite : shared file (WAL) so several uvicorn workers can
+#           serve the same session
+# ============================================================
+
+import abc
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# ─── Config ─────────────────────────────────────────────────
+SESSION_STORE        = os.getenv("SESSION_STORE", "memory")          # "memory" | "sqlite"
+SESSION_DB_PATH      = os.getenv("SESSION_DB_PATH", "/tmp/sessions.sqlite3")
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+SESSION_IDLE_TTL     = float(os.getenv("SESSION_IDLE_TTL", "86400"))  # seconds
+
+
+class SessionStore(abc.ABC):
+    """
+    Interface: every store keeps at most `window` (human, ai) pairs per session.
+    Turn IDs increase within a session; a summary records the last turn ID it covers.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+
+    def get(self, session_id: str) -> list[tuple[str, str]]:
+        return [(h, a) for _, h, a in self.get_turns(session_id)]
+
+    @abc.abstractmethod
+    def get_turns(self, session_id: str) -> list[tuple[int, str, str]]:
+        """(turn_id, human, ai), oldest first."""
+
+    @abc.abstractmethod
+    def append(self, session_id: str, human: str, ai: str):
+        """Adds a turn and trims the session to the newest `window`."""
+
+    @abc.abstractmethod
+    def get_summary(self, session_id: str) -> tuple[str, int]:
+        """(summary, last turn ID it covers); ("", 0) when there is none."""
+
+    @abc.abstractmethod
+    def set_summary(self, session_id: str, summary: str, upto_turn: int):
+        """Replaces the session's summary; it covers turns up to `upto_turn`."""
+
+    @abc.abstractmethod
+    def clear(self, prefix: str = ""):
+        """Drops every session, or only those whose ID starts with `prefix`."""
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Live (not idle-expired) sessions."""
+
+
+class MemorySessionStore(SessionStore):
+
+    def __init__(self, window: int, max_sessions: int = SESSION_MAX_SESSIONS,
+                 idle_ttl: float = SESSION_IDLE_TTL):
+        super().__init__(window)
+        self.max_sessions = max_sessions
+        self.idle_ttl     = idle_ttl
+        # session_id → {"seen", "turns": [(turn_id, human, ai)], "next_id", "summary", "upto"}
+        self._sessions: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        # OrderedDict is in last-access order, so idle sessions sit at the front
+        while self._sessions:
+            sid, entry = next(iter(self._sessions.items()))
+            if now - entry["seen"] <= self.idle_ttl:
+                break
+            del self._sessions[sid]
+
+    def _touch(self, session_id: str, now: float, create: bool = False):
+        self._expire(now)
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            if not create:
+                return None
+            entry = self._sessions[session_id] = {"seen": now, "turns": [], "next_id": 1,
+                                                  "summary": "", "upto": 0}
+        entry["seen"] = now
+        self._sessions.move_to_end(session_id)
+        return entry
+
+    def get_turns(self, session_id: str) -> list[tuple[int, str, str]]:
+        with self._lock:
+            entry = self._touch(session_id, time.monotonic())
+            return list(entry["turns"]) if entry else []
+
+    def append(self, session_id: str, human: str, ai: str):
+        with self._lock:
+            entry = self._touch(session_id, time.monotonic(), create=True)
+            entry["turns"].append((entry["next_id"], human, ai))
+            entry["next_id"] += 1
+            del entry["turns"][:-self.window]
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def get_summary(self, session_id: str) -> tuple[str, int]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return (entry["summary"], entry["upto"]) if entry else ("", 0)
+
+    def set_summary(self, session_id: str, summary: str, upto_turn: int):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:   # expired / cleared meanwhile → nothing to summarise
+                entry["summary"], entry["upto"] = summary, upto_turn
+
+    def clear(self, prefix: str = ""):
+        with self._lock:
+            if not prefix:
+                self._sessions.clear()
+                return
+            for sid in [s for s in self._sessions if s.startswith(prefix)]:
+                del self._sessions[sid]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Idle expiry is per session, like the memory store: `sessions.last_seen`
+    moves on every read and append, and a session idle for longer than
+    `idle_ttl` is gone as a whole, however old its oldest kept turn is.
+    """
+
+    PURGE_EVERY = 200   # appends between idle-session sweeps
+
+    def __init__(self, window: int, path: str = SESSION_DB_PATH,
+                 idle_ttl: float = SESSION_IDLE_TTL):
+        super().__init__(window)
+        self.idle_ttl = idle_ttl
+        self._writes  = 0
+        self._lock    = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        migrate = not self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sessions'"
+        ).fetchone()
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS turns (
+                id         INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                human      TEXT NOT NULL,
+                ai         TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_turns_session ON turns(session_id, id);
+            DROP INDEX IF EXISTS idx_turns_created;
+            CREATE TABLE IF NOT EXISTS summaries (
+                session_id TEXT PRIMARY KEY,
+                summary    TEXT NOT NULL,
+                upto_turn  INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                last_seen  REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_sessions_seen ON sessions(last_seen);
+        """)
+        if migrate:
+            # Databases from before the sessions table: last seen = newest turn
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO sessions (session_id, last_seen) "
+                    "SELECT session_id, MAX(created_at) FROM turns GROUP BY session_id"
+                )
+
+    def _live(self, session_id: str, now: float) -> bool:
+        row = self._conn.execute(
+            "SELECT last_seen FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return bool(row) and now - row[0] <= self.idle_ttl
+
+    def _drop(self, session_id: str):
+        for table in ("turns", "summaries", "sessions"):
+            self._conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+    def get_turns(self, session_id: str) -> list[tuple[int, str, str]]:
+        now = time.time()
+        with self._lock, self._conn:
+            if not self._live(session_id, now):
+                return []
+            self._conn.execute("UPDATE sessions SET last_seen = ? WHERE session_id = ?",
+                               (now, session_id))
+            rows = self._conn.execute(
+                "SELECT id, human, ai FROM turns WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, self.window),
+            ).fetchall()
+        return list(reversed(rows))
+
+    def get_summary(self, session_id: str) -> tuple[str, int]:
+        with self._lock:
+            if not self._live(session_id, time.time()):
+                return "", 0
+            row = self._conn.execute(
+                "SELECT summary, upto_turn FROM summaries WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return (row[0], row[1]) if row else ("", 0)
+
+    def set_summary(self, session_id: str, summary: str, upto_turn: int):
+        now = time.time()
+        with self._lock, self._conn:
+            if not self._live(session_id, now):   # expired / cleared meanwhile → nothing to summarise
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (session_id, summary, upto_turn, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, summary, upto_turn, now),
+            )
+
+    def append(self, session_id: str, human: str, ai: str):
+        now = time.time()
+        with self._lock, self._conn:
+            if not self._live(session_id, now):
+                self._drop(session_id)   # idle but not swept yet: start afresh
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, last_seen) VALUES (?, ?)",
+                (session_id, now),
+            )
+            self._conn.execute(
+                "INSERT INTO turns (session_id, human, ai, created_at) VALUES (?, ?, ?, ?)",
+                (session_id, human, ai, now),
+            )
+            # Trim this session to the window
+            self._conn.execute(
+                "DELETE FROM turns WHERE session_id = ? AND id NOT IN "
+                "(SELECT id FROM turns WHERE session_id = ? ORDER BY id DESC LIMIT ?)",
+                (session_id, session_id, self.window),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                # Drop sessions idle for longer than the TTL
+                cutoff = (now - self.idle_ttl,)
+                for table in ("turns", "summaries"):
+                    self._conn.execute(
+                        f"DELETE FROM {table} WHERE session_id IN "
+                        "(SELECT session_id FROM sessions WHERE last_seen < ?)",
+                        cutoff,
+                    )
+                self._conn.execute("DELETE FROM sessions WHERE last_seen < ?", cutoff)
+
+    def clear(self, prefix: str = ""):
+        with self._lock, self._conn:
+            for table in ("turns", "summaries", "sessions"):
+                self._conn.execute(f"DELETE FROM {table} WHERE substr(session_id, 1, ?) = ?",
+                                   (len(prefix), prefix))
+
+    def __len__(self) -> int:
+        with self._lock:
+            (n,) = self._conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE last_seen >= ?",
+                (time.time() - self.idle_ttl,),
+            ).fetchone()
+        return n
+
+
+def make_session_store(window: int) -> SessionStore:
+    if SESSION_STORE == "sqlite":
+        return SQLiteSessionStore(window)
+    return MemorySessionStore(window)
@@ -0,0 +1,231 @@
+# ============================================================
+#  KB Snapshots – one tenant's chunks, metadata, float32 vectors
+#  and FAQ entries in a single versioned file, so a restart or a
+#  new deploy loads the knowledge base instead of re-embedding it
+# ============================================================
+"""
+Snapshot file (.kbsnap) – an uncompressed zip, so the vector matrices can be
+memory-mapped straight out of it:
+
+    snapshot.json       format, version, tenant, embedding model, dim, counts
+    chunks.jsonl        {"id", "text", "metadata"} per line, in matrix row order
+    vectors.npy         float32 (chunks, dim)
+    faq.jsonl           {"id", "question", "metadata"} per line
+    faq_vectors.npy     float32 (faq entries, dim)
+
+CLI (e.g. build offline with CHROMA_PERSIST_DIR pointing at a scratch dir):
+    python snapshot.py export --tenant acme-gym --out acme-gym.kbsnap
+    python snapshot.py import acme-gym.kbsnap [--tenant other] [--merge]
+    python snapshot.py info acme-gym.kbsnap
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import zipfile
+import argparse
+import tempfile
+
+import numpy as np
+from langchain_core.documents import Document
+
+# ─── Config ─────────────────────────────────────────────────
+KB_SNAPSHOT_DIR   = os.getenv("KB_SNAPSHOT_DIR", "")   # *.kbsnap loaded at startup into empty tenants
+SNAPSHOT_FORMAT   = "kb-snapshot"
+SNAPSHOT_VERSION  = 1
+EXPORT_BATCH_ROWS = 1000
+IMPORT_BATCH_ROWS = 2000
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+# ─── Writing ────────────────────────────────────────────────
+def _write_npy(archive: zipfile.ZipFile, name: str, rows_path: str, n: int, dim: int):
+    """Streams raw float32 rows from a temp file into the archive behind an .npy header."""
+    with archive.open(name, "w", force_zip64=True) as out:
+        np.lib.format.write_array_header_1_0(
+            out, {"descr": np.lib.format.dtype_to_descr(np.dtype("<f4")),
+                  "fortran_order": False, "shape": (n, dim)})
+        with open(rows_path, "rb") as rows:
+            while block := rows.read(1 << 20):
+                out.write(block)
+
+
+def export_snapshot(kb, path: str, model_id: str) -> dict:
+    """Writes `kb` (a tenants.TenantKB) to `path`; returns the snapshot header."""
+    start = time.perf_counter()
+    tmp   = tempfile.mkdtemp(prefix="kbsnap_")
+    chunks_path, rows_path = os.path.join(tmp, "chunks.jsonl"), os.path.join(tmp, "vectors.f32")
+    n, dim, sources = 0, 0, {}
+    try:
+        with open(chunks_path, "w", encoding="utf-8") as chunks, open(rows_path, "wb") as rows:
+            for ids, texts, metadatas, vectors in kb.iter_chunks(EXPORT_BATCH_ROWS):
+                vectors = np.ascontiguousarray(vectors, dtype="<f4")
+                dim     = vectors.shape[1] if len(vectors) else dim
+                rows.write(vectors.tobytes())
+                for cid, text, meta in zip(ids, texts, metadatas):
+                    chunks.write(json.dumps({"id": cid, "text": text, "metadata": meta},
+                                            ensure_ascii=False) + "\n")
+                    source = meta.get("source", "business_data")
+                    sources[source] = sources.get(source, 0) + 1
+                n += len(ids)
+
+        faq = kb.faq.export_entries()
+        header = {
+            "format":          SNAPSHOT_FORMAT,
+            "version":         SNAPSHOT_VERSION,
+            "tenant_id":       kb.tenant_id,
+            "embedding_model": model_id,
+            "dim":             dim or (faq["vectors"].shape[1] if len(faq["ids"]) else 0),
+            "chunks":          n,
+            "faq_entries":     len(faq["ids"]),
+            "sources":         sources,
+            "created_at":      time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        with zipfile.ZipFile(path + ".tmp", "w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            archive.writestr("snapshot.json", json.dumps(header, indent=2, ensure_ascii=False))
+            archive.write(chunks_path, "chunks.jsonl")
+            _write_npy(archive, "vectors.npy", rows_path, n, header["dim"])
+            archive.writestr("faq.jsonl", "".join(
+                json.dumps({"id": i, "question": q, "metadata": m}, ensure_ascii=False) + "\n"
+                for i, q, m in zip(faq["ids"], faq["questions"], faq["metadatas"])))
+            with archive.open("faq_vectors.npy", "w") as out:
+                np.save(out, faq["vectors"].astype("<f4").reshape(len(faq["ids"]), header["dim"]))
+        os.replace(path + ".tmp", path)
+    finally:
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+        os.rmdir(tmp)
+    print(f"📦 Snapshot [{kb.tenant_id}]: {n} chunks, {header['faq_entries']} FAQs → {path} "
+          f"({os.path.getsize(path) / 1e6:.1f} MB, {time.perf_counter() - start:.1f}s)")
+    return header
+
+
+# ─── Reading ────────────────────────────────────────────────
+def read_header(path: str) -> dict:
+    try:
+        with zipfile.ZipFile(path) as archive:
+            header = json.loads(archive.read("snapshot.json"))
+    except (zipfile.BadZipFile, KeyError, json.JSONDecodeError) as e:
+        raise SnapshotError(f"Not a knowledge-base snapshot: {e}")
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError("Not a knowledge-base snapshot")
+    if header.get("version", 0) > SNAPSHOT_VERSION:
+        raise SnapshotError(f"Snapshot version {header['version']} is newer than this server "
+                            f"supports ({SNAPSHOT_VERSION})")
+    return header
+
+
+def _map_npy(path: str, archive: zipfile.ZipFile, name: str) -> np.ndarray:
+    """Memory-maps an uncompressed .npy member in place (no copy, no extraction)."""
+    info = archive.getinfo(name)
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise SnapshotError(f"{name} is compressed; snapshots must be stored uncompressed")
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        local = f.read(30)                          # zip local file header
+        name_len, extra_len = struct.unpack("<HH", local[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        read_header_fn = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                          else np.lib.format.read_array_header_2_0)
+        shape, fortran, dtype = read_header_fn(f)
+        offset = f.tell()
+    if fortran or dtype != np.dtype("<f4"):
+        raise SnapshotError(f"{name}: expected a C-order float32 matrix")
+    if not shape[0]:
+        return np.zeros(shape, dtype=np.float32)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+
+def _jsonl(archive: zipfile.ZipFile, name: str):
+    with archive.open(name) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def import_snapshot(kb, path: str, model_id: str, replace: bool = True) -> dict:
+    """
+    Loads a snapshot into `kb` without embedding anything. replace=True wipes
+    the tenant's chunks and FAQ entries first; otherwise chunks are upserted by ID.
+    """
+    header = read_header(path)
+    if header["embedding_model"] != model_id:
+        raise SnapshotError(f"Snapshot was embedded with {header['embedding_model']}, "
+                            f"this server uses {model_id}")
+    start = time.perf_counter()
+    with zipfile.ZipFile(path) as archive:
+        vectors = _map_npy(path, archive, "vectors.npy")
+        if len(vectors) != header["chunks"]:
+            raise SnapshotError("vectors.npy does not match the chunk count in snapshot.json")
+        if replace:
+            kb.reset()
+
+        row, batch = 0, []
+
+        def flush():
+            nonlocal row, batch
+            docs = [Document(page_content=c["text"], metadata=c["metadata"]) for c in batch]
+            ids  = [c["id"] for c in batch]
+            kb.add_embedded(docs, ids, np.asarray(vectors[row:row + len(batch)]))
+            by_source: dict[str, list] = {}
+            for doc, cid in zip(docs, ids):
+                by_source.setdefault(doc.metadata.get("source", "business_data"), []).append(cid)
+            for source, source_ids in by_source.items():
+                kb.manifest.add(source, source_ids)
+            row, batch = row + len(batch), []
+
+        for chunk in _jsonl(archive, "chunks.jsonl"):
+            batch.append(chunk)
+            if len(batch) == IMPORT_BATCH_ROWS:
+                flush()
+        if batch:
+            flush()
+
+        faq = list(_jsonl(archive, "faq.jsonl"))
+        kb.faq.import_entries([e["id"] for e in faq], [e["question"] for e in faq],
+                              [e["metadata"] for e in faq],
+                              _map_npy(path, archive, "faq_vectors.npy"), replace=replace)
+    kb.answer_cache.invalidate()
+    seconds = time.perf_counter() - start
+    print(f"📦 Restored [{kb.tenant_id}] from {os.path.basename(path)}: {row} chunks, "
+          f"{len(faq)} FAQs in {seconds:.1f}s")
+    return {"tenant_id": kb.tenant_id, "chunks": row, "faq_entries": len(faq),
+            "seconds": round(seconds, 3), "snapshot": header}
+
+
+# ─── CLI ────────────────────────────────────────────────────
+def main():
+    ap  = argparse.ArgumentParser(description="Export / import knowledge-base snapshots.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export")
+    exp.add_argument("--tenant", default="default")
+    exp.add_argument("--out", required=True)
+    imp = sub.add_parser("import")
+    imp.add_argument("path")
+    imp.add_argument("--tenant", help="restore into this tenant (default: the one in the snapshot)")
+    imp.add_argument("--merge", action="store_true", help="upsert instead of replacing the tenant's KB")
+    info = sub.add_parser("info")
+    info.add_argument("path")
+    args = ap.parse_args()
+
+    if args.command == "info":
+        print(json.dumps(read_header(args.path), indent=2, ensure_ascii=False))
+        return
+
+    sys.path.insert(0, os.path.dirname(__file__))
+    from rag_engine import RAGEngine
+    rag = RAGEngine()
+    if args.command == "export":
+        rag.export_snapshot(args.out, tenant_id=args.tenant)
+    else:
+        rag.import_snapshot(args.path, tenant_id=args.tenant, replace=not args.merge)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# ============================================================
+#  Source Manifest – which chunk IDs belong to which source
+#  (stored next to the vector store so both are wiped together)
+# ============================================================
+
+import os
+import sqlite3
+import hashlib
+import threading
+
+
+def chunk_id(source: str, content: str) -> str:
+    """Deterministic chunk ID: same source + same text → same ID."""
+    return hashlib.sha256(f"{source}\x00{content}".encode("utf-8")).hexdigest()[:32]
+
+
+class SourceManifest:
+    """`table` lets several tenants share one SQLite file (name must be a safe identifier)."""
+
+    def __init__(self, path: str, table: str = "chunks"):
+        self._table = f'"{table}"'
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._table} ("
+            " source   TEXT NOT NULL,"
+            " chunk_id TEXT NOT NULL,"
+            " PRIMARY KEY (source, chunk_id))"
+        )
+        self._conn.commit()
+
+    def has(self, source: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT 1 FROM {self._table} WHERE source = ? LIMIT 1", (source,)
+            ).fetchone() is not None
+
+    def ids(self, source: str) -> set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT chunk_id FROM {self._table} WHERE source = ?", (source,)
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def add(self, source: str, ids):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO {self._table} (source, chunk_id) VALUES (?, ?)",
+                [(source, i) for i in ids],
+            )
+
+    def remove(self, source: str, ids):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"DELETE FROM {self._table} WHERE source = ? AND chunk_id = ?",
+                [(source, i) for i in ids],
+            )
+
+    def drop(self, source: str):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self._table} WHERE source = ?", (source,))
+
+    def sources(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT source, COUNT(*) FROM {self._table} GROUP BY source ORDER BY source"
+            ).fetchall()
+        return dict(rows)
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self._table}")
@@ -0,0 +1,25 @@
+# ============================================================
+#  Tenant IDs – the default tenant, ID validation and the
+#  unknown-tenant error. No chromadb / langchain imports, so the
+#  API layer can use them without loading the engine's stack
+#  (tenants.py holds the knowledge bases themselves)
+# ============================================================
+
+import re
+from typing import Optional
+
+DEFAULT_TENANT = "default"
+
+_TENANT_ID = re.compile(r"^[a-z0-9](?:[a-z0-9_-]{0,38}[a-z0-9])?$")
+
+
+class UnknownTenant(KeyError):
+    pass
+
+
+def validate_tenant_id(tenant_id: Optional[str]) -> str:
+    """Lower-case letters, digits, '-' and '_' (max 40). None / '' → the default tenant."""
+    tenant_id = (tenant_id or DEFAULT_TENANT).strip().lower()
+    if not _TENANT_ID.match(tenant_id):
+        raise ValueError(f"Invalid tenant_id: {tenant_id!r}")
+    return tenant_id
@@ -0,0 +1,190 @@
+# ============================================================
+#  Tenants – one knowledge base per business in a single process.
+#  Each tenant has its own Chroma collections (chunks + FAQ),
+#  source manifest table and answer cache; handles are opened
+#  lazily and kept in a capped LRU. Chunks live in Chroma or, with
+#  VECTOR_BACKEND=numpy, in a brute-force NumPy matrix.
+# ============================================================
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import List, Optional
+
+import chromadb
+import numpy as np
+from chromadb.config import Settings
+from langchain_chroma import Chroma
+
+from faq_index import FAQIndex, FAQ_COLLECTION_NAME
+from numpy_store import NumpyVectorStore
+from source_manifest import SourceManifest
+from answer_cache import SemanticAnswerCache, KBVersion
+from tenant_ids import DEFAULT_TENANT, UnknownTenant, validate_tenant_id
+
+# ─── Config ─────────────────────────────────────────────────
+DEFAULT_COLLECTION     = "business_knowledge"   # the default tenant keeps the pre-tenant names
+TENANT_CACHE_SIZE      = int(os.getenv("TENANT_CACHE_SIZE", "64"))        # tenants kept open
+TENANT_INDEX_MEMORY_MB = int(os.getenv("TENANT_INDEX_MEMORY_MB", "0"))    # 0 = Chroma default (no cap)
+# "chroma" (HNSW) | "numpy" (exact search; faster up to tens of thousands of chunks,
+# see benchmarks/vector_bench.py). FAQ entries stay in Chroma either way.
+VECTOR_BACKEND         = os.getenv("VECTOR_BACKEND", "chroma")
+
+def _names(tenant_id: str) -> tuple:
+    """(chunk collection, FAQ collection, manifest table)"""
+    if tenant_id == DEFAULT_TENANT:
+        return DEFAULT_COLLECTION, FAQ_COLLECTION_NAME, "chunks"
+    return f"kb_{tenant_id}", f"faq_{tenant_id}", f"chunks_{tenant_id}"
+
+
+class TenantKB:
+    """One tenant's knowledge base."""
+
+    def __init__(self, tenant_id: str, client, embeddings, manifest_path: str,
+                 numpy_dir: Optional[str] = None, version: Optional[KBVersion] = None):
+        collection, faq_collection, table = _names(tenant_id)
+        self.tenant_id = tenant_id
+        if numpy_dir:
+            self.vectorstore = NumpyVectorStore(collection, embeddings, persist_directory=numpy_dir)
+        else:
+            self.vectorstore = Chroma(
+                client=client,
+                collection_name=collection,
+                embedding_function=embeddings,
+            )
+        self.faq          = FAQIndex(embeddings, client=client, collection_name=faq_collection)
+        self.manifest     = SourceManifest(manifest_path, table=table)
+        self.answer_cache = SemanticAnswerCache(version=version)
+
+    def reset(self):
+        """Drops every chunk (FAQ entries are kept, as before tenants existed)."""
+        self.vectorstore.reset_collection()
+        self.manifest.clear()
+        self.answer_cache.invalidate()
+
+    def add_embedded(self, docs: list, ids: List[str], vectors: list):
+        """Write chunks whose vectors are already computed (the ingestion pipeline embeds ahead)."""
+        texts     = [d.page_content for d in docs]
+        metadatas = [d.metadata for d in docs]
+        if isinstance(self.vectorstore, NumpyVectorStore):
+            self.vectorstore.add_vectors(vectors, texts, metadatas, ids)
+        else:
+            self.vectorstore._collection.upsert(ids=ids, embeddings=vectors,
+                                                documents=texts, metadatas=metadatas)
+
+    def iter_chunks(self, batch_size: int = 1000):
+        """(ids, texts, metadatas, float32 vectors) batches – snapshot export."""
+        if isinstance(self.vectorstore, NumpyVectorStore):
+            yield from self.vectorstore.iter_batches(batch_size)
+            return
+        collection = self.vectorstore._collection
+        for offset in range(0, collection.count(), batch_size):
+            data = collection.get(limit=batch_size, offset=offset,
+                                  include=["documents", "metadatas", "embeddings"])
+            yield (data["ids"], data["documents"], [m or {} for m in data["metadatas"]],
+                   np.asarray(data["embeddings"], dtype=np.float32))
+
+    def chunk_count(self) -> int:
+        if isinstance(self.vectorstore, NumpyVectorStore):
+            return self.vectorstore.count()
+        return self.vectorstore._collection.count()
+
+
+class TenantRegistry:
+    """
+    Usage:  kb = registry.get("acme-gym")      # opens (or reuses) the tenant's KB
+
+    At most `max_open` tenants stay open; the least recently used is dropped
+    from the cache (its data stays on disk and is reopened on next use). The
+    default tenant is pinned. A dropped KB that a caller still holds (e.g. a
+    running ingestion) is handed out again instead of a second handle on the
+    same files, so there is never more than one live store per tenant. With TENANT_INDEX_MEMORY_MB set, Chroma also
+    evicts least recently used HNSW indexes to stay under that budget.
+    """
+
+    def __init__(self, embeddings, persist_dir: str, max_open: int = TENANT_CACHE_SIZE):
+        limits = {}
+        if TENANT_INDEX_MEMORY_MB > 0:
+            limits = {"chroma_segment_cache_policy": "LRU",
+                      "chroma_memory_limit_bytes":   TENANT_INDEX_MEMORY_MB * 1024 * 1024}
+        settings = Settings(anonymized_telemetry=False, is_persistent=True, **limits)
+        self.client        = chromadb.PersistentClient(path=persist_dir, settings=settings)
+        self.embeddings    = embeddings
+        self.manifest_path = os.path.join(persist_dir, "manifest.sqlite3")
+        self.numpy_dir     = os.path.join(persist_dir, "numpy") if VECTOR_BACKEND == "numpy" else None
+        self.max_open      = max(1, max_open)
+        self._open: OrderedDict[str, TenantKB] = OrderedDict()
+        # Outlive every TenantKB instance: a reopened tenant continues its KB version
+        self._versions: dict[str, KBVersion] = {}
+        # Every TenantKB still referenced anywhere, in the LRU or not
+        self._live: "weakref.WeakValueDictionary[str, TenantKB]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits    = 0
+        self.opened  = 0
+        self.evicted = 0
+        self.revived = 0
+
+        self.default = self._load(DEFAULT_TENANT)
+
+    def _load(self, tenant_id: str) -> TenantKB:
+        kb = self._live.get(tenant_id)
+        if kb is not None:
+            self.revived += 1
+            return kb
+        version = self._versions.setdefault(tenant_id, KBVersion())
+        kb = self._live[tenant_id] = TenantKB(tenant_id, self.client, self.embeddings,
+                                              self.manifest_path, self.numpy_dir, version)
+        self.opened += 1
+        return kb
+
+    def exists(self, tenant_id: str) -> bool:
+        if tenant_id == DEFAULT_TENANT or tenant_id in self._open or tenant_id in self._live:
+            return True
+        if self.numpy_dir:
+            return NumpyVectorStore.exists(self.numpy_dir, _names(tenant_id)[0])
+        try:
+            self.client.get_collection(_names(tenant_id)[0])
+            return True
+        except Exception:
+            return False
+
+    def get(self, tenant_id: str = DEFAULT_TENANT, create: bool = False) -> TenantKB:
+        """The tenant's KB; UnknownTenant unless it exists or `create` is set (ingestion)."""
+        if tenant_id == DEFAULT_TENANT:
+            return self.default
+        with self._lock:
+            kb = self._open.get(tenant_id)
+            if kb is not None:
+                self._open.move_to_end(tenant_id)
+                self.hits += 1
+                return kb
+            if not create and not self.exists(tenant_id):
+                raise UnknownTenant(tenant_id)
+            kb = self._open[tenant_id] = self._load(tenant_id)
+            while len(self._open) > self.max_open:
+                self._open.popitem(last=False)   # in-flight users keep it alive in _live
+                self.evicted += 1
+            return kb
+
+    def tenants(self) -> List[str]:
+        """Every tenant with a knowledge base on disk (open or not)."""
+        if self.numpy_dir:
+            names = NumpyVectorStore.collections(self.numpy_dir)
+        else:
+            names = [getattr(c, "name", c) for c in self.client.list_collections()]
+        return [DEFAULT_TENANT] + sorted(n[3:] for n in names if n.startswith("kb_"))
+
+    def stats(self) -> dict:
+        return {
+            "open":             len(self._open) + 1,   # + the pinned default tenant
+            "max_open":         self.max_open + 1,
+            "hits":             self.hits,
+            "opened":           self.opened,
+            "evicted":          self.evicted,
+            "revived":          self.revived,
+            "index_memory_mb":  TENANT_INDEX_MEMORY_MB or None,
+            "vector_backend":   VECTOR_BACKEND,
+        }
@@ -0,0 +1,24 @@
+import { NextRequest, NextResponse } from "next/server";
+
+const BACKEND = process.env.BACKEND_URL || "http://127.0.0.1:8000";
+
+// CSV / NDJSON export — pipe the backend stream through without buffering
+export async function GET(req: NextRequest) {
+  try {
+    const searchParams = req.nextUrl.searchParams.toString();
+    const res = await fetch(`${BACKEND}/api/bookings/export${searchParams ? `?${searchParams}` : ""}`);
+    if (!res.ok) {
+      return NextResponse.json(await res.json(), { status: res.status });
+    }
+    return new Response(res.body, {
+      status: res.status,
+      headers: {
+        "Content-Type":        res.headers.get("content-type") || "text/csv",
+        "Content-Disposition": res.headers.get("content-disposition") || 'attachment; filename="bookings.csv"',
+        "Cache-Control":       "no-cache",
+      },
+    });
+  } catch (err: any) {
+    return NextResponse.json({ error: err.message }, { status: 502 });
+  }
+}
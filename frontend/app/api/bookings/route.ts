@@ -2,11 +2,17 @@ import { NextRequest, NextResponse } from "next/server";
 
 const BACKEND = process.env.BACKEND_URL || "http://127.0.0.1:8000";
 
-export async function GET() {
+export async function GET(req: NextRequest) {
   try {
-    const res = await fetch(`${BACKEND}/api/bookings`);
+    // Forward status / limit / offset filters and the total-count header
+    const searchParams = req.nextUrl.searchParams.toString();
+    const res = await fetch(`${BACKEND}/api/bookings${searchParams ? `?${searchParams}` : ""}`);
     const data = await res.json();
-    return NextResponse.json(data, { status: res.status });
+    const total = res.headers.get("x-total-count");
+    return NextResponse.json(data, {
+      status: res.status,
+      headers: total ? { "X-Total-Count": total } : undefined,
+    });
   } catch (err: any) {
     return NextResponse.json({ error: err.message }, { status: 502 });
   }
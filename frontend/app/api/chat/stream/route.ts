@@ -0,0 +1,29 @@
+import { NextRequest, NextResponse } from "next/server";
+
+const BACKEND = process.env.BACKEND_URL || "http://127.0.0.1:8000";
+
+// Server-Sent Events — pipe the backend stream through without buffering
+export async function POST(req: NextRequest) {
+  try {
+    const body = await req.json();
+    const res = await fetch(`${BACKEND}/api/chat/stream`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(body),
+    });
+    return new Response(res.body, {
+      status: res.status,
+      headers: {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        Connection: "keep-alive",
+      },
+    });
+  } catch (err: any) {
+    console.error("[chat stream route] Backend error:", err);
+    return NextResponse.json(
+      { error: "Backend connection failed", detail: err.message },
+      { status: 502 }
+    );
+  }
+}
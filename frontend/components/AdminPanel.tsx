@@ -6,10 +6,26 @@ import {
   CheckCircle, XCircle, Download, RotateCcw, LogOut
 } from "lucide-react";
 import axios from "axios";
+import { waitForIngestJob, IngestJob } from "@/lib/ingestJobs";
 
 const API_URL = "";   // Use Next.js proxy routes (same-origin)
 // PDF goes directly to Render to bypass Vercel 10s serverless timeout
 const DIRECT_BACKEND = process.env.NEXT_PUBLIC_BACKEND_URL || "";
+const BOOKINGS_PAGE_SIZE = 200;   // newest leads shown in the admin table
+
+// Server-side filters shared by the bookings table and the export
+interface BookingFilters {
+  status: string;
+  service: string;
+  phone: string;
+  created_from: string;
+  created_to: string;
+}
+const NO_FILTERS: BookingFilters = { status: "", service: "", phone: "", created_from: "", created_to: "" };
+
+// Drop empty filters so they are not sent as `?status=`
+const filterParams = (f: BookingFilters) =>
+  Object.fromEntries(Object.entries(f).filter(([, v]) => v)) as Record<string, string>;
 
 interface AdminPanelProps {
   onLogout?: () => void;
@@ -18,7 +34,9 @@ interface AdminPanelProps {
 export default function AdminPanel({ onLogout }: AdminPanelProps) {
   const [activeTab, setActiveTab] = useState<"ingest" | "bookings">("ingest");
   const [bookings, setBookings]   = useState<any[]>([]);
+  const [totalBk, setTotalBk]     = useState(0);
   const [loadingBk, setLoadingBk] = useState(false);
+  const [filters, setFilters]     = useState<BookingFilters>(NO_FILTERS);
   const [status, setStatus]       = useState("");
 
   // Auto-dismiss status message after 4 s
@@ -29,11 +47,14 @@ export default function AdminPanel({ onLogout }: AdminPanelProps) {
   }, [status]);
 
   // ── Fetch Bookings ──
-  const fetchBookings = async () => {
+  const fetchBookings = async (f: BookingFilters = filters) => {
     setLoadingBk(true);
     try {
-      const res = await axios.get(`${API_URL}/api/bookings`);
+      const res = await axios.get(`${API_URL}/api/bookings`, {
+        params: { limit: BOOKINGS_PAGE_SIZE, ...filterParams(f) },
+      });
       setBookings(res.data);
+      setTotalBk(Number(res.headers["x-total-count"] ?? res.data.length));
     } catch {
       setStatus("❌ Failed to load bookings.");
     } finally {
@@ -80,8 +101,11 @@ export default function AdminPanel({ onLogout }: AdminPanelProps) {
       ) : (
         <BookingsTable
           bookings={bookings}
+          total={totalBk}
           loading={loadingBk}
-          onRefresh={fetchBookings}
+          filters={filters}
+          onFilter={f => { setFilters(f); fetchBookings(f); }}
+          onRefresh={() => fetchBookings()}
           onStatus={setStatus}
           setBookings={setBookings}
         />
@@ -97,13 +121,19 @@ function IngestSection({ onStatus }: { onStatus: (s: string) => void }) {
   const fileRef             = useRef<HTMLInputElement>(null);
   const [loading, setLoading] = useState("");
 
+  const showProgress = (job: IngestJob) => {
+    if (job.status === "running" && job.chunks_total)
+      onStatus(`⏳ Embedding ${job.chunks_embedded}/${job.chunks_total} chunks…`);
+  };
+
   const ingestPDF = async (file: File) => {
     setLoading("pdf");
     const form = new FormData();
     form.append("file", file);
     try {
       const res = await axios.post(`${DIRECT_BACKEND}/api/ingest/pdf`, form, { timeout: 60000 });
-      onStatus(`✅ PDF indexed: ${res.data.chunks_created} chunks created.`);
+      const job = await waitForIngestJob(res.data.job_id, showProgress);
+      onStatus(`✅ PDF indexed: ${job.chunks_total} chunks created.`);
     } catch { onStatus("❌ PDF ingestion failed."); }
     finally  { setLoading(""); if (fileRef.current) fileRef.current.value = ""; }
   };
@@ -113,7 +143,8 @@ function IngestSection({ onStatus }: { onStatus: (s: string) => void }) {
     setLoading("url");
     try {
       const res = await axios.post(`${API_URL}/api/ingest/url`, null, { params: { url } });
-      onStatus(`✅ URL indexed: ${res.data.chunks_created} chunks.`);
+      const job = await waitForIngestJob(res.data.job_id, showProgress);
+      onStatus(`✅ URL indexed: ${job.chunks_total} chunks.`);
       setUrl("");
     } catch { onStatus("❌ URL ingestion failed."); }
     finally  { setLoading(""); }
@@ -124,7 +155,8 @@ function IngestSection({ onStatus }: { onStatus: (s: string) => void }) {
     setLoading("text");
     try {
       const res = await axios.post(`${API_URL}/api/ingest/text`, null, { params: { text, source: "admin_paste" } });
-      onStatus(`✅ Text indexed: ${res.data.chunks_created} chunks.`);
+      const job = await waitForIngestJob(res.data.job_id, showProgress);
+      onStatus(`✅ Text indexed: ${job.chunks_total} chunks.`);
       setText("");
     } catch { onStatus("❌ Text ingestion failed."); }
     finally  { setLoading(""); }
@@ -224,15 +256,19 @@ function IngestSection({ onStatus }: { onStatus: (s: string) => void }) {
 
 // ── Bookings Table ────────────────────────────────────────────
 function BookingsTable({
-  bookings, loading, onRefresh, onStatus, setBookings,
+  bookings, total, loading, filters, onFilter, onRefresh, onStatus, setBookings,
 }: {
   bookings: any[];
+  total: number;
   loading: boolean;
+  filters: BookingFilters;
+  onFilter: (f: BookingFilters) => void;
   onRefresh: () => void;
   onStatus: (s: string) => void;
   setBookings: React.Dispatch<React.SetStateAction<any[]>>;
 }) {
   const [actionId, setActionId] = useState<string | null>(null);
+  const [draft, setDraft]       = useState<BookingFilters>(filters);
 
   const updateStatus = async (id: string, newStatus: string) => {
     setActionId(id);
@@ -255,106 +291,130 @@ function BookingsTable({
     finally  { setActionId(null); }
   };
 
+  // The backend streams every matching lead (not just the loaded page) as a download
   const exportCSV = () => {
-    if (bookings.length === 0) return;
-    const headers = ["ID","Name","Phone","Email","Service","Preferred Time","Status","Date"];
-    const rows = bookings.map(b => [
-      b.id, b.name, b.phone, b.email,
-      b.service, b.preferred_time, b.status,
-      new Date(b.created_at).toLocaleDateString(),
-    ]);
-    const csv  = [headers, ...rows].map(r => r.join(",")).join("\n");
-    const blob = new Blob([csv], { type: "text/csv" });
-    const url  = URL.createObjectURL(blob);
-    const a    = document.createElement("a");
-    a.href = url; a.download = "bookings.csv"; a.click();
-    URL.revokeObjectURL(url);
+    const params = new URLSearchParams({ format: "csv", ...filterParams(filters) });
+    window.location.href = `${API_URL}/api/bookings/export?${params}`;
   };
 
-  if (loading) return <p className="text-center text-gray-400 py-8 animate-pulse">Loading bookings…</p>;
+  const filterInput = "border border-gray-200 rounded-lg px-2 py-1 text-xs focus:outline-none focus:border-indigo-400";
 
   return (
     <div>
-      <div className="flex justify-between items-center mb-4">
-        <p className="text-sm text-gray-500">{bookings.length} total leads</p>
-        <div className="flex items-center gap-3">
-          <button
-            onClick={exportCSV}
-            disabled={bookings.length === 0}
-            className="text-xs text-green-600 hover:text-green-800 flex items-center gap-1 disabled:opacity-40"
-          >
-            <Download size={12} /> Export CSV
-          </button>
-          <button onClick={onRefresh} className="text-xs text-indigo-600 hover:text-indigo-800 flex items-center gap-1">
-            <RefreshCw size={12} /> Refresh
-          </button>
-        </div>
-      </div>
-      {bookings.length === 0 ? (
-        <p className="text-center text-gray-400 py-10">No bookings yet.</p>
+      <form
+        onSubmit={e => { e.preventDefault(); onFilter(draft); }}
+        className="flex flex-wrap items-center gap-2 mb-3"
+      >
+        <select value={draft.status} onChange={e => setDraft({ ...draft, status: e.target.value })} className={filterInput}>
+          <option value="">All statuses</option>
+          <option value="pending">Pending</option>
+          <option value="confirmed">Confirmed</option>
+          <option value="cancelled">Cancelled</option>
+        </select>
+        <input placeholder="Service" value={draft.service}
+          onChange={e => setDraft({ ...draft, service: e.target.value })} className={`${filterInput} w-28`} />
+        <input placeholder="Phone" value={draft.phone}
+          onChange={e => setDraft({ ...draft, phone: e.target.value })} className={`${filterInput} w-28`} />
+        <input type="date" title="Created from" value={draft.created_from}
+          onChange={e => setDraft({ ...draft, created_from: e.target.value })} className={filterInput} />
+        <input type="date" title="Created before" value={draft.created_to}
+          onChange={e => setDraft({ ...draft, created_to: e.target.value })} className={filterInput} />
+        <button type="submit" className="text-xs bg-indigo-600 text-white px-3 py-1 rounded-lg hover:bg-indigo-700">
+          Filter
+        </button>
+        <button type="button" onClick={() => { setDraft(NO_FILTERS); onFilter(NO_FILTERS); }}
+          className="text-xs text-gray-400 hover:text-gray-600">
+          Clear
+        </button>
+      </form>
+      {loading ? (
+        <p className="text-center text-gray-400 py-8 animate-pulse">Loading bookings…</p>
       ) : (
-        <div className="overflow-x-auto rounded-xl border border-gray-100">
-          <table className="w-full text-xs">
-            <thead className="bg-gray-50">
-              <tr>
-                {["ID","Name","Phone","Service","Time","Status","Date","Actions"].map(h => (
-                  <th key={h} className="text-left px-3 py-2 font-semibold text-gray-500">{h}</th>
-                ))}
-              </tr>
-            </thead>
-            <tbody>
-              {bookings.map(b => (
-                <tr key={b.id} className="border-t border-gray-50 hover:bg-indigo-50/30 transition-colors">
-                  <td className="px-3 py-2 font-mono font-bold text-indigo-600">{b.id}</td>
-                  <td className="px-3 py-2 font-medium text-gray-700">{b.name}</td>
-                  <td className="px-3 py-2 text-gray-500">{b.phone}</td>
-                  <td className="px-3 py-2 text-gray-600">{b.service}</td>
-                  <td className="px-3 py-2 text-gray-500">{b.preferred_time}</td>
-                  <td className="px-3 py-2">
-                    <span className={`px-2 py-0.5 rounded-full text-[10px] font-medium ${
-                      b.status === "confirmed"  ? "bg-green-100 text-green-700"  :
-                      b.status === "cancelled"  ? "bg-red-100 text-red-600"      :
-                                                  "bg-amber-100 text-amber-700"
-                    }`}>{b.status}</span>
-                  </td>
-                  <td className="px-3 py-2 text-gray-400" suppressHydrationWarning>{new Date(b.created_at).toLocaleDateString()}</td>
-                  <td className="px-3 py-2">
-                    <div className="flex items-center gap-2">
-                      {/* Confirm / Undo-confirm */}
-                      {b.status !== "confirmed" ? (
-                        <button title="Confirm" disabled={actionId === b.id}
-                          onClick={() => updateStatus(b.id, "confirmed")}
-                          className="text-green-500 hover:text-green-700 disabled:opacity-40 transition-colors">
-                          <CheckCircle size={14} />
-                        </button>
-                      ) : (
-                        <button title="Mark Pending" disabled={actionId === b.id}
-                          onClick={() => updateStatus(b.id, "pending")}
-                          className="text-amber-500 hover:text-amber-700 disabled:opacity-40 transition-colors">
-                          <RotateCcw size={14} />
-                        </button>
-                      )}
-                      {/* Cancel */}
-                      {b.status !== "cancelled" && (
-                        <button title="Cancel" disabled={actionId === b.id}
-                          onClick={() => updateStatus(b.id, "cancelled")}
-                          className="text-orange-400 hover:text-orange-600 disabled:opacity-40 transition-colors">
-                          <XCircle size={14} />
-                        </button>
-                      )}
-                      {/* Delete */}
-                      <button title="Delete" disabled={actionId === b.id}
-                        onClick={() => deleteBooking(b.id)}
-                        className="text-red-400 hover:text-red-600 disabled:opacity-40 transition-colors">
-                        <Trash2 size={14} />
-                      </button>
-                    </div>
-                  </td>
-                </tr>
-              ))}
-            </tbody>
-          </table>
-        </div>
+        <>
+          <div className="flex justify-between items-center mb-4">
+            <p className="text-sm text-gray-500">
+              {total > bookings.length ? `Showing latest ${bookings.length} of ${total} leads` : `${bookings.length} leads`}
+            </p>
+            <div className="flex items-center gap-3">
+              <button
+                onClick={exportCSV}
+                disabled={total === 0}
+                className="text-xs text-green-600 hover:text-green-800 flex items-center gap-1 disabled:opacity-40"
+              >
+                <Download size={12} /> Export CSV
+              </button>
+              <button onClick={onRefresh} className="text-xs text-indigo-600 hover:text-indigo-800 flex items-center gap-1">
+                <RefreshCw size={12} /> Refresh
+              </button>
+            </div>
+          </div>
+          {bookings.length === 0 ? (
+            <p className="text-center text-gray-400 py-10">No bookings found.</p>
+          ) : (
+            <div className="overflow-x-auto rounded-xl border border-gray-100">
+              <table className="w-full text-xs">
+                <thead className="bg-gray-50">
+                  <tr>
+                    {["ID","Name","Phone","Service","Time","Status","Date","Actions"].map(h => (
+                      <th key={h} className="text-left px-3 py-2 font-semibold text-gray-500">{h}</th>
+                    ))}
+                  </tr>
+                </thead>
+                <tbody>
+                  {bookings.map(b => (
+                    <tr key={b.id} className="border-t border-gray-50 hover:bg-indigo-50/30 transition-colors">
+                      <td className="px-3 py-2 font-mono font-bold text-indigo-600">{b.id}</td>
+                      <td className="px-3 py-2 font-medium text-gray-700">{b.name}</td>
+                      <td className="px-3 py-2 text-gray-500">{b.phone}</td>
+                      <td className="px-3 py-2 text-gray-600">{b.service}</td>
+                      <td className="px-3 py-2 text-gray-500">{b.preferred_time}</td>
+                      <td className="px-3 py-2">
+                        <span className={`px-2 py-0.5 rounded-full text-[10px] font-medium ${
+                          b.status === "confirmed"  ? "bg-green-100 text-green-700"  :
+                          b.status === "cancelled"  ? "bg-red-100 text-red-600"      :
+                                                      "bg-amber-100 text-amber-700"
+                        }`}>{b.status}</span>
+                      </td>
+                      <td className="px-3 py-2 text-gray-400" suppressHydrationWarning>{new Date(b.created_at).toLocaleDateString()}</td>
+                      <td className="px-3 py-2">
+                        <div className="flex items-center gap-2">
+                          {/* Confirm / Undo-confirm */}
+                          {b.status !== "confirmed" ? (
+                            <button title="Confirm" disabled={actionId === b.id}
+                              onClick={() => updateStatus(b.id, "confirmed")}
+                              className="text-green-500 hover:text-green-700 disabled:opacity-40 transition-colors">
+                              <CheckCircle size={14} />
+                            </button>
+                          ) : (
+                            <button title="Mark Pending" disabled={actionId === b.id}
+                              onClick={() => updateStatus(b.id, "pending")}
+                              className="text-amber-500 hover:text-amber-700 disabled:opacity-40 transition-colors">
+                              <RotateCcw size={14} />
+                            </button>
+                          )}
+                          {/* Cancel */}
+                          {b.status !== "cancelled" && (
+                            <button title="Cancel" disabled={actionId === b.id}
+                              onClick={() => updateStatus(b.id, "cancelled")}
+                              className="text-orange-400 hover:text-orange-600 disabled:opacity-40 transition-colors">
+                              <XCircle size={14} />
+                            </button>
+                          )}
+                          {/* Delete */}
+                          <button title="Delete" disabled={actionId === b.id}
+                            onClick={() => deleteBooking(b.id)}
+                            className="text-red-400 hover:text-red-600 disabled:opacity-40 transition-colors">
+                            <Trash2 size={14} />
+                          </button>
+                        </div>
+                      </td>
+                    </tr>
+                  ))}
+                </tbody>
+              </table>
+            </div>
+          )}
+        </>
       )}
     </div>
   );
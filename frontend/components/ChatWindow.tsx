@@ -7,12 +7,16 @@ import MessageBubble, { Message } from "./MessageBubble";
 import BookingModal from "./BookingModal";
 import TypingIndicator from "./TypingIndicator";
 import axios from "axios";
+import { waitForIngestJob } from "@/lib/ingestJobs";
 
 const API_URL = "";   // Use Next.js proxy routes (same-origin)
 // PDF goes directly to Render to bypass Vercel 10s serverless timeout
 const DIRECT_BACKEND = typeof window !== "undefined"
   ? (process.env.NEXT_PUBLIC_BACKEND_URL || "")
   : "";
+// While typing, the draft is sent for retrieval prefetch once the visitor pauses
+const PREFETCH_DEBOUNCE_MS = 350;
+const PREFETCH_MIN_CHARS   = 8;
 
 function makeWelcomeMsg(): Message {
   return {
@@ -45,6 +49,20 @@ export default function ChatWindow({ agentName }: { agentName: string }) {
     endRef.current?.scrollIntoView({ behavior: "smooth" });
   }, [messages, isLoading]);
 
+  // Speculative retrieval: the backend embeds the draft and searches the KB
+  // now, so the chat call can go straight to the LLM when the message is sent
+  useEffect(() => {
+    const draft = input.trim();
+    if (draft.length < PREFETCH_MIN_CHARS || isLoading) return;
+    const t = setTimeout(() => {
+      axios.post(`${API_URL}/api/chat/prefetch`, {
+        message:    draft,
+        session_id: sessionIdRef.current,
+      }).catch(() => { /* best effort */ });
+    }, PREFETCH_DEBOUNCE_MS);
+    return () => clearTimeout(t);
+  }, [input, isLoading]);
+
   // Clear chat
   const clearChat = () => {
     setMessages([makeWelcomeMsg()]);
@@ -80,7 +98,9 @@ export default function ChatWindow({ agentName }: { agentName: string }) {
     form.append("file", file);
     try {
       const res = await axios.post(`${DIRECT_BACKEND}/api/ingest/pdf`, form, { timeout: 60000 });
-      setPdfStatus(`✅ PDF indexed (${res.data.chunks_created} chunks)`);
+      setPdfStatus("⏳ Indexing PDF…");
+      const job = await waitForIngestJob(res.data.job_id);
+      setPdfStatus(`✅ PDF indexed (${job.chunks_total} chunks)`);
     } catch (err: any) {
       const msg = err?.response?.data?.error || err?.message || "Unknown error";
       setPdfStatus(`❌ Failed: ${msg}`);
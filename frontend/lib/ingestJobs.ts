@@ -0,0 +1,27 @@
+import axios from "axios";
+
+export interface IngestJob {
+  id: string;
+  status: "queued" | "running" | "done" | "failed";
+  message: string;
+  chunks_total: number | null;
+  chunks_embedded: number;
+  chunks_unchanged: number;
+  chunks_removed: number;
+  error: string | null;
+}
+
+// Ingest endpoints return a job ID right away — poll until the job finishes.
+export async function waitForIngestJob(
+  jobId: string,
+  onProgress?: (job: IngestJob) => void,
+  intervalMs = 1000,
+): Promise<IngestJob> {
+  while (true) {
+    const { data } = await axios.get<IngestJob>(`/api/ingest/jobs/${jobId}`);
+    onProgress?.(data);
+    if (data.status === "done") return data;
+    if (data.status === "failed") throw new Error(data.error || "Ingestion failed");
+    await new Promise(r => setTimeout(r, intervalMs));
+  }
+}